@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import enum
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import Boolean, Enum, Float, Index, Integer, String, delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.core.base import Base
+
+# Temp files are named so that orphans can be found after a crash.
+TEMP_AUDIO_PREFIX = "tobv-audio-"
+
+
+class ArtifactKind(enum.Enum):
+    VIDEO = "video"
+    THUMBNAIL = "thumbnail"
+    INDEX = "index"
+    WAVEFORM = "waveform"
+    SPEECH = "speech"
+    DUB = "dub"
+    HLS = "hls"
+    KEYFRAME = "keyframe"
+
+
+@dataclass(frozen=True)
+class ArtifactClass:
+    directory: Path
+    suffix: str
+    # Rough time to build one again, used to keep expensive files longer.
+    rebuild_seconds: float
+    regenerable: bool = True
+    # Each artifact is a directory of files rather than a single file.
+    nested: bool = False
+
+
+ARTIFACT_CLASSES: dict[ArtifactKind, ArtifactClass] = {
+    ArtifactKind.VIDEO: ArtifactClass(Path("data/videos"), ".mp4", 0, False),
+    ArtifactKind.THUMBNAIL: ArtifactClass(Path("data/thumbnails"), ".png", 1),
+    ArtifactKind.INDEX: ArtifactClass(Path("data/indexes"), ".idx", 2),
+    ArtifactKind.WAVEFORM: ArtifactClass(Path("data/waveforms"), ".peaks", 5),
+    ArtifactKind.SPEECH: ArtifactClass(Path("data/speeches"), ".wav", 10),
+    ArtifactKind.DUB: ArtifactClass(Path("data/dubs"), ".mp4", 30),
+    # Packaging rewrites the video file, so nothing rebuilds a purged package.
+    ArtifactKind.HLS: ArtifactClass(Path("data/hls"), "", 10, False, nested=True),
+    ArtifactKind.KEYFRAME: ArtifactClass(Path("data/keyframes"), "", 5, nested=True),
+}
+
+# Half written files left behind by a killed download or write.
+PARTIAL_SUFFIXES = (".part", ".tmp")
+
+
+class Artifact(Base):
+    """A file on disk derived from (or downloaded for) a video."""
+
+    __tablename__ = "artifacts"
+    __table_args__ = (Index("ix_artifacts_owner", "owner_id", "kind"),)
+
+    path: Mapped[str] = mapped_column(String, primary_key=True)
+    kind: Mapped[ArtifactKind] = mapped_column(Enum(ArtifactKind), nullable=False)
+    owner_id: Mapped[str] = mapped_column(String, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    rebuild_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    regenerable: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    last_access: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class Eviction(Base):
+    """An artifact removed to stay under budget, to be rebuilt on request."""
+
+    __tablename__ = "artifact_evictions"
+
+    path: Mapped[str] = mapped_column(String, primary_key=True)
+    kind: Mapped[ArtifactKind] = mapped_column(Enum(ArtifactKind), nullable=False)
+    evicted_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+@dataclass
+class ArtifactUsage:
+    kind: ArtifactKind
+    count: int = 0
+    size_bytes: int = 0
+
+
+@dataclass
+class ArtifactReport:
+    usage: list[ArtifactUsage]
+    budget_bytes: int | None
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(u.size_bytes for u in self.usage)
+
+    @property
+    def regenerable_bytes(self) -> int:
+        return sum(
+            u.size_bytes for u in self.usage if ARTIFACT_CLASSES[u.kind].regenerable
+        )
+
+
+@dataclass
+class PurgeReport:
+    evicted: list[str] = field(default_factory=list)
+    evicted_bytes: int = 0
+    orphans: list[str] = field(default_factory=list)
+    orphan_bytes: int = 0
+
+
+@dataclass
+class ArtifactService:
+    """
+    Keeps derived files under `budget_bytes`. The registry is synced from the
+    data directories rather than written by whoever creates a file, so files
+    made by ingest workers or older versions are accounted for too. Only
+    regenerable files count against the budget and are evicted, least
+    recently used first, where every second an artifact takes to rebuild
+    counts as `cost_weight` seconds of recency.
+
+    The budget is only enforced by `purge`, run from the `artifacts purge`
+    command; writing a file never evicts another one.
+    """
+
+    session: Session
+    budget_bytes: int | None = None
+    cost_weight: float = 3600
+    # Temp and partial files younger than this may still be in use.
+    orphan_seconds: float = 3600
+    # Accesses closer together than this aren't written back.
+    touch_seconds: float = 60
+
+    def touch(self, path: Path, kind: ArtifactKind) -> None:
+        now = time.time()
+        artifact = self.session.get(Artifact, str(path))
+        if artifact is None:
+            self._upsert(self._artifact(path, kind, now), "last_access")
+        elif now - artifact.last_access > self.touch_seconds:
+            artifact.last_access = now
+
+    def record(self, path: Path, kind: ArtifactKind) -> None:
+        """Registers a file that was just written, or written again."""
+        self._upsert(
+            self._artifact(path, kind, time.time()), "size_bytes", "last_access"
+        )
+        self.session.execute(delete(Eviction).where(Eviction.path == str(path)))
+
+    def was_evicted(self, path: Path) -> bool:
+        return self.session.get(Eviction, str(path)) is not None
+
+    def sync(self) -> None:
+        known = {a.path: a for a in self.session.scalars(select(Artifact))}
+
+        for kind, artifact_class in ARTIFACT_CLASSES.items():
+            if not artifact_class.directory.is_dir():
+                continue
+
+            for path in artifact_class.directory.glob(f"*{artifact_class.suffix}"):
+                if (
+                    path.is_dir() != artifact_class.nested
+                    or path.suffix in PARTIAL_SUFFIXES
+                ):
+                    continue
+
+                artifact = known.pop(str(path), None)
+                if artifact is None:
+                    self.session.add(self._artifact(path, kind, path.stat().st_mtime))
+                else:
+                    artifact.size_bytes = _size(path)
+                    # Rows from before a class changed follow the new one.
+                    artifact.rebuild_seconds = artifact_class.rebuild_seconds
+                    artifact.regenerable = artifact_class.regenerable
+
+        if known:
+            self.session.execute(delete(Artifact).where(Artifact.path.in_(known)))
+        self.session.flush()
+
+    def report(self) -> ArtifactReport:
+        self.sync()
+
+        usage = {kind: ArtifactUsage(kind) for kind in ArtifactKind}
+        for artifact in self.session.scalars(select(Artifact)):
+            usage[artifact.kind].count += 1
+            usage[artifact.kind].size_bytes += artifact.size_bytes
+
+        return ArtifactReport(list(usage.values()), self.budget_bytes)
+
+    def purge(self, budget_bytes: int | None = None) -> PurgeReport:
+        if budget_bytes is None:
+            budget_bytes = self.budget_bytes
+
+        report = PurgeReport()
+        self._collect_orphans(report)
+        self.sync()
+        if budget_bytes is not None:
+            self._evict(budget_bytes, report)
+
+        return report
+
+    def _evict(self, budget_bytes: int, report: PurgeReport) -> None:
+        candidates = list(
+            self.session.scalars(select(Artifact).where(Artifact.regenerable))
+        )
+        used = sum(a.size_bytes for a in candidates)
+
+        candidates.sort(
+            key=lambda a: a.last_access + a.rebuild_seconds * self.cost_weight
+        )
+        for artifact in candidates:
+            if used <= budget_bytes:
+                break
+
+            _remove(Path(artifact.path))
+            self.session.delete(artifact)
+            self.session.merge(Eviction(artifact.path, artifact.kind, time.time()))
+            used -= artifact.size_bytes
+            report.evicted.append(artifact.path)
+            report.evicted_bytes += artifact.size_bytes
+
+        self.session.flush()
+
+    def _collect_orphans(self, report: PurgeReport) -> None:
+        paths = list(Path(tempfile.gettempdir()).glob(f"{TEMP_AUDIO_PREFIX}*"))
+        for artifact_class in ARTIFACT_CLASSES.values():
+            if artifact_class.directory.is_dir():
+                paths.extend(
+                    path
+                    for path in artifact_class.directory.iterdir()
+                    if path.suffix in PARTIAL_SUFFIXES
+                )
+
+        cutoff = time.time() - self.orphan_seconds
+        for path in paths:
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                size = _size(path)
+                _remove(path)
+            except FileNotFoundError:
+                continue
+
+            report.orphans.append(str(path))
+            report.orphan_bytes += size
+
+    def _upsert(self, artifact: Artifact, *updates: str) -> None:
+        # Two first requests for the same file may both find no row.
+        statement = insert(Artifact).values(
+            {c.key: getattr(artifact, c.key) for c in Artifact.__table__.columns}
+        )
+        self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Artifact.path],
+                set_={name: statement.excluded[name] for name in updates},
+            )
+        )
+
+    def _artifact(self, path: Path, kind: ArtifactKind, last_access: float) -> Artifact:
+        artifact_class = ARTIFACT_CLASSES[kind]
+        return Artifact(
+            path=str(path),
+            kind=kind,
+            owner_id=path.name.split(".", 1)[0],
+            size_bytes=_size(path),
+            rebuild_seconds=artifact_class.rebuild_seconds,
+            regenerable=artifact_class.regenerable,
+            last_access=last_access,
+        )
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
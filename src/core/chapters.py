@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import math
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import Float, ForeignKey, Integer, String, delete, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.core import Base
+from src.core.singleflight import SingleFlight, flight_key
+from src.core.translations import Language, Translation, TranslationService
+from src.core.videos import Video, VideoService
+
+
+class Chapter(Base):
+    """A scene of a video, found by scene detection."""
+
+    __tablename__ = "chapters"
+
+    video_id: Mapped[str] = mapped_column(
+        String, ForeignKey("videos.id"), primary_key=True
+    )
+    number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    from_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    to_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    keyframe_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    ocr_text: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+
+
+@dataclass
+class ChapterService:
+    """
+    Splits videos into chapters at scene cuts, so batch translation and OCR
+    follow scenes instead of arbitrary windows. Consecutive chapters are
+    translated together in segments of up to `max_segment_seconds`, cut only
+    between chapters; a longer chapter is split evenly on its own. OCR runs
+    on one representative frame per chapter.
+    """
+
+    session: Session
+    video_service: VideoService
+    translation_service: TranslationService
+
+    max_segment_seconds: float = 120
+    flights: SingleFlight = field(default_factory=SingleFlight)
+
+    def get_chapters(self, video_id: str) -> list[Chapter]:
+        self.video_service.get_video(video_id)
+        return list(
+            self.session.scalars(
+                select(Chapter)
+                .where(Chapter.video_id == video_id)
+                .order_by(Chapter.number)
+            ).all()
+        )
+
+    def detect_chapters(self, video_id: str) -> list[Chapter]:
+        chapters = self._detect_chapters(video_id)
+        self.session.flush()
+        return chapters
+
+    def get_keyframe_path(self, video_id: str, number: int) -> Path:
+        chapter = self._get_chapter(video_id, number)
+        return self.video_service.get_keyframe_path(
+            self.video_service.get_video(video_id),
+            chapter.number,
+            chapter.keyframe_seconds,
+        )
+
+    def translate_chapters(
+        self,
+        video_id: str,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Translation]:
+        """Segments translated before are reused, not sent again."""
+        video = self.video_service.get_video(video_id)
+
+        # Nothing is written before the last model call, so the database
+        # isn't write-locked while waiting on the model.
+        with self.session.no_autoflush:
+            chapters = self._detected_chapters(video_id)
+            segments = _segments(chapters, self.max_segment_seconds)
+            stored = {
+                segment: self._stored_translation(
+                    video.id, *segment, from_language, to_language
+                )
+                for segment in segments
+            }
+            missing = [segment for segment, found in stored.items() if not found]
+            translated = dict(
+                zip(
+                    missing,
+                    self.translation_service.translate_audio_segments(
+                        video.id, video.video_type, missing, from_language, to_language
+                    ),
+                    strict=True,
+                )
+            )
+
+        return [stored[segment] or translated[segment] for segment in segments]
+
+    def ocr_chapters(self, video_id: str) -> list[Chapter]:
+        video = self.video_service.get_video(video_id)
+
+        # Like translations, the texts are only written once all are read.
+        with self.session.no_autoflush:
+            chapters = self._detected_chapters(video_id)
+            missing = [chapter for chapter in chapters if chapter.ocr_text is None]
+            texts = [self._ocr(video, chapter) for chapter in missing]
+
+        for chapter, text in zip(missing, texts, strict=True):
+            chapter.ocr_text = text
+        self.session.flush()
+        return chapters
+
+    def _ocr(self, video: Video, chapter: Chapter) -> str:
+        def ocr() -> str:
+            keyframe = self.video_service.get_keyframe_path(
+                video, chapter.number, chapter.keyframe_seconds
+            )
+            return self.video_service.ocr.generate_ocr(keyframe)
+
+        def stored() -> str | None:
+            self.session.refresh(chapter)
+            return chapter.ocr_text
+
+        return self.flights.do(
+            flight_key("chapter-ocr", chapter.video_id, chapter.number),
+            ocr,
+            stored,
+            self.session,
+        )
+
+    def _detected_chapters(self, video_id: str) -> list[Chapter]:
+        return self.get_chapters(video_id) or self._detect_chapters(video_id)
+
+    def _detect_chapters(self, video_id: str) -> list[Chapter]:
+        """Adds the detected chapters to the session, the caller flushes them."""
+        video = self.video_service.get_video(video_id)
+
+        def detect() -> list[Chapter]:
+            scenes = self.video_service.detect_scenes(video.id, video.video_type)
+
+            # Only a redetection has rows to replace. A first detection, on
+            # its way to model calls, writes nothing yet.
+            if self.get_chapters(video.id):
+                self.session.execute(
+                    delete(Chapter).where(Chapter.video_id == video.id)
+                )
+            # Old keyframes belong to the old numbering.
+            shutil.rmtree(Path(f"data/keyframes/{video.id}"), ignore_errors=True)
+
+            chapters = [
+                Chapter(
+                    video_id=video.id,
+                    number=number,
+                    from_seconds=scene.from_seconds,
+                    to_seconds=scene.to_seconds,
+                    keyframe_seconds=scene.keyframe_seconds,
+                )
+                for number, scene in enumerate(scenes)
+            ]
+            self.session.add_all(chapters)
+            return chapters
+
+        return self.flights.do(
+            flight_key("chapters", video.id),
+            detect,
+            lambda: self.get_chapters(video.id) or None,
+            self.session,
+        )
+
+    def _stored_translation(
+        self,
+        video_id: str,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> Translation | None:
+        return self.session.scalars(
+            select(Translation)
+            .where(
+                Translation.video_id == video_id,
+                Translation.from_seconds == from_seconds,
+                Translation.to_seconds == to_seconds,
+                Translation.from_language == from_language,
+                Translation.to_language == to_language,
+            )
+            .order_by(Translation.created_at.desc())
+            .limit(1)
+        ).one_or_none()
+
+    def _get_chapter(self, video_id: str, number: int) -> Chapter:
+        chapter = self.session.get(Chapter, (video_id, number))
+        if not chapter:
+            raise ChapterNotFoundError(
+                f"Chapter {number} of video {video_id} not found."
+            )
+        return chapter
+
+
+def _segments(chapters: list[Chapter], max_seconds: float) -> list[tuple[float, float]]:
+    segments: list[tuple[float, float]] = []
+    for chapter in chapters:
+        if segments and chapter.to_seconds - segments[-1][0] <= max_seconds:
+            segments[-1] = (segments[-1][0], chapter.to_seconds)
+            continue
+
+        length = chapter.to_seconds - chapter.from_seconds
+        parts = max(1, math.ceil(length / max_seconds))
+        bounds = [chapter.from_seconds + length * i / parts for i in range(parts)]
+        segments.extend(zip(bounds, [*bounds[1:], chapter.to_seconds], strict=True))
+
+    return segments
+
+
+class ChapterNotFoundError(Exception):
+    pass
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import itertools
+import json
+import queue
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import select
+
+from src.core.base import Connector
+from src.core.videos import (
+    MediaProcessor,
+    OCRGenerator,
+    Video,
+    VideoDownloader,
+    VideoMetadata,
+    VideoService,
+)
+
+
+@dataclass
+class IngestResult:
+    url: str
+    video_id: str
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class IngestReport:
+    succeeded: int = 0
+    failed: list[IngestResult] = field(default_factory=list)
+    skipped: int = 0
+
+
+@dataclass
+class IngestCheckpoint:
+    path: Path
+
+    def completed(self) -> set[str]:
+        if not self.path.is_file():
+            return set()
+
+        urls = set()
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    urls.add(json.loads(line)["url"])
+                except (json.JSONDecodeError, KeyError):
+                    # A killed run can leave a torn last line behind.
+                    continue
+
+        return urls
+
+    def record(self, results: list[IngestResult]) -> None:
+        with open(self.path, "a") as f:
+            for result in results:
+                f.write(json.dumps({"url": result.url, "video_id": result.video_id}))
+                f.write("\n")
+            f.flush()
+
+
+@dataclass
+class IngestPipeline:
+    """
+    Two stage ingest: downloads run on an I/O pool, thumbnails and metadata
+    on a separate, smaller pool. Finished videos are committed in batches and
+    only then written to the checkpoint, so a resumed run never skips a URL
+    whose row didn't make it into the database. URLs that already have a row
+    are skipped too, whether a killed run committed them just before its
+    checkpoint write or they were added through the web UI.
+    """
+
+    connector: Connector
+    video_downloader: VideoDownloader
+    ocr: OCRGenerator
+    media: MediaProcessor
+    checkpoint: IngestCheckpoint
+
+    download_workers: int = 8
+    process_workers: int = 2
+    batch_size: int = 50
+    # Remux into faststart MP4 and HLS as part of processing.
+    package: bool = False
+
+    def run(
+        self,
+        urls: Iterable[str],
+        on_batch: Callable[[IngestReport], None] | None = None,
+    ) -> IngestReport:
+        report = IngestReport()
+        completed = self.checkpoint.completed()
+        with self.connector.session() as session:
+            completed |= set(session.scalars(select(Video.original_url)))
+
+        pending = []
+        for url in dict.fromkeys(u.strip() for u in urls):
+            if not url:
+                continue
+            if url in completed:
+                report.skipped += 1
+                continue
+            pending.append(url)
+
+        if not pending:
+            return report
+
+        with (
+            self.connector.session() as session,
+            ThreadPoolExecutor(self.download_workers) as downloads,
+            ThreadPoolExecutor(self.process_workers) as processing,
+        ):
+            service = VideoService(
+                session=session,
+                video_downloader=self.video_downloader,
+                ocr=self.ocr,
+                media=self.media,
+            )
+            results: queue.Queue[tuple[Video, IngestResult]] = queue.Queue()
+            metadata: dict[str, VideoMetadata] = {}
+            # Videos whose files aren't owned by a committed row yet.
+            started: dict[str, Video] = {}
+            stopping = threading.Event()
+
+            def process(video: Video) -> None:
+                try:
+                    if self.package:
+                        service.package_video(video.id, video.video_type)
+                    else:
+                        service.index_video(video.id, video.video_type)
+                    service.generate_thumbnail(video)
+                    # Workers must not touch the session, it is stored on commit.
+                    metadata[video.id] = service.probe_video_metadata(
+                        video.id, video.video_type
+                    )
+                except Exception as e:
+                    service.remove_video_files(video.id, video.video_type)
+                    results.put(
+                        (video, IngestResult(video.original_url, video.id, str(e)))
+                    )
+                else:
+                    results.put((video, IngestResult(video.original_url, video.id)))
+
+            def downloaded(video: Video, future: Future[None]) -> None:
+                if stopping.is_set():
+                    return
+                error = future.exception()
+                if error is not None:
+                    results.put(
+                        (video, IngestResult(video.original_url, video.id, str(error)))
+                    )
+                    return
+                processing.submit(process, video)
+
+            def start(url: str) -> None:
+                video = Video(original_url=url)
+                started[video.id] = video
+                downloads.submit(service.download_video, video).add_done_callback(
+                    partial(downloaded, video)
+                )
+
+            # Downloads only run ahead of processing by this many videos, so
+            # a long list can't fill the disk with unprocessed files.
+            waiting = iter(pending)
+            for url in itertools.islice(
+                waiting, self.download_workers + self.process_workers
+            ):
+                start(url)
+
+            def commit(batch: list[tuple[Video, IngestResult]]) -> None:
+                self._commit(service, batch, metadata, report)
+                for video, _ in batch:
+                    del started[video.id]
+                if on_batch:
+                    on_batch(report)
+
+            batch: list[tuple[Video, IngestResult]] = []
+            try:
+                for _ in pending:
+                    video, result = results.get()
+                    # One slot is free again.
+                    if (following := next(waiting, None)) is not None:
+                        start(following)
+
+                    if not result.ok:
+                        del started[video.id]
+                        report.failed.append(result)
+                        continue
+
+                    batch.append((video, result))
+                    if len(batch) >= self.batch_size:
+                        commit(batch)
+                        batch = []
+
+                if batch:
+                    commit(batch)
+            except BaseException:
+                # Queued work is dropped; only what already runs is waited for.
+                stopping.set()
+                downloads.shutdown(cancel_futures=True)
+                processing.shutdown(cancel_futures=True)
+                for video in started.values():
+                    service.remove_video_files(video.id, video.video_type)
+                raise
+
+        return report
+
+    def _commit(
+        self,
+        service: VideoService,
+        batch: list[tuple[Video, IngestResult]],
+        metadata: dict[str, VideoMetadata],
+        report: IngestReport,
+    ) -> None:
+        service.session.add_all([video for video, _ in batch])
+        for video, _ in batch:
+            service.store_video_metadata(video.id, metadata.pop(video.id))
+            service.record_thumbnail(video.id)
+            service.record_package(video.id)
+        service.session.commit()
+        self.checkpoint.record([result for _, result in batch])
+
+        report.succeeded += len(batch)
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import enum
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, ParamSpec, TypeVar
+
+from src.core.transcripts import TimedTranslation, Transcriber
+from src.core.translations import (
+    Language,
+    StreamingTranslator,
+    TextTranslator,
+    Translation,
+    Translator,
+    TranslatorResponse,
+    TTSGenerator,
+)
+from src.core.videos import (
+    DubSegment,
+    MediaProcessor,
+    OCRGenerator,
+    ReaderStats,
+    Scene,
+    VideoMetadata,
+)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class Priority(enum.Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+current_priority: ContextVar[Priority] = ContextVar(
+    "current_priority", default=Priority.INTERACTIVE
+)
+current_client: ContextVar[str] = ContextVar("current_client", default="")
+
+
+@contextmanager
+def work_context(
+    client: str | None = None, priority: Priority | None = None
+) -> Iterator[None]:
+    client_token = current_client.set(client) if client is not None else None
+    priority_token = current_priority.set(priority) if priority is not None else None
+    try:
+        yield
+    finally:
+        if priority_token is not None:
+            current_priority.reset(priority_token)
+        if client_token is not None:
+            current_client.reset(client_token)
+
+
+@dataclass(eq=False)
+class _Ticket:
+    ready: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class Scheduler:
+    """
+    Runs calls on a fixed number of slots. Waiting calls are queued per
+    priority class and, within a class, per client. Classes share the slots
+    by weight (stride scheduling), so batch work keeps moving while
+    interactive requests are served first, and clients inside a class take
+    turns so one busy job can't hold everyone else back. A class whose
+    queue is full rejects new calls instead of letting them pile up, and a
+    call that waits longer than `max_wait_seconds` gives up the same way.
+    """
+
+    name: str
+    slots: int
+    weights: dict[Priority, int] = field(
+        default_factory=lambda: {Priority.INTERACTIVE: 8, Priority.BATCH: 1}
+    )
+    # Waiting calls hold a request thread each. AnyIO has 40, shared by the
+    # model and media schedulers and every other endpoint.
+    max_queued: dict[Priority, int] = field(
+        default_factory=lambda: {Priority.INTERACTIVE: 12, Priority.BATCH: 6}
+    )
+    max_wait_seconds: float = 60
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _running: int = field(default=0, init=False)
+    _queues: dict[Priority, OrderedDict[str, deque[_Ticket]]] = field(
+        default_factory=lambda: {p: OrderedDict() for p in Priority}, init=False
+    )
+    _queued: dict[Priority, int] = field(
+        default_factory=lambda: dict.fromkeys(Priority, 0), init=False
+    )
+    _passes: dict[Priority, float] = field(
+        default_factory=lambda: dict.fromkeys(Priority, 0.0), init=False
+    )
+    _virtual_time: float = field(default=0, init=False)
+    _service_seconds: float = field(default=1, init=False)
+
+    def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        self._acquire(current_priority.get(), current_client.get())
+        start = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release(time.monotonic() - start)
+
+    def stream(
+        self, fn: Callable[P, Iterable[T]], *args: P.args, **kwargs: P.kwargs
+    ) -> Iterator[T]:
+        """Like `run`, holding the slot until the stream is exhausted or closed."""
+        self._acquire(current_priority.get(), current_client.get())
+        start = time.monotonic()
+        try:
+            yield from fn(*args, **kwargs)
+        finally:
+            self._release(time.monotonic() - start)
+
+    def _acquire(self, priority: Priority, client: str) -> None:
+        with self._lock:
+            if self._running < self.slots and not any(self._queued.values()):
+                self._running += 1
+                return
+
+            if self._queued[priority] >= self.max_queued[priority]:
+                raise SchedulerOverloadedError(
+                    f"Too many {priority.value} {self.name} requests queued.",
+                    retry_after=self._retry_after(),
+                )
+
+            if not self._queued[priority]:
+                # An idle class doesn't bank credit for the time it was idle.
+                self._passes[priority] = max(self._passes[priority], self._virtual_time)
+
+            ticket = _Ticket()
+            self._queues[priority].setdefault(client, deque()).append(ticket)
+            self._queued[priority] += 1
+
+        # The releasing call hands its slot over directly.
+        if ticket.ready.wait(self.max_wait_seconds):
+            return
+
+        with self._lock:
+            # Handed over just as the wait ran out, the slot is ours.
+            if ticket.ready.is_set():
+                return
+
+            clients = self._queues[priority]
+            clients[client].remove(ticket)
+            if not clients[client]:
+                del clients[client]
+            self._queued[priority] -= 1
+
+            raise SchedulerOverloadedError(
+                f"Timed out waiting for a {self.name} slot.",
+                retry_after=self._retry_after(),
+            )
+
+    def _release(self, elapsed: float) -> None:
+        with self._lock:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * elapsed
+
+            ticket = self._next()
+            if ticket is None:
+                self._running -= 1
+            else:
+                ticket.ready.set()
+
+    def _next(self) -> _Ticket | None:
+        waiting = [p for p in Priority if self._queued[p]]
+        if not waiting:
+            return None
+
+        priority = min(waiting, key=lambda p: self._passes[p])
+        self._virtual_time = self._passes[priority]
+        self._passes[priority] += 1 / self.weights[priority]
+
+        clients = self._queues[priority]
+        client, tickets = next(iter(clients.items()))
+        ticket = tickets.popleft()
+        del clients[client]
+        if tickets:
+            clients[client] = tickets
+
+        self._queued[priority] -= 1
+        return ticket
+
+    def _retry_after(self) -> int:
+        queued = sum(self._queued.values())
+        return max(1, math.ceil(self._service_seconds * (queued + 1) / self.slots))
+
+
+@dataclass
+class ScheduledTranslator:
+    translator: Translator
+    scheduler: Scheduler
+
+    def translate(
+        self,
+        file: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> TranslatorResponse:
+        return self.scheduler.run(
+            self.translator.translate, file, from_language, to_language
+        )
+
+
+@dataclass
+class ScheduledStreamingTranslator:
+    translator: StreamingTranslator
+    scheduler: Scheduler
+
+    def translate_stream(
+        self,
+        file: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> Iterator[TranslatorResponse]:
+        return self.scheduler.stream(
+            self.translator.translate_stream, file, from_language, to_language
+        )
+
+
+@dataclass
+class ScheduledTextTranslator:
+    translator: TextTranslator
+    scheduler: Scheduler
+
+    def translate_text(
+        self,
+        text: str,
+        from_language: Language,
+        to_languages: list[Language],
+    ) -> dict[Language, str]:
+        return self.scheduler.run(
+            self.translator.translate_text, text, from_language, to_languages
+        )
+
+
+@dataclass
+class ScheduledTranscriber:
+    transcriber: Transcriber
+    scheduler: Scheduler
+
+    def transcribe(
+        self,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[TimedTranslation]:
+        return self.scheduler.run(
+            self.transcriber.transcribe, audio, from_language, to_language
+        )
+
+
+@dataclass
+class ScheduledOCRGenerator:
+    ocr: OCRGenerator
+    scheduler: Scheduler
+
+    def generate_ocr(self, image: Path) -> str:
+        return self.scheduler.run(self.ocr.generate_ocr, image)
+
+
+@dataclass
+class ScheduledTTSGenerator:
+    tts: TTSGenerator
+    scheduler: Scheduler
+
+    def text_to_speech(self, translation: Translation) -> bytes:
+        return self.scheduler.run(self.tts.text_to_speech, translation)
+
+
+@dataclass
+class ScheduledMediaProcessor:
+    media: MediaProcessor
+    scheduler: Scheduler
+
+    def probe(self, video: Path) -> VideoMetadata:
+        return self.scheduler.run(self.media.probe, video)
+
+    def extract_audio(
+        self,
+        video: Path,
+        from_seconds: float,
+        to_seconds: float,
+        output: Path,
+    ) -> None:
+        self.scheduler.run(
+            self.media.extract_audio, video, from_seconds, to_seconds, output
+        )
+
+    def grab_frame(
+        self,
+        video: Path,
+        at_seconds: float,
+        output: Path,
+        index: Path | None = None,
+    ) -> None:
+        self.scheduler.run(self.media.grab_frame, video, at_seconds, output, index)
+
+    def index(self, video: Path, output: Path) -> None:
+        self.scheduler.run(self.media.index, video, output)
+
+    def waveform(self, video: Path, output: Path) -> None:
+        self.scheduler.run(self.media.waveform, video, output)
+
+    def dub(self, video: Path, segments: list[DubSegment], output: Path) -> None:
+        self.scheduler.run(self.media.dub, video, segments, output)
+
+    def scenes(self, video: Path) -> list[Scene]:
+        return self.scheduler.run(self.media.scenes, video)
+
+    def package(self, video: Path, output: Path) -> None:
+        self.scheduler.run(self.media.package, video, output)
+
+    def reader_stats(self) -> ReaderStats:
+        return self.media.reader_stats()
+
+    def close(self) -> None:
+        self.media.close()
+
+
+class SchedulerOverloadedError(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
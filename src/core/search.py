@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import enum
+from dataclasses import dataclass
+from typing import Protocol
+
+
+class SearchHitKind(enum.Enum):
+    TRANSLATION = "translation"
+    UTTERANCE = "utterance"
+    VIDEO = "video"
+
+
+@dataclass
+class SearchHit:
+    kind: SearchHitKind
+    id: str
+    video_id: str
+    from_seconds: float | None
+    to_seconds: float | None
+    snippet: str
+    rank: float
+
+
+class Searcher(Protocol):
+    def search(self, query: str, limit: int, offset: int) -> list[SearchHit]: ...
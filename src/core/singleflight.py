@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Protocol, TypeVar
+
+from sqlalchemy import Float, String, event
+from sqlalchemy.orm import Mapped, Session, SessionTransaction, mapped_column
+
+from src.core import Base
+
+T = TypeVar("T")
+
+# Key in `Session.info` of the flights that end with its transaction.
+PENDING_FLIGHTS = "single_flight_pending"
+
+
+class Lease(Base):
+    """Marks a key as being computed by some worker until it expires."""
+
+    __tablename__ = "leases"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    owner: Mapped[str] = mapped_column(String, nullable=False)
+    expires_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class Leases(Protocol):
+    def acquire(self, key: str, seconds: float) -> bool: ...
+
+    def release(self, key: str) -> None: ...
+
+
+@dataclass
+class _Flight:
+    session: Session | None
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+
+
+@dataclass
+class SingleFlight:
+    """
+    Lets concurrent identical operations share one execution. The first
+    caller for a key computes, the others wait for it and then `lookup` the
+    result themselves, since it belongs to the leader's session. When the
+    leader passes its session the flight only ends once that transaction
+    does, so followers see committed rows. With `leases` the same holds
+    across workers: the leader holds a lease while the others poll it.
+
+    Followers therefore wait for the leader's whole transaction, up to
+    `wait_seconds`, after which they compute on their own. Leaders that pass
+    their session should make their slow calls before writing and commit
+    soon after.
+    """
+
+    leases: Leases | None = None
+    lease_seconds: float = 120
+    wait_seconds: float = 300
+    poll_seconds: float = 0.2
+
+    _flights: dict[str, _Flight] = field(default_factory=dict, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def do(
+        self,
+        key: str,
+        compute: Callable[[], T],
+        lookup: Callable[[], T | None],
+        session: Session | None = None,
+    ) -> T:
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if flight is None:
+                    flight = self._flights[key] = _Flight(session)
+
+            if leader:
+                return self._lead(key, flight, compute, lookup)
+            if session is not None and flight.session is session:
+                # Our own flight, its result is already visible to us.
+                found = lookup()
+                return compute() if found is None else found
+
+            if not flight.done.wait(self.wait_seconds):
+                return compute()
+            if flight.error is not None:
+                raise flight.error
+
+            found = lookup()
+            if found is not None:
+                return found
+            # The leader's transaction was rolled back, try again.
+
+    def _lead(
+        self,
+        key: str,
+        flight: _Flight,
+        compute: Callable[[], T],
+        lookup: Callable[[], T | None],
+    ) -> T:
+        try:
+            if self._wait_for_lease(key):
+                found = lookup()
+                if found is not None:
+                    self._finish(key, flight)
+                    return found
+
+            result = compute()
+        except BaseException as e:
+            flight.error = e
+            self._finish(key, flight)
+            raise
+
+        if flight.session is None or not flight.session.in_transaction():
+            self._finish(key, flight)
+            return result
+
+        # Listeners can't be removed while the event is dispatched, so each
+        # session gets one that finishes whatever flights it has pending.
+        flight.session.info.setdefault(PENDING_FLIGHTS, []).append(
+            partial(self._finish, key, flight)
+        )
+        if not event.contains(flight.session, "after_transaction_end", _finish_pending):
+            event.listen(flight.session, "after_transaction_end", _finish_pending)
+        return result
+
+    def _wait_for_lease(self, key: str) -> bool:
+        """Returns whether another worker held the lease before us."""
+        if self.leases is None:
+            return False
+
+        waited = False
+        deadline = time.monotonic() + self.wait_seconds
+        while not self.leases.acquire(key, self.lease_seconds):
+            if time.monotonic() > deadline:
+                break
+            waited = True
+            time.sleep(self.poll_seconds)
+
+        return waited
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self.leases is not None:
+            self.leases.release(key)
+
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.done.set()
+
+
+def _finish_pending(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        for finish in session.info.pop(PENDING_FLIGHTS, []):
+            finish()
+
+
+def flight_key(operation: str, *inputs: Any) -> str:
+    return ":".join([operation, *(str(i) for i in inputs)])
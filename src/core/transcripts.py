@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import math
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Protocol
+
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, String, func, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.core import Base
+from src.core.singleflight import SingleFlight, flight_key
+from src.core.translations import Language, Translation
+from src.core.videos import Video, VideoService
+
+
+class Utterance(Base):
+    __tablename__ = "utterances"
+    __table_args__ = (
+        Index(
+            "ix_utterances_interval",
+            "video_id",
+            "from_language",
+            "to_language",
+            "from_seconds",
+            "to_seconds",
+        ),
+    )
+
+    video_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("videos.id"),
+        nullable=False,
+    )
+    from_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    to_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    from_language: Mapped[Language] = mapped_column(Enum(Language), nullable=False)
+    to_language: Mapped[Language] = mapped_column(Enum(Language), nullable=False)
+    original_text: Mapped[str] = mapped_column(String, nullable=False)
+    translated_text: Mapped[str] = mapped_column(String, nullable=False)
+
+    id: Mapped[str] = mapped_column(
+        String, primary_key=True, default_factory=lambda: str(uuid.uuid4())
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        init=False,
+    )
+
+
+class TranscriptCoverage(Base):
+    """A time range of a video that has already been sent to the model."""
+
+    __tablename__ = "transcript_coverage"
+    __table_args__ = (
+        Index(
+            "ix_transcript_coverage_interval",
+            "video_id",
+            "from_language",
+            "to_language",
+            "from_seconds",
+        ),
+    )
+
+    video_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("videos.id"),
+        nullable=False,
+    )
+    from_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    to_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    from_language: Mapped[Language] = mapped_column(Enum(Language), nullable=False)
+    to_language: Mapped[Language] = mapped_column(Enum(Language), nullable=False)
+
+    id: Mapped[str] = mapped_column(
+        String, primary_key=True, default_factory=lambda: str(uuid.uuid4())
+    )
+
+
+@dataclass
+class TranscriptService:
+    """
+    Transcribes a video in fixed windows and answers arbitrary segment
+    requests from the stored utterances. Windows are aligned to multiples of
+    `window_seconds`, so overlapping requests land on the same windows and
+    each stretch of speech is only sent to the model once.
+    """
+
+    session: Session
+    video_service: VideoService
+    transcriber: Transcriber
+
+    window_seconds: float = 300
+    flights: SingleFlight = field(default_factory=SingleFlight)
+
+    def transcribe_video(
+        self,
+        video_id: str,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Utterance]:
+        video = self.video_service.get_video(video_id)
+        duration = self._duration(video)
+        self._cover(video, 0, duration, duration, from_language, to_language)
+        return self.get_utterances(video.id, 0, duration, from_language, to_language)
+
+    def translate_segment(
+        self,
+        video_id: str,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> Translation:
+        if from_seconds < 0 or to_seconds < from_seconds:
+            raise ValueError("Invalid audio segment range provided.")
+
+        video = self.video_service.get_video(video_id)
+        duration = self._duration(video)
+        to_seconds = min(to_seconds, duration)
+        if from_seconds >= to_seconds:
+            raise ValueError(
+                f"Requested audio segment start ({from_seconds}s) "
+                f"is beyond video duration ({duration}s)."
+            )
+
+        self._cover(
+            video, from_seconds, to_seconds, duration, from_language, to_language
+        )
+
+        utterances = self.get_utterances(
+            video.id, from_seconds, to_seconds, from_language, to_language
+        )
+        translation = Translation(
+            video.id,
+            from_seconds,
+            to_seconds,
+            from_language,
+            to_language,
+            " ".join(u.original_text for u in utterances),
+            " ".join(u.translated_text for u in utterances),
+        )
+
+        self.session.add(translation)
+        self.session.flush()
+        return translation
+
+    def get_utterances(
+        self,
+        video_id: str,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Utterance]:
+        return list(
+            self.session.scalars(
+                select(Utterance)
+                .where(
+                    Utterance.video_id == video_id,
+                    Utterance.from_language == from_language,
+                    Utterance.to_language == to_language,
+                    Utterance.from_seconds < to_seconds,
+                    Utterance.to_seconds > from_seconds,
+                )
+                .order_by(Utterance.from_seconds)
+            ).all()
+        )
+
+    def _cover(
+        self,
+        video: Video,
+        from_seconds: float,
+        to_seconds: float,
+        duration: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> None:
+        # Every window is sent to the model before the first row is written,
+        # so the database isn't write-locked while waiting on it.
+        rows: list[Utterance | TranscriptCoverage] = []
+        first = math.floor(from_seconds / self.window_seconds)
+        last = math.ceil(to_seconds / self.window_seconds)
+
+        for window in range(first, max(last, first + 1)):
+            start = window * self.window_seconds
+            end = min(start + self.window_seconds, duration)
+            if start >= end:
+                break
+
+            rows.extend(
+                self._cover_window(video, start, end, from_language, to_language)
+            )
+
+        self.session.add_all(rows)
+        self.session.flush()
+
+    def _cover_window(
+        self,
+        video: Video,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Utterance | TranscriptCoverage]:
+        """The rows still to be written for the window, none if it's covered."""
+
+        def transcribe() -> list[Utterance | TranscriptCoverage]:
+            rows: list[Utterance | TranscriptCoverage] = []
+            for gap_start, gap_end in self._gaps(
+                video.id, from_seconds, to_seconds, from_language, to_language
+            ):
+                rows.extend(
+                    self._transcribe(
+                        video, gap_start, gap_end, from_language, to_language
+                    )
+                )
+            return rows
+
+        def covered() -> list[Utterance | TranscriptCoverage] | None:
+            gaps = self._gaps(
+                video.id, from_seconds, to_seconds, from_language, to_language
+            )
+            return None if gaps else []
+
+        # Concurrent requests for the same window wait for one transcription.
+        return self.flights.do(
+            flight_key(
+                "transcribe",
+                video.id,
+                from_language.value,
+                to_language.value,
+                from_seconds,
+            ),
+            transcribe,
+            covered,
+            self.session,
+        )
+
+    def _gaps(
+        self,
+        video_id: str,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[tuple[float, float]]:
+        covered = self.session.execute(
+            select(TranscriptCoverage.from_seconds, TranscriptCoverage.to_seconds)
+            .where(
+                TranscriptCoverage.video_id == video_id,
+                TranscriptCoverage.from_language == from_language,
+                TranscriptCoverage.to_language == to_language,
+                TranscriptCoverage.from_seconds < to_seconds,
+                TranscriptCoverage.to_seconds > from_seconds,
+            )
+            .order_by(TranscriptCoverage.from_seconds)
+        ).all()
+
+        gaps = []
+        cursor = from_seconds
+        for start, end in covered:
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < to_seconds:
+            gaps.append((cursor, to_seconds))
+
+        return gaps
+
+    def _transcribe(
+        self,
+        video: Video,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Utterance | TranscriptCoverage]:
+        with self.video_service.extract_audio_segment(
+            video.id,
+            video.video_type,
+            from_seconds,
+            to_seconds,
+        ) as audio:
+            segments = self.transcriber.transcribe(audio, from_language, to_language)
+
+        rows: list[Utterance | TranscriptCoverage] = []
+        for segment in segments:
+            start = min(from_seconds + segment.from_seconds, to_seconds)
+            end = min(from_seconds + segment.to_seconds, to_seconds)
+            rows.append(
+                Utterance(
+                    video.id,
+                    start,
+                    max(start, end),
+                    from_language,
+                    to_language,
+                    segment.original_text,
+                    segment.translated_text,
+                )
+            )
+
+        rows.append(
+            TranscriptCoverage(
+                video.id,
+                from_seconds,
+                to_seconds,
+                from_language,
+                to_language,
+            )
+        )
+        return rows
+
+    def _duration(self, video: Video) -> float:
+        return self.video_service.extract_video_metadata(
+            video.id, video.video_type
+        ).duration_sec
+
+
+@dataclass
+class TimedTranslation:
+    """Times are relative to the start of the transcribed audio."""
+
+    from_seconds: float
+    to_seconds: float
+    original_text: str
+    translated_text: str
+
+
+class Transcriber(Protocol):
+    def transcribe(
+        self,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[TimedTranslation]: ...
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import enum
+import os
 import uuid
 import wave
-from dataclasses import dataclass
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import BinaryIO, Protocol
 
@@ -12,12 +17,20 @@ from sqlalchemy import DateTime, Enum, Float, ForeignKey, String, func, select
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from src.core import Base
-from src.core.videos import VideoService, VideoType
+from src.core.artifacts import Artifact, ArtifactKind, ArtifactService
+from src.core.singleflight import SingleFlight, flight_key
+from src.core.videos import DubSegment, VideoService, VideoType
 
 
 class Language(enum.Enum):
     ENGLISH = "English"
     SPANISH = "Spanish"
+    FRENCH = "French"
+    GERMAN = "German"
+    ITALIAN = "Italian"
+    PORTUGUESE = "Portuguese"
+    JAPANESE = "Japanese"
+    CHINESE = "Chinese"
 
 
 class Translation(Base):
@@ -65,12 +78,58 @@ class Translation(Base):
     )
 
 
+class SourceTranscript(Base):
+    """The original text of a segment, shared by the translations made from it."""
+
+    __tablename__ = "source_transcripts"
+
+    video_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("videos.id"),
+        nullable=False,
+        index=True,
+    )
+    from_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    to_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    from_language: Mapped[Language] = mapped_column(Enum(Language), nullable=False)
+    text: Mapped[str] = mapped_column(String, nullable=False)
+
+    id: Mapped[str] = mapped_column(
+        String, primary_key=True, default_factory=lambda: str(uuid.uuid4())
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        init=False,
+    )
+
+
+class TranslationSource(Base):
+    __tablename__ = "translation_sources"
+
+    translation_id: Mapped[str] = mapped_column(
+        String, ForeignKey("translations.id"), primary_key=True
+    )
+    source_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("source_transcripts.id"),
+        nullable=False,
+        index=True,
+    )
+
+
 @dataclass
 class TranslationService:
     session: Session
     video_service: VideoService
     translator: Translator
     tts: TTSGenerator
+    flights: SingleFlight = field(default_factory=SingleFlight)
+    streaming_translator: StreamingTranslator | None = None
+    text_translator: TextTranslator | None = None
+    # Target languages asked for in one text translation call.
+    max_languages_per_call: int = 8
 
     def get_translations(self) -> list[Translation]:
         return list(self.session.scalars(select(Translation)).all())
@@ -96,21 +155,142 @@ class TranslationService:
 
     def generate_speech_for_translation(self, translation_id: str) -> Translation:
         translation = self.get_translation(translation_id)
-        wave_file = Path(f"data/speeches/{translation.id}.wav")
+        wave_file = _speech_path(translation)
+
+        def speak() -> Translation:
+            # Audio from before artifacts were tracked is registered, not paid
+            # for again.
+            if not wave_file.exists():
+                _write_speech(wave_file, self.tts.text_to_speech(translation))
+            self._record_speech(translation)
+            return translation
+
+        # A concurrent identical request shares the audio instead of paying
+        # for it twice.
+        return self.flights.do(
+            flight_key("tts", translation.id),
+            speak,
+            lambda: translation if wave_file.exists() else None,
+        )
 
-        if wave_file.exists():
-            raise TTSError("Audio for that translation already exists.")
+    def get_speech_path(self, translation_id: str) -> Path:
+        translation = self.get_translation(translation_id)
+        wave_file = _speech_path(translation)
+        if not wave_file.exists():
+            # Only audio evicted to save space is paid for again on a read.
+            if not ArtifactService(session=self.session).was_evicted(wave_file):
+                raise SpeechNotFoundError(
+                    f"Translation {translation_id} has no speech yet."
+                )
+            self.generate_speech_for_translation(translation_id)
+        return wave_file
+
+    def has_speech(self, translation_id: str) -> bool:
+        return (
+            self.session.scalars(
+                select(Artifact.path)
+                .where(
+                    Artifact.kind == ArtifactKind.SPEECH,
+                    Artifact.owner_id == translation_id,
+                )
+                .limit(1)
+            ).first()
+            is not None
+        )
 
-        data = self.tts.text_to_speech(translation)
+    def generate_speech_for_video(
+        self, video_id: str, workers: int = 4
+    ) -> SpeechReport:
+        return self._generate_speech(self.get_translations_by_video(video_id), workers)
 
-        # Values from google docs
-        with wave.open(str(wave_file), "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(24000)
-            wf.writeframes(data)
+    def generate_speech_for_translations(
+        self, translation_ids: list[str], workers: int = 4
+    ) -> SpeechReport:
+        translations = list(
+            self.session.scalars(
+                select(Translation).where(Translation.id.in_(translation_ids))
+            ).all()
+        )
+        found = {translation.id for translation in translations}
 
-        return translation
+        report = self._generate_speech(translations, workers)
+        report.results.extend(
+            SpeechResult(translation_id, SpeechStatus.NOT_FOUND)
+            for translation_id in dict.fromkeys(translation_ids)
+            if translation_id not in found
+        )
+        return report
+
+    def _generate_speech(
+        self, translations: list[Translation], workers: int
+    ) -> SpeechReport:
+        report, written = self._synthesize(translations, workers)
+        for translation in written:
+            self._record_speech(translation)
+        return report
+
+    def _synthesize(
+        self, translations: list[Translation], workers: int
+    ) -> tuple[SpeechReport, list[Translation]]:
+        """
+        Synthesizes speech for every translation that has none yet. The same
+        text in the same language is only synthesized once and the audio is
+        written for each translation that shares it. Returns the translations
+        whose audio was written; recording them is left to the caller, so the
+        database isn't write-locked while the synthesis runs.
+        """
+        report = SpeechReport()
+        written: list[Translation] = []
+        pending: dict[tuple[Language, str], list[Translation]] = {}
+
+        for translation in translations:
+            if _speech_path(translation).exists():
+                report.results.append(SpeechResult(translation.id, SpeechStatus.EXISTS))
+                continue
+
+            key = (translation.to_language, translation.translated_text)
+            pending.setdefault(key, []).append(translation)
+
+        if not pending:
+            return report, written
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Each call carries the caller's context, e.g. its priority.
+            futures: dict[Future[bytes], list[Translation]] = {
+                executor.submit(
+                    copy_context().run, self.tts.text_to_speech, group[0]
+                ): group
+                for group in pending.values()
+            }
+
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    data = future.result()
+                # Whatever one synthesis raises (API errors, a full queue),
+                # the others are already paid for and still get written.
+                except Exception as e:
+                    report.results.extend(
+                        SpeechResult(t.id, SpeechStatus.FAILED, str(e)) for t in group
+                    )
+                    continue
+
+                for i, translation in enumerate(group):
+                    _write_speech(_speech_path(translation), data)
+                    written.append(translation)
+                    report.results.append(
+                        SpeechResult(
+                            translation.id,
+                            SpeechStatus.GENERATED if i == 0 else SpeechStatus.SHARED,
+                        )
+                    )
+
+        return report, written
+
+    def _record_speech(self, translation: Translation) -> None:
+        ArtifactService(session=self.session).record(
+            _speech_path(translation), ArtifactKind.SPEECH
+        )
 
     def translate_audio_segment(
         self,
@@ -121,19 +301,303 @@ class TranslationService:
         from_language: Language,
         to_language: Language,
     ) -> Translation:
-        audio = self.video_service.extract_audio_segment(
+        return self.translate_audio_segments(
             video_id,
             video_type,
-            from_seconds,
-            to_seconds,
-        )
-
-        response = self.translator.translate(
-            audio,
+            [(from_seconds, to_seconds)],
             from_language,
             to_language,
+        )[0]
+
+    def translate_audio_segments(
+        self,
+        video_id: str,
+        video_type: VideoType,
+        segments: list[tuple[float, float]],
+        from_language: Language,
+        to_language: Language,
+    ) -> list[Translation]:
+        """
+        Every segment is sent to the model before the first row is written,
+        so the database isn't write-locked while waiting on it.
+        """
+
+        def translate(from_seconds: float, to_seconds: float) -> Translation:
+            with self.video_service.extract_audio_segment(
+                video_id,
+                video_type,
+                from_seconds,
+                to_seconds,
+            ) as audio:
+                response = self.translator.translate(
+                    audio,
+                    from_language,
+                    to_language,
+                )
+
+            return Translation(
+                video_id,
+                from_seconds,
+                to_seconds,
+                from_language,
+                to_language,
+                response.original_text,
+                response.translated_text,
+            )
+
+        def latest(from_seconds: float, to_seconds: float) -> Translation | None:
+            return self.session.scalars(
+                select(Translation)
+                .where(
+                    Translation.video_id == video_id,
+                    Translation.from_seconds == from_seconds,
+                    Translation.to_seconds == to_seconds,
+                    Translation.from_language == from_language,
+                    Translation.to_language == to_language,
+                )
+                .order_by(Translation.created_at.desc())
+                .limit(1)
+            ).one_or_none()
+
+        translations = [
+            self.flights.do(
+                flight_key(
+                    "translate",
+                    video_id,
+                    from_seconds,
+                    to_seconds,
+                    from_language.value,
+                    to_language.value,
+                ),
+                partial(translate, from_seconds, to_seconds),
+                partial(latest, from_seconds, to_seconds),
+                self.session,
+            )
+            for from_seconds, to_seconds in segments
+        ]
+
+        self.session.add_all(translations)
+        self.session.flush()
+        return translations
+
+    def render_dub(
+        self, video_id: str, to_language: Language, workers: int = 4
+    ) -> Path:
+        """
+        Renders the video with its `to_language` translations spoken over the
+        original audio. Speech that is still missing is generated first.
+        """
+        video = self.video_service.get_video(video_id)
+
+        # A segment translated more than once is dubbed with the latest.
+        segments: dict[tuple[float, float], Translation] = {}
+        for translation in self.session.scalars(
+            select(Translation)
+            .where(
+                Translation.video_id == video_id,
+                Translation.to_language == to_language,
+            )
+            .order_by(Translation.created_at.desc())
+        ):
+            segments.setdefault(
+                (translation.from_seconds, translation.to_seconds), translation
+            )
+        if not segments:
+            raise TranslationNotFoundError(
+                f"Video {video_id} has no translations to {to_language.value}."
+            )
+
+        translations = list(segments.values())
+        _, written = self._synthesize(translations, workers)
+        spoken = [
+            DubSegment(_speech_path(t), t.from_seconds, t.to_seconds)
+            for t in translations
+            if _speech_path(t).exists()
+        ]
+        if not spoken:
+            raise TTSError("Couldn't generate speech for any segment.")
+
+        output = Path(f"data/dubs/{video_id}.{to_language.name.lower()}.mp4")
+        dub = self.flights.do(
+            flight_key("dub", video_id, to_language.value),
+            lambda: self.video_service.render_dub(
+                video.id, video.video_type, spoken, output
+            ),
+            lambda: output if output.is_file() else None,
         )
 
+        # Recorded after the render, which runs for minutes and mustn't hold
+        # the write lock.
+        for translation in written:
+            self._record_speech(translation)
+        return dub
+
+    def translate_audio_segment_many(
+        self,
+        video_id: str,
+        video_type: VideoType,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_languages: list[Language],
+    ) -> list[Translation]:
+        """
+        Translates a segment into several languages with a single audio
+        upload: the first language comes with the transcript, the others are
+        translated from that text in batches.
+        """
+        to_languages = list(dict.fromkeys(to_languages))
+        if not to_languages:
+            raise ValueError("At least one target language is required.")
+
+        def translate() -> list[Translation]:
+            with self.video_service.extract_audio_segment(
+                video_id,
+                video_type,
+                from_seconds,
+                to_seconds,
+            ) as audio:
+                response = self.translator.translate(
+                    audio,
+                    from_language,
+                    to_languages[0],
+                )
+
+            translated = {to_languages[0]: response.translated_text}
+            translated.update(
+                self._translate_text(
+                    response.original_text, from_language, to_languages[1:]
+                )
+            )
+
+            source = SourceTranscript(
+                video_id,
+                from_seconds,
+                to_seconds,
+                from_language,
+                response.original_text,
+            )
+            self.session.add(source)
+
+            translations = []
+            for to_language in to_languages:
+                translation = Translation(
+                    video_id,
+                    from_seconds,
+                    to_seconds,
+                    from_language,
+                    to_language,
+                    source.text,
+                    translated[to_language],
+                )
+                self.session.add(translation)
+                self.session.add(TranslationSource(translation.id, source.id))
+                translations.append(translation)
+
+            self.session.flush()
+            return translations
+
+        def latest() -> list[Translation] | None:
+            source = self.session.scalars(
+                select(SourceTranscript)
+                .where(
+                    SourceTranscript.video_id == video_id,
+                    SourceTranscript.from_seconds == from_seconds,
+                    SourceTranscript.to_seconds == to_seconds,
+                    SourceTranscript.from_language == from_language,
+                )
+                .order_by(SourceTranscript.created_at.desc())
+                .limit(1)
+            ).one_or_none()
+            if source is None:
+                return None
+
+            by_language = {
+                t.to_language: t
+                for t in self.session.scalars(
+                    select(Translation)
+                    .join(TranslationSource)
+                    .where(TranslationSource.source_id == source.id)
+                )
+            }
+            if not all(language in by_language for language in to_languages):
+                return None
+            return [by_language[language] for language in to_languages]
+
+        return self.flights.do(
+            flight_key(
+                "translate-many",
+                video_id,
+                from_seconds,
+                to_seconds,
+                from_language.value,
+                *sorted(language.value for language in to_languages),
+            ),
+            translate,
+            latest,
+            self.session,
+        )
+
+    def _translate_text(
+        self,
+        text: str,
+        from_language: Language,
+        to_languages: list[Language],
+    ) -> dict[Language, str]:
+        if not to_languages:
+            return {}
+        if self.text_translator is None:
+            raise TranslatorError("Text translation is not available.")
+
+        translated: dict[Language, str] = {}
+        for i in range(0, len(to_languages), self.max_languages_per_call):
+            batch = to_languages[i : i + self.max_languages_per_call]
+            response = self.text_translator.translate_text(text, from_language, batch)
+
+            missing = [language.value for language in batch if language not in response]
+            if missing:
+                raise TranslatorError(
+                    f"Model left out translations to {', '.join(missing)}."
+                )
+            translated.update(response)
+
+        return translated
+
+    def stream_audio_segment_translation(
+        self,
+        video_id: str,
+        video_type: VideoType,
+        from_seconds: float,
+        to_seconds: float,
+        from_language: Language,
+        to_language: Language,
+    ) -> Iterator[TranslationUpdate]:
+        """
+        Yields the translation as it grows. The last update carries the saved
+        row, which is only added once the model has finished.
+        """
+        if self.streaming_translator is None:
+            raise TranslatorError("Streaming translation is not available.")
+
+        response = None
+        with self.video_service.extract_audio_segment(
+            video_id,
+            video_type,
+            from_seconds,
+            to_seconds,
+        ) as audio:
+            for response in self.streaming_translator.translate_stream(
+                audio,
+                from_language,
+                to_language,
+            ):
+                yield TranslationUpdate(
+                    response.original_text, response.translated_text
+                )
+
+        if response is None:
+            raise TranslatorError("Can't translate audio clip currently")
+
         translation = Translation(
             video_id,
             from_seconds,
@@ -143,16 +607,70 @@ class TranslationService:
             response.original_text,
             response.translated_text,
         )
-
         self.session.add(translation)
         self.session.flush()
-        return translation
+
+        yield TranslationUpdate(
+            translation.original_text, translation.translated_text, translation
+        )
+
+
+@dataclass
+class TranslationUpdate:
+    original_text: str
+    translated_text: str
+    translation: Translation | None = None
 
 
 class TranslationNotFoundError(Exception):
     pass
 
 
+class SpeechNotFoundError(Exception):
+    pass
+
+
+class SpeechStatus(enum.Enum):
+    GENERATED = "generated"
+    SHARED = "shared"
+    EXISTS = "exists"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
+
+
+@dataclass
+class SpeechResult:
+    translation_id: str
+    status: SpeechStatus
+    error: str | None = None
+
+
+@dataclass
+class SpeechReport:
+    results: list[SpeechResult] = field(default_factory=list)
+
+    def count(self, status: SpeechStatus) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+
+def _speech_path(translation: Translation) -> Path:
+    return Path(f"data/speeches/{translation.id}.wav")
+
+
+def _write_speech(path: Path, data: bytes) -> None:
+    # Written aside and renamed so a half written file never looks finished.
+    tmp = path.with_suffix(".tmp")
+
+    # Values from google docs
+    with wave.open(str(tmp), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(24000)
+        wf.writeframes(data)
+
+    os.replace(tmp, path)
+
+
 @dataclass
 class TranslatorResponse:
     original_text: str
@@ -168,6 +686,25 @@ class Translator(Protocol):
     ) -> TranslatorResponse: ...
 
 
+class StreamingTranslator(Protocol):
+    # Yields the text so far as it arrives, the last response is complete.
+    def translate_stream(
+        self,
+        file: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> Iterator[TranslatorResponse]: ...
+
+
+class TextTranslator(Protocol):
+    def translate_text(
+        self,
+        text: str,
+        from_language: Language,
+        to_languages: list[Language],
+    ) -> dict[Language, str]: ...
+
+
 class TTSGenerator(Protocol):
     def text_to_speech(self, translation: Translation) -> bytes: ...
 
@@ -2,21 +2,41 @@ from __future__ import annotations
 
 import enum
 import io
+import logging
+import os
+import shutil
 import tempfile
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import BinaryIO, Protocol
 
-import numpy as np
-import numpy.typing as npt
-from moviepy import VideoFileClip
-from PIL import Image
-from sqlalchemy import DateTime, Enum, String, desc, func, select
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    desc,
+    func,
+    select,
+)
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from src.core import Base
+from src.core.artifacts import (
+    TEMP_AUDIO_PREFIX,
+    Artifact,
+    ArtifactKind,
+    ArtifactService,
+)
+from src.core.singleflight import SingleFlight, flight_key
+
+HLS_PLAYLIST = "index.m3u8"
+
+logger = logging.getLogger(__name__)
 
 
 class VideoType(enum.Enum):
@@ -52,26 +72,94 @@ class VideoMetadata:
     height: int
 
 
+class VideoMetadataRecord(Base):
+    """Probed metadata, stored so listings don't have to open every file."""
+
+    __tablename__ = "video_metadata"
+
+    video_id: Mapped[str] = mapped_column(
+        String, ForeignKey("videos.id"), primary_key=True
+    )
+    duration_sec: Mapped[float] = mapped_column(Float, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+@dataclass
+class DubSegment:
+    speech: Path
+    from_seconds: float
+    to_seconds: float
+
+
+@dataclass
+class Scene:
+    from_seconds: float
+    to_seconds: float
+    # The frame that looks most like the rest of the scene.
+    keyframe_seconds: float
+
+
+@dataclass
+class ReaderStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    open_readers: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
 @dataclass
 class VideoService:
     session: Session
     video_downloader: VideoDownloader
     ocr: OCRGenerator
+    media: MediaProcessor
+
+    # Segments up to this size are kept in memory, larger ones stay on disk.
+    audio_spool_max_bytes: int = 8 * 1024 * 1024
+    flights: SingleFlight = field(default_factory=SingleFlight)
 
     def get_videos(self) -> list[Video]:
         return list(self.session.scalars(select(Video)).all())
 
     def add_video(self, video: Video) -> Video:
+        self.download_video(video)
+        self.session.add(video)
+        self.session.flush()
+        self.index_video(video.id, video.video_type)
+        self.generate_thumbnail(video)
+        self.record_thumbnail(video.id)
+        return self.get_video(video.id)
+
+    def download_video(self, video: Video) -> None:
         self.video_downloader.download_video(
             url=video.original_url,
             local_path=Path("data/videos"),
             video_id=video.id,
             video_type=video.video_type,
         )
-        self.session.add(video)
-        self.session.flush()
-        self.generate_thumbnail(video)
-        return self.get_video(video.id)
+
+    def remove_video_files(self, video_id: str, video_type: VideoType) -> None:
+        """Deletes what was written for a video that never got its row."""
+        video = Path(f"data/videos/{video_id}.{video_type.value}")
+        index = Path(f"data/indexes/{video_id}.idx")
+        for path in (
+            video,
+            video.with_name(f"{video.name}.part"),
+            index,
+            index.with_suffix(".tmp"),
+            Path(f"data/thumbnails/{video_id}.png"),
+        ):
+            path.unlink(missing_ok=True)
+
+        package = Path(f"data/hls/{video_id}")
+        for directory in (package, package.with_name(f"{package.name}.part")):
+            shutil.rmtree(directory, ignore_errors=True)
 
     def get_video(self, video_id: str) -> Video:
         video = self.session.scalars(
@@ -101,30 +189,118 @@ class VideoService:
         video_file_path = self._get_video_path(
             video_id=video.id, video_type=video.video_type
         )
-        video_clip = VideoFileClip(str(video_file_path))
-        np_frame: npt.NDArray[np.uint8] = video_clip.get_frame(0)  # pyright: ignore[reportAssignmentType]
-        thumbnail = Image.fromarray(np_frame, "RGB")
-        thumbnail.save(f"data/thumbnails/{video.id}.png")
+        thumbnail = Path(f"data/thumbnails/{video.id}.png")
+
+        def grab() -> Path:
+            self.media.grab_frame(
+                video_file_path,
+                0,
+                thumbnail,
+                index=self._get_index_path(video.id, video.video_type),
+            )
+            return thumbnail
+
+        self.flights.do(
+            flight_key("thumbnail", video.id),
+            grab,
+            lambda: thumbnail if thumbnail.is_file() else None,
+        )
+
+    def get_thumbnail_path(self, video: Video) -> Path:
+        thumbnail = Path(f"data/thumbnails/{video.id}.png")
+        if not thumbnail.is_file():
+            self.generate_thumbnail(video)
+            self.record_thumbnail(video.id)
+        return thumbnail
+
+    def record_thumbnail(self, video_id: str) -> None:
+        """Separate from generating it: ingest workers must not touch the session."""
+        thumbnail = Path(f"data/thumbnails/{video_id}.png")
+        if thumbnail.is_file():
+            ArtifactService(session=self.session).record(
+                thumbnail, ArtifactKind.THUMBNAIL
+            )
+
+    def has_thumbnail(self, video_id: str) -> bool:
+        return self._has_artifact(video_id, ArtifactKind.THUMBNAIL)
+
+    def has_package(self, video_id: str) -> bool:
+        return self._has_artifact(video_id, ArtifactKind.HLS)
+
+    def _has_artifact(self, video_id: str, kind: ArtifactKind) -> bool:
+        return (
+            self.session.scalars(
+                select(Artifact.path)
+                .where(Artifact.kind == kind, Artifact.owner_id == video_id)
+                .limit(1)
+            ).first()
+            is not None
+        )
 
     def generate_thumbnail_ocr(self, video_id: str) -> None:
         video = self.get_video(video_id)
-        thumbnail = Path(f"data/thumbnails/{video_id}.png")
-        ocr_text = self.ocr.generate_ocr(thumbnail)
-        video.thumbnail_ocr = ocr_text
-        self.session.flush()
+        # An evicted thumbnail is rebuilt first.
+        thumbnail = self.get_thumbnail_path(video)
+
+        def ocr() -> str:
+            video.thumbnail_ocr = self.ocr.generate_ocr(thumbnail)
+            self.session.flush()
+            return video.thumbnail_ocr
+
+        def stored() -> str | None:
+            self.session.refresh(video)
+            return video.thumbnail_ocr
+
+        self.flights.do(flight_key("ocr", video_id), ocr, stored, self.session)
 
     def extract_video_metadata(
         self, video_id: str, video_type: VideoType = VideoType.MP4
     ) -> VideoMetadata:
-        clip = VideoFileClip(self._get_video_path(video_id, video_type))
-        duration_seconds = clip.duration
-        width = clip.w
-        height = clip.h
-
-        return VideoMetadata(
-            duration_seconds,
-            width,
-            height,
+        stored = self._stored_video_metadata(video_id)
+        if stored:
+            return stored
+
+        def probe() -> VideoMetadata:
+            metadata = self.probe_video_metadata(video_id, video_type)
+            self.store_video_metadata(video_id, metadata)
+            return metadata
+
+        return self.flights.do(
+            flight_key("metadata", video_id),
+            probe,
+            lambda: self._stored_video_metadata(video_id),
+            self.session,
+        )
+
+    def extract_missing_video_metadata(self) -> None:
+        """Probes videos stored before their metadata was, e.g. at start-up."""
+        videos = self.session.scalars(
+            select(Video)
+            .outerjoin(VideoMetadataRecord)
+            .where(VideoMetadataRecord.video_id.is_(None))
+        ).all()
+
+        for video in videos:
+            try:
+                self.extract_video_metadata(video.id, video.video_type)
+            # One unreadable file mustn't keep the others from being probed;
+            # it stays out of listings until it can be.
+            except Exception:
+                logger.warning("Can't probe video %s.", video.id, exc_info=True)
+
+    def probe_video_metadata(
+        self, video_id: str, video_type: VideoType = VideoType.MP4
+    ) -> VideoMetadata:
+        return self.media.probe(self._get_video_path(video_id, video_type))
+
+    def store_video_metadata(self, video_id: str, metadata: VideoMetadata) -> None:
+        self.session.add(
+            VideoMetadataRecord(
+                video_id,
+                metadata.duration_sec,
+                metadata.width,
+                metadata.height,
+            )
         )
 
     def extract_audio_segment(
@@ -134,39 +310,131 @@ class VideoService:
         from_seconds: float,
         to_seconds: float,
     ) -> BinaryIO:
+        """The caller owns the returned file and must close it."""
         video_file_path = self._get_video_path(video_id=video_id, video_type=video_type)
 
         if from_seconds < 0 or to_seconds < from_seconds:
             raise ValueError("Invalid audio segment range provided.")
 
-        video_clip = VideoFileClip(str(video_file_path))
+        with tempfile.NamedTemporaryFile(
+            prefix=TEMP_AUDIO_PREFIX, suffix=".wav", delete=False
+        ) as temp_fp:
+            temp_audio_file = Path(temp_fp.name)
 
-        if to_seconds > video_clip.duration:
-            to_seconds = video_clip.duration
-            if from_seconds >= to_seconds:
-                video_clip.close()
-                raise ValueError(
-                    f"Requested audio segment start ({from_seconds}s) "
-                    f"is beyond video duration ({video_clip.duration}s)."
+        try:
+            self.media.extract_audio(
+                video_file_path,
+                from_seconds,
+                to_seconds,
+                temp_audio_file,
+            )
+            audio = open(temp_audio_file, "rb")  # noqa: SIM115
+        finally:
+            # An open file outlives its name, so nothing is left behind on disk
+            # once the caller closes it.
+            temp_audio_file.unlink(missing_ok=True)
+
+        if os.fstat(audio.fileno()).st_size > self.audio_spool_max_bytes:
+            return audio
+
+        with audio:
+            return io.BytesIO(audio.read())
+
+    def get_waveform_path(self, video_id: str, video_type: VideoType) -> Path:
+        waveform_path = Path(f"data/waveforms/{video_id}.peaks")
+        if waveform_path.is_file():
+            return waveform_path
+
+        def decode() -> Path:
+            # A flight that finished since the check above already wrote it.
+            if not waveform_path.is_file():
+                self.media.waveform(
+                    self._get_video_path(video_id, video_type), waveform_path
                 )
+            return waveform_path
 
-        audio_clip = video_clip.subclipped(from_seconds, to_seconds).audio
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_fp:
-            temp_audio_file = Path(temp_fp.name)
-        audio_clip.write_audiofile(
-            str(temp_audio_file), codec="pcm_s16le", fps=44100, logger=None
+        # Concurrent first requests share one decode of the audio track.
+        return self.flights.do(
+            flight_key("waveform", video_id),
+            decode,
+            lambda: waveform_path if waveform_path.is_file() else None,
         )
 
-        with open(temp_audio_file, "rb") as f:
-            output_buffer = io.BytesIO(f.read())
-
-        output_buffer.seek(0)
-
-        audio_clip.close()
-        video_clip.close()
+    def render_dub(
+        self,
+        video_id: str,
+        video_type: VideoType,
+        segments: list[DubSegment],
+        output: Path,
+    ) -> Path:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self.media.dub(self._get_video_path(video_id, video_type), segments, output)
+        return output
+
+    def package_video(self, video_id: str, video_type: VideoType) -> Path:
+        # The video file is rewritten, so this only runs before it is served.
+        package = Path(f"data/hls/{video_id}")
+
+        def remux() -> Path:
+            self.media.package(self._get_video_path(video_id, video_type), package)
+            # Moving the moov atom shifts every sample offset.
+            self.index_video(video_id, video_type)
+            return package
+
+        return self.flights.do(
+            flight_key("package", video_id),
+            remux,
+            lambda: package if (package / HLS_PLAYLIST).is_file() else None,
+        )
 
-        return output_buffer
+    def record_package(self, video_id: str) -> None:
+        """Like `record_thumbnail`, for packages made by ingest workers."""
+        package = Path(f"data/hls/{video_id}")
+        if (package / HLS_PLAYLIST).is_file():
+            ArtifactService(session=self.session).record(package, ArtifactKind.HLS)
+
+    def get_package_path(self, video_id: str) -> Path:
+        package = Path(f"data/hls/{video_id}")
+        if not (package / HLS_PLAYLIST).is_file():
+            raise VideoNotPackagedError(f"Video {video_id} has no HLS package.")
+        return package
+
+    def detect_scenes(self, video_id: str, video_type: VideoType) -> list[Scene]:
+        return self.media.scenes(self._get_video_path(video_id, video_type))
+
+    def get_keyframe_path(self, video: Video, number: int, at_seconds: float) -> Path:
+        keyframe = Path(f"data/keyframes/{video.id}/{number:04d}.png")
+        if not keyframe.is_file():
+            keyframe.parent.mkdir(parents=True, exist_ok=True)
+            self.media.grab_frame(
+                self._get_video_path(video.id, video.video_type),
+                at_seconds,
+                keyframe,
+                index=self._get_index_path(video.id, video.video_type),
+            )
+        return keyframe
+
+    def index_video(self, video_id: str, video_type: VideoType) -> Path | None:
+        index_path = Path(f"data/indexes/{video_id}.idx")
+        try:
+            self.media.index(self._get_video_path(video_id, video_type), index_path)
+        except MediaProcessingError:
+            # Unindexable files (e.g. fragmented MP4) are still served, just
+            # without the fast seek path.
+            return None
+        return index_path
+
+    def _stored_video_metadata(self, video_id: str) -> VideoMetadata | None:
+        record = self.session.get(VideoMetadataRecord, video_id)
+        if not record:
+            return None
+        return VideoMetadata(record.duration_sec, record.width, record.height)
+
+    def _get_index_path(self, video_id: str, video_type: VideoType) -> Path | None:
+        index_path = Path(f"data/indexes/{video_id}.idx")
+        if index_path.is_file():
+            return index_path
+        return self.index_video(video_id, video_type)
 
     def _get_video_path(self, video_id: str, video_type: VideoType) -> Path:
         video_file_path = Path(f"data/videos/{video_id}.{video_type.value}")
@@ -177,6 +445,41 @@ class VideoService:
         return video_file_path
 
 
+class MediaProcessor(Protocol):
+    def probe(self, video: Path) -> VideoMetadata: ...
+
+    def extract_audio(
+        self,
+        video: Path,
+        from_seconds: float,
+        to_seconds: float,
+        output: Path,
+    ) -> None: ...
+
+    def grab_frame(
+        self,
+        video: Path,
+        at_seconds: float,
+        output: Path,
+        index: Path | None = None,
+    ) -> None: ...
+
+    def index(self, video: Path, output: Path) -> None: ...
+
+    def waveform(self, video: Path, output: Path) -> None: ...
+
+    def dub(self, video: Path, segments: list[DubSegment], output: Path) -> None: ...
+
+    def scenes(self, video: Path) -> list[Scene]: ...
+
+    # Rewrites `video` as faststart in place and writes HLS into `output`.
+    def package(self, video: Path, output: Path) -> None: ...
+
+    def reader_stats(self) -> ReaderStats: ...
+
+    def close(self) -> None: ...
+
+
 class OCRGenerator(Protocol):
     def generate_ocr(self, image: Path) -> str: ...
 
@@ -203,5 +506,13 @@ class VideoNotFoundError(Exception):
     pass
 
 
+class VideoNotPackagedError(Exception):
+    pass
+
+
 class AudioExtractionError(Exception):
     pass
+
+
+class MediaProcessingError(Exception):
+    pass
@@ -1,13 +1,33 @@
-from dataclasses import dataclass
+import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import httpx
 
 from src.core.videos import VideoDownloadError, VideoType
 
+# Bytes needed to see the type of the first ISO BMFF box.
+SNIFF_BYTES = 8
+
 
 @dataclass
 class HttpVideoDownloader:
+    """
+    Downloads are rejected as early as possible: on the advertised size,
+    then on the first bytes not being an MP4, then as soon as the body goes
+    over `max_bytes`. The body is written next to its final name and only
+    renamed once complete, so a rejected download leaves nothing behind.
+    """
+
+    max_bytes: int = 2 * 1024**3
+    max_concurrent: int = 4
+
+    _slots: threading.BoundedSemaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+
     def download_video(
         self,
         url: str,
@@ -19,17 +39,20 @@ class HttpVideoDownloader:
 
         filename = f"{video_id}.{video_type.value}"
         output_file_path = local_path / filename
+        partial_file_path = local_path / f"{filename}.part"
 
         try:
-            with httpx.stream(
-                "GET", url, follow_redirects=True, timeout=60.0
-            ) as response:
-                response.raise_for_status()
-
-                with open(output_file_path, "wb") as f:
-                    for chunk in response.iter_bytes():
-                        f.write(chunk)
+            with self._slots:
+                self._check_size(url, self._advertised_size(url))
+                try:
+                    self._download(url, partial_file_path)
+                except BaseException:
+                    partial_file_path.unlink(missing_ok=True)
+                    raise
+            os.replace(partial_file_path, output_file_path)
 
+        except VideoDownloadError:
+            raise
         except httpx.HTTPStatusError as e:
             raise VideoDownloadError(
                 f"HTTP error during download from {url}: "
@@ -47,3 +70,58 @@ class HttpVideoDownloader:
             raise VideoDownloadError(
                 f"An unexpected error occurred during download: {e}"
             ) from e
+
+    def _download(self, url: str, output_file_path: Path) -> None:
+        with httpx.stream("GET", url, follow_redirects=True, timeout=60.0) as response:
+            response.raise_for_status()
+            self._check_size(url, _content_length(response))
+
+            received = 0
+            head = b""
+            with open(output_file_path, "wb") as f:
+                for chunk in response.iter_bytes():
+                    received += len(chunk)
+                    if received > self.max_bytes:
+                        raise VideoDownloadError(
+                            f"Video at {url} is larger than {self.max_bytes} bytes."
+                        )
+
+                    if len(head) < SNIFF_BYTES:
+                        head += chunk[: SNIFF_BYTES - len(head)]
+                        if len(head) == SNIFF_BYTES:
+                            _check_mp4(url, head)
+
+                    f.write(chunk)
+
+            if len(head) < SNIFF_BYTES:
+                raise VideoDownloadError(f"Video at {url} is not an MP4 file.")
+
+    def _advertised_size(self, url: str) -> int | None:
+        # Servers that don't answer HEAD are still checked on the GET.
+        try:
+            response = httpx.head(url, follow_redirects=True, timeout=10.0)
+        except httpx.HTTPError:
+            return None
+        if response.is_error:
+            return None
+        return _content_length(response)
+
+    def _check_size(self, url: str, size: int | None) -> None:
+        if size is not None and size > self.max_bytes:
+            raise VideoDownloadError(
+                f"Video at {url} is {size} bytes, more than the {self.max_bytes} "
+                "allowed."
+            )
+
+
+def _content_length(response: httpx.Response) -> int | None:
+    try:
+        return int(response.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _check_mp4(url: str, head: bytes) -> None:
+    # An MP4 starts with its `ftyp` box: 4 bytes of size, then the type.
+    if head[4:8] != b"ftyp":
+        raise VideoDownloadError(f"Video at {url} is not an MP4 file.")
@@ -4,13 +4,26 @@ from typing import Annotated, Any
 from fastapi import Depends, Request
 from sqlalchemy.orm import Session
 
+from src.core.artifacts import ArtifactService
 from src.core.base import Connector
-from src.core.translations import TranslationService, Translator, TTSGenerator
+from src.core.chapters import ChapterService
+from src.core.search import Searcher
+from src.core.singleflight import SingleFlight
+from src.core.transcripts import Transcriber, TranscriptService
+from src.core.translations import (
+    StreamingTranslator,
+    TextTranslator,
+    TranslationService,
+    Translator,
+    TTSGenerator,
+)
 from src.core.videos import (
+    MediaProcessor,
     OCRGenerator,
     VideoDownloader,
     VideoService,
 )
+from src.infra.sql.search import SqliteSearch
 
 
 def inject(dependency: str) -> Any:
@@ -32,20 +45,35 @@ SessionDependable = Annotated[Session, Depends(get_session)]
 VideoDownloaderDependable = Annotated[VideoDownloader, inject("video_downloader")]
 OCRGeneratorDependable = Annotated[OCRGenerator, inject("ocr_generator")]
 TTSGeneratorDependable = Annotated[TTSGenerator, inject("tts_generator")]
+MediaProcessorDependable = Annotated[MediaProcessor, inject("media_processor")]
+AudioSpoolMaxBytesDependable = Annotated[int, inject("audio_spool_max_bytes")]
+SingleFlightDependable = Annotated[SingleFlight, inject("single_flight")]
 
 
 def get_video_service(
     session: SessionDependable,
     video_downloader: VideoDownloaderDependable,
     ocr_generator: OCRGeneratorDependable,
+    media_processor: MediaProcessorDependable,
+    audio_spool_max_bytes: AudioSpoolMaxBytesDependable,
+    flights: SingleFlightDependable,
 ) -> VideoService:
     return VideoService(
-        session=session, video_downloader=video_downloader, ocr=ocr_generator
+        session=session,
+        video_downloader=video_downloader,
+        ocr=ocr_generator,
+        media=media_processor,
+        audio_spool_max_bytes=audio_spool_max_bytes,
+        flights=flights,
     )
 
 
 VideoServiceDependable = Annotated[VideoService, Depends(get_video_service)]
 TranslatorDependable = Annotated[Translator, inject("translator")]
+StreamingTranslatorDependable = Annotated[
+    StreamingTranslator, inject("streaming_translator")
+]
+TextTranslatorDependable = Annotated[TextTranslator, inject("text_translator")]
 
 
 def get_translation_service(
@@ -53,15 +81,72 @@ def get_translation_service(
     video_service: VideoServiceDependable,
     translator: TranslatorDependable,
     tts_generator: TTSGeneratorDependable,
+    flights: SingleFlightDependable,
+    streaming_translator: StreamingTranslatorDependable,
+    text_translator: TextTranslatorDependable,
 ) -> TranslationService:
     return TranslationService(
         session=session,
         video_service=video_service,
         translator=translator,
         tts=tts_generator,
+        flights=flights,
+        streaming_translator=streaming_translator,
+        text_translator=text_translator,
     )
 
 
 TranslationServiceDependable = Annotated[
     TranslationService, Depends(get_translation_service)
 ]
+TranscriberDependable = Annotated[Transcriber, inject("transcriber")]
+
+
+def get_transcript_service(
+    session: SessionDependable,
+    video_service: VideoServiceDependable,
+    transcriber: TranscriberDependable,
+    flights: SingleFlightDependable,
+) -> TranscriptService:
+    return TranscriptService(
+        session=session,
+        video_service=video_service,
+        transcriber=transcriber,
+        flights=flights,
+    )
+
+
+TranscriptServiceDependable = Annotated[
+    TranscriptService, Depends(get_transcript_service)
+]
+
+
+def get_chapter_service(
+    session: SessionDependable,
+    video_service: VideoServiceDependable,
+    translation_service: TranslationServiceDependable,
+    flights: SingleFlightDependable,
+) -> ChapterService:
+    return ChapterService(
+        session=session,
+        video_service=video_service,
+        translation_service=translation_service,
+        flights=flights,
+    )
+
+
+ChapterServiceDependable = Annotated[ChapterService, Depends(get_chapter_service)]
+
+
+def get_searcher(session: SessionDependable) -> Searcher:
+    return SqliteSearch(session)
+
+
+SearcherDependable = Annotated[Searcher, Depends(get_searcher)]
+
+
+def get_artifact_service(session: SessionDependable) -> ArtifactService:
+    return ArtifactService(session=session)
+
+
+ArtifactServiceDependable = Annotated[ArtifactService, Depends(get_artifact_service)]
@@ -0,0 +1,107 @@
+import enum
+import json
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Executable, RowMapping
+from sqlalchemy.orm import Session
+
+from src.core.base import Connector
+from src.infra.sql.versions import version_tag
+
+NDJSON = "application/x-ndjson"
+EVENT_STREAM = "text/event-stream"
+STREAM_BATCH_SIZE = 500
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Can't serialize {type(value).__name__}.")
+
+
+_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def listing_etag(request: Request, session: Session, *tables: str) -> str:
+    """An ETag for a listing read from `tables`, one per response format."""
+    variant = "ndjson" if wants_ndjson(request) else "json"
+    return f'"{variant}-{version_tag(session, *tables)}"'
+
+
+def listing_headers(etag: str) -> dict[str, str]:
+    # Clients keep the listing but check back every time.
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """A `304` if the client already has the version `etag` names."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+
+    # Proxies that compress may weaken the tag, which still counts here.
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag not in tags and "*" not in tags:
+        return None
+
+    return Response(status_code=304, headers=listing_headers(etag))
+
+
+def json_rows(
+    key: str,
+    rows: Iterable[dict[str, Any]],
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Encodes plain result rows as `{key: [...]}` without building a Pydantic
+    model per row. Rows must already have the response model's shape.
+    """
+    items = ",".join(_encoder.encode(row) for row in rows)
+    return Response(
+        f"{{{_encoder.encode(key)}:[{items}]}}",
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def ndjson_rows(
+    rows: Iterable[dict[str, Any]], headers: dict[str, str] | None = None
+) -> StreamingResponse:
+    return StreamingResponse(
+        (_encoder.encode(row) + "\n" for row in rows),
+        media_type=NDJSON,
+        headers=headers,
+    )
+
+
+def sse_events(events: Iterable[tuple[str, dict[str, Any]]]) -> StreamingResponse:
+    return StreamingResponse(
+        (f"event: {name}\ndata: {_encoder.encode(data)}\n\n" for name, data in events),
+        media_type=EVENT_STREAM,
+        # Proxies must pass every event on as soon as it's written.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def stream_rows(
+    connector: Connector,
+    statement: Executable,
+) -> Iterator[RowMapping]:
+    """
+    Yields rows as the cursor advances, in a session of its own because the
+    request's session is already closed by the time the body is streamed.
+    """
+    with connector.session() as session, session.begin():
+        yield from session.execute(
+            statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+        ).mappings()
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.scheduling import Priority, SchedulerOverloadedError, work_context
+
+
+@dataclass
+class WorkContextMiddleware:
+    """
+    Tags each request with its client (`X-Client-Id`, else the peer address)
+    and priority (`X-Priority: interactive|batch`) for the schedulers.
+    """
+
+    app: ASGIApp
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client = headers.get("x-client-id")
+        if not client and scope.get("client"):
+            client = scope["client"][0]
+
+        try:
+            priority = Priority(headers.get("x-priority", "").lower())
+        except ValueError:
+            priority = Priority.INTERACTIVE
+
+        with work_context(client or "", priority):
+            await self.app(scope, receive, send)
+
+
+def scheduler_overloaded(_: Request, e: Exception) -> Response:
+    retry_after = e.retry_after if isinstance(e, SchedulerOverloadedError) else 1
+    return JSONResponse(
+        {"detail": str(e)},
+        status_code=429,
+        headers={"Retry-After": str(retry_after)},
+    )
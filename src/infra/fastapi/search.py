@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Query, status
+from pydantic import BaseModel
+
+from src.core.search import SearchHit, SearchHitKind
+from src.infra.fastapi.dependables import SearcherDependable
+
+search_router = APIRouter(tags=["Search"])
+
+
+class SearchHitModel(BaseModel):
+    kind: SearchHitKind
+    id: str
+    video_id: str
+    from_seconds: float | None
+    to_seconds: float | None
+    snippet: str
+    rank: float
+
+    @staticmethod
+    def from_core(hit: SearchHit) -> SearchHitModel:
+        return SearchHitModel(
+            kind=hit.kind,
+            id=hit.id,
+            video_id=hit.video_id,
+            from_seconds=hit.from_seconds,
+            to_seconds=hit.to_seconds,
+            snippet=hit.snippet,
+            rank=hit.rank,
+        )
+
+
+class SearchResults(BaseModel):
+    hits: list[SearchHitModel]
+    limit: int
+    offset: int
+    has_more: bool
+
+
+@search_router.get("/search", status_code=status.HTTP_200_OK)
+def search(
+    searcher: SearcherDependable,
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+) -> SearchResults:
+    # One extra row tells whether there is a next page without counting.
+    hits = searcher.search(q, limit + 1, offset)
+    return SearchResults(
+        hits=[SearchHitModel.from_core(hit) for hit in hits[:limit]],
+        limit=limit,
+        offset=offset,
+        has_more=len(hits) > limit,
+    )
@@ -12,6 +12,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const videoPlayer = document.getElementById('video-player');
     const noVideoMessage = document.getElementById('no-video-message');
     const loadingBar = document.getElementById('loading-bar');
+    const waveformCanvas = document.getElementById('waveform-canvas');
 
     // Video Information Card elements
     const videoIdSpan = document.getElementById('video-id');
@@ -30,6 +31,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const stopAudioButton = document.getElementById('stop-audio');
     const downloadAudioButton = document.getElementById('download-audio');
     const translateAudioButton = document.getElementById('translate-audio-button');
+    const chapterListDiv = document.getElementById('chapter-list');
+    const detectChaptersButton = document.getElementById('detect-chapters-button');
 
     // Other Cards
     const translationP = document.getElementById('translation');
@@ -106,9 +109,57 @@ document.addEventListener('DOMContentLoaded', () => {
         noVideoMessage.style.color = isError ? 'red' : '#757575';
         noVideoMessage.style.display = 'block';
         videoPlayer.style.display = 'none';
+        detachHls();
         videoPlayer.src = ''; // Clear video source
     }
 
+    // --- Play through HLS where possible, the MP4 otherwise ---
+    let hls = null;
+    let hlsFallback = null;
+
+    function detachHls() {
+        if (hls) {
+            hls.destroy();
+            hls = null;
+        }
+        if (hlsFallback) {
+            videoPlayer.removeEventListener('error', hlsFallback);
+            hlsFallback = null;
+        }
+    }
+
+    function playVideo(videoFileUrl, playlistUrl) {
+        detachHls();
+
+        // A package that can't be played after all still leaves the MP4.
+        const playFile = (reason) => {
+            console.warn("HLS playback failed, falling back to MP4:", reason);
+            detachHls();
+            videoPlayer.src = videoFileUrl;
+            videoPlayer.play();
+        };
+
+        // Videos ingested without --package have no playlist.
+        if (playlistUrl && window.Hls && Hls.isSupported()) {
+            console.log("Loading HLS playlist from:", playlistUrl);
+            hls = new Hls();
+            hls.on(Hls.Events.ERROR, (event, data) => {
+                if (data.fatal) playFile(data.details);
+            });
+            hls.loadSource(playlistUrl);
+            hls.attachMedia(videoPlayer);
+        } else if (playlistUrl && videoPlayer.canPlayType('application/vnd.apple.mpegurl')) {
+            console.log("Loading HLS playlist natively from:", playlistUrl);
+            hlsFallback = () => playFile(videoPlayer.error && videoPlayer.error.message);
+            videoPlayer.addEventListener('error', hlsFallback);
+            videoPlayer.src = playlistUrl;
+        } else {
+            console.log("Loading video file from:", videoFileUrl);
+            videoPlayer.src = videoFileUrl;
+        }
+        videoPlayer.play(); // Attempt to autoplay
+    }
+
     // --- Function to update the UI with video details ---
     async function loadVideoDetails(video) {
         currentLoadedVideo = video; // Set the globally loaded video
@@ -142,6 +193,8 @@ document.addEventListener('DOMContentLoaded', () => {
             translateAudioButton.disabled = true;
             downloadFrameButton.disabled = true;
             runOcrButton.disabled = true;
+            detectChaptersButton.disabled = true;
+            renderChapters([]);
             audioSegmentVideoIdInput.value = '';
             fromSecondsInput.disabled = true;
             toSecondsInput.disabled = true;
@@ -163,6 +216,7 @@ document.addEventListener('DOMContentLoaded', () => {
         translateAudioButton.disabled = false;
         downloadFrameButton.disabled = false;
         runOcrButton.disabled = false;
+        detectChaptersButton.disabled = false;
         fromSecondsInput.disabled = false;
         toSecondsInput.disabled = false;
 
@@ -173,10 +227,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Construct the URL to the static video file
         const videoFileUrl = `/data/videos/${video.id}.${video.video_type.toLowerCase()}`;
-        console.log("Loading video file from:", videoFileUrl);
-        videoPlayer.src = videoFileUrl;
-        videoPlayer.load(); // Load the new video source
-        videoPlayer.play(); // Attempt to autoplay
+        playVideo(videoFileUrl, video.has_hls ? `/videos/${video.id}/hls/index.m3u8` : null);
 
         // Populate basic video information
         videoIdSpan.textContent = video.id;
@@ -220,7 +271,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
         // Load Video Thumbnail
-        const thumbnailFileUrl = `/data/thumbnails/${video.id}.png`;
+        const thumbnailFileUrl = `/videos/${video.id}/thumbnail`;
         firstFrameImg.src = thumbnailFileUrl;
         firstFrameImg.style.display = 'block';
         console.log("Loading thumbnail from:", thumbnailFileUrl);
@@ -234,10 +285,135 @@ document.addEventListener('DOMContentLoaded', () => {
         videoUrlTextField.value = video.original_url;
         videoUrlTextField.layout();
         
+        // Draw the waveform (doesn't block the rest of the page)
+        loadWaveform(video);
+        loadChapters(video);
+
         // Fetch translations for the loaded video
         await fetchTranslationsForVideo(video.id);
     }
 
+    // --- Chapters ---
+    async function loadChapters(video) {
+        renderChapters([]);
+        try {
+            const response = await fetch(`/videos/${video.id}/chapters`);
+            if (!response.ok || currentLoadedVideo !== video) {
+                return;
+            }
+            const data = await response.json();
+            renderChapters(data.chapters);
+        } catch (error) {
+            console.error("Error loading chapters:", error);
+        }
+    }
+
+    function renderChapters(chapters) {
+        chapterListDiv.innerHTML = '';
+        if (chapters.length === 0) {
+            chapterListDiv.textContent = 'No chapters detected yet.';
+            return;
+        }
+
+        chapters.forEach(chapter => {
+            // Picking a chapter makes it the segment to extract and translate
+            const button = document.createElement('button');
+            button.className = 'mdc-button';
+            button.textContent = `#${chapter.number + 1} ${chapter.from_seconds.toFixed(1)}-${chapter.to_seconds.toFixed(1)}s`;
+            button.title = chapter.ocr_text || '';
+            button.onclick = () => {
+                fromSecondsInput.value = chapter.from_seconds.toFixed(2);
+                toSecondsInput.value = chapter.to_seconds.toFixed(2);
+                mdc.textField.MDCTextField.attachTo(fromSecondsInput.closest('.mdc-text-field')).layout();
+                mdc.textField.MDCTextField.attachTo(toSecondsInput.closest('.mdc-text-field')).layout();
+                videoPlayer.currentTime = chapter.from_seconds;
+            };
+            chapterListDiv.appendChild(button);
+        });
+    }
+
+    detectChaptersButton.addEventListener('click', async () => {
+        const video = currentLoadedVideo;
+        if (!video) return;
+
+        detectChaptersButton.disabled = true;
+        chapterListDiv.textContent = 'Detecting chapters...';
+        showLoading();
+        try {
+            const response = await fetch(`/videos/${video.id}/chapters`, { method: 'POST' });
+            if (response.ok) {
+                const data = await response.json();
+                if (currentLoadedVideo === video) renderChapters(data.chapters);
+            } else {
+                const errorData = await response.json();
+                chapterListDiv.textContent = `Error: ${errorData.detail || 'Unknown error'}`;
+            }
+        } catch (error) {
+            console.error("Network error detecting chapters:", error);
+            chapterListDiv.textContent = 'Network error.';
+        } finally {
+            hideLoading();
+            detectChaptersButton.disabled = false;
+        }
+    });
+
+    // --- Waveform ---
+    async function loadWaveform(video) {
+        waveformCanvas.style.display = 'none';
+        const duration = video.metadata ? video.metadata.duration_seconds : 0;
+        if (!duration) {
+            return;
+        }
+
+        // Ask for roughly one bin per pixel, the server picks the closest level
+        const width = waveformCanvas.clientWidth || waveformCanvas.parentElement.clientWidth;
+        const resolution = width / duration;
+        try {
+            const response = await fetch(`/videos/${video.id}/waveform?resolution=${resolution}`);
+            if (!response.ok || currentLoadedVideo !== video) {
+                return;
+            }
+            const peaks = new Int8Array(await response.arrayBuffer());
+            drawWaveform(peaks);
+        } catch (error) {
+            console.error("Error loading waveform:", error);
+        }
+    }
+
+    function drawWaveform(peaks) {
+        waveformCanvas.style.display = 'block';
+        waveformCanvas.width = waveformCanvas.clientWidth;
+        const ctx = waveformCanvas.getContext('2d');
+        const { width, height } = waveformCanvas;
+        const bins = peaks.length / 2;
+        const middle = height / 2;
+
+        ctx.clearRect(0, 0, width, height);
+        ctx.fillStyle = '#3f51b5';
+        for (let x = 0; x < width; x++) {
+            // Merge every bin that falls into this pixel column
+            const from = Math.floor(x * bins / width);
+            const to = Math.max(from + 1, Math.floor((x + 1) * bins / width));
+            let min = 127;
+            let max = -128;
+            for (let i = from; i < to && i < bins; i++) {
+                min = Math.min(min, peaks[2 * i]);
+                max = Math.max(max, peaks[2 * i + 1]);
+            }
+            const top = middle - (max / 128) * middle;
+            const bottom = middle - (min / 128) * middle;
+            ctx.fillRect(x, top, 1, Math.max(1, bottom - top));
+        }
+    }
+
+    waveformCanvas.addEventListener('click', (event) => {
+        if (!currentLoadedVideo || !currentLoadedVideo.metadata) {
+            return;
+        }
+        const ratio = event.offsetX / waveformCanvas.clientWidth;
+        videoPlayer.currentTime = ratio * currentLoadedVideo.metadata.duration_seconds;
+    });
+
     // --- Function to render video list in sidebar ---
     function renderVideoList() {
         videoListTbody.innerHTML = ''; // Clear existing rows
@@ -306,8 +482,8 @@ document.addEventListener('DOMContentLoaded', () => {
         currentSelectedTranslation = translation;
         await updateTtsControlsForTranslation(translation);
 
-        const ttsExists = await checkTtsExists(translation.id);
-        if (ttsExists) {
+        // Listings say whether speech exists, no need to ask for the file
+        if (translation.has_speech) {
             modalGenerateTtsButton.style.display = 'none';
             modalPlayTtsButton.style.display = 'inline-flex';
             modalStopTtsButton.style.display = 'inline-flex';
@@ -398,16 +574,6 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // --- TTS (Text-to-Speech) Functions ---
 
-    async function checkTtsExists(translationId) {
-        try {
-            const response = await fetch(`/data/speeches/${translationId}.wav`, { method: 'HEAD' });
-            return response.ok;
-        } catch (error) {
-            console.error("Error checking TTS file:", error);
-            return false;
-        }
-    }
-
     function stopTts() {
         if (currentTtsAudioInstance) {
             currentTtsAudioInstance.pause();
@@ -438,7 +604,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         stopTts();
-        const ttsUrl = `/data/speeches/${translationId}.wav`;
+        const ttsUrl = `/translations/${translationId}/speech`;
         currentTtsAudioInstance = new Audio(ttsUrl);
 
         mainPlayTtsButton.querySelector('.material-icons').textContent = 'pause';
@@ -467,6 +633,7 @@ document.addEventListener('DOMContentLoaded', () => {
             if (response.ok) {
                 const translation = allTranslationsForVideo.find(t => t.id === translationId);
                 if (translation) {
+                    translation.has_speech = true;
                     await updateTtsControlsForTranslation(translation);
                     // Also update modal buttons if it's open
                     modalGenerateTtsButton.style.display = 'none';
@@ -499,9 +666,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         translationP.innerHTML = `Original: "${translation.original_text}"<br>Translated (${translation.to_language}): "${translation.translated_text}"`;
-        const ttsExists = await checkTtsExists(translation.id);
-
-        if (ttsExists) {
+        if (translation.has_speech) {
             mainGenerateTtsButton.style.display = 'none';
             mainPlayTtsButton.style.display = 'inline-flex';
             mainStopTtsButton.style.display = 'inline-flex';
@@ -688,6 +853,31 @@ document.addEventListener('DOMContentLoaded', () => {
         document.body.removeChild(a); // Clean up
     });
 
+    // Calls onEvent(name, data) for every Server-Sent Event in a fetch response.
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
     // Event listener for the "Translate Audio Segment" button
     translateAudioButton.addEventListener('click', async () => {
         if (!currentLoadedVideo) {
@@ -715,7 +905,7 @@ document.addEventListener('DOMContentLoaded', () => {
         translateAudioButton.disabled = true;
 
         try {
-            const response = await fetch(`/videos/${currentLoadedVideo.id}/audio-segment/translate`, {
+            const response = await fetch(`/videos/${currentLoadedVideo.id}/audio-segment/translate/stream`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -729,15 +919,32 @@ document.addEventListener('DOMContentLoaded', () => {
             });
 
             if (response.ok) {
-                const translationResult = await response.json();
-                console.log("Translation successful:", translationResult);
-                
-                await fetchTranslationsForVideo(currentLoadedVideo.id); // Refresh translations list
-                
-                if (allTranslationsForVideo.length > 0) {
-                    const newTranslation = allTranslationsForVideo[0];
-                    currentSelectedTranslation = newTranslation;
-                    await updateTtsControlsForTranslation(newTranslation);
+                let failure = null;
+                await readEventStream(response, (event, data) => {
+                    if (event === 'partial') {
+                        // The text shows up as the model writes it.
+                        hideLoading();
+                        translationP.textContent = '';
+                        translationP.append(`Original: "${data.original_text}"`, document.createElement('br'), `Translated (${TO_LANGUAGE}): "${data.translated_text}"`);
+                    } else if (event === 'error') {
+                        failure = data.detail;
+                    } else if (event === 'done') {
+                        console.log("Translation successful:", data);
+                    }
+                });
+
+                if (failure) {
+                    console.error("Error during translation:", failure);
+                    alert(`Translation failed: ${failure}`);
+                    translationP.innerHTML = `Error: ${failure}`;
+                } else {
+                    await fetchTranslationsForVideo(currentLoadedVideo.id); // Refresh translations list
+
+                    if (allTranslationsForVideo.length > 0) {
+                        const newTranslation = allTranslationsForVideo[0];
+                        currentSelectedTranslation = newTranslation;
+                        await updateTtsControlsForTranslation(newTranslation);
+                    }
                 }
 
             } else {
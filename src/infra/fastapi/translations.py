@@ -2,18 +2,39 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from sqlalchemy import Executable, exists, select
+from sqlalchemy.orm import Session
 
+from src.core.artifacts import Artifact, ArtifactKind
+from src.core.base import Connector
+from src.core.scheduling import Priority, work_context
 from src.core.translations import (
     Language,
+    SpeechNotFoundError,
+    SpeechReport,
+    SpeechStatus,
     Translation,
     TranslationNotFoundError,
     TTSError,
 )
 from src.infra.fastapi.dependables import (
+    ArtifactServiceDependable,
+    ConnectorDependable,
+    SessionDependable,
     TranslationServiceDependable,
 )
+from src.infra.fastapi.responses import (
+    json_rows,
+    listing_etag,
+    listing_headers,
+    ndjson_rows,
+    not_modified,
+    stream_rows,
+    wants_ndjson,
+)
 
 translation_router = APIRouter(tags=["Translations"])
 
@@ -28,9 +49,10 @@ class TranslationModel(BaseModel):
     original_text: str
     translated_text: str
     created_at: datetime
+    has_speech: bool
 
     @staticmethod
-    def from_core(v: Translation) -> TranslationModel:
+    def from_core(v: Translation, has_speech: bool) -> TranslationModel:
         return TranslationModel(
             id=v.id,
             video_id=v.video_id,
@@ -41,35 +63,99 @@ class TranslationModel(BaseModel):
             original_text=v.original_text,
             translated_text=v.translated_text,
             created_at=v.created_at,
+            has_speech=has_speech,
         )
 
 
 class TranslationsModel(BaseModel):
     translations: list[TranslationModel]
 
+
+class SpeechBatchRequest(BaseModel):
+    video_id: str | None = None
+    translation_ids: list[str] | None = None
+
+
+class SpeechResultModel(BaseModel):
+    translation_id: str
+    status: SpeechStatus
+    error: str | None
+
+
+class SpeechReportModel(BaseModel):
+    results: list[SpeechResultModel]
+    generated: int
+    shared: int
+    exists: int
+    not_found: int
+    failed: int
+
     @staticmethod
-    def from_core(translations: list[Translation]) -> TranslationsModel:
-        return TranslationsModel(
-            translations=[
-                TranslationModel(
-                    id=v.id,
-                    video_id=v.video_id,
-                    from_seconds=v.from_seconds,
-                    to_seconds=v.to_seconds,
-                    from_language=v.from_language,
-                    to_language=v.to_language,
-                    original_text=v.original_text,
-                    translated_text=v.translated_text,
-                    created_at=v.created_at,
+    def from_core(report: SpeechReport) -> SpeechReportModel:
+        return SpeechReportModel(
+            results=[
+                SpeechResultModel(
+                    translation_id=r.translation_id,
+                    status=r.status,
+                    error=r.error,
                 )
-                for v in translations
-            ]
+                for r in report.results
+            ],
+            generated=report.count(SpeechStatus.GENERATED),
+            shared=report.count(SpeechStatus.SHARED),
+            exists=report.count(SpeechStatus.EXISTS),
+            not_found=report.count(SpeechStatus.NOT_FOUND),
+            failed=report.count(SpeechStatus.FAILED),
         )
 
 
-@translation_router.get("/translations", status_code=status.HTTP_200_OK)
-def translations(service: TranslationServiceDependable) -> TranslationsModel:
-    return TranslationsModel.from_core(service.get_translations())
+TRANSLATION_ROWS = select(
+    Translation.id,
+    Translation.video_id,
+    Translation.from_seconds,
+    Translation.to_seconds,
+    Translation.from_language,
+    Translation.to_language,
+    Translation.original_text,
+    Translation.translated_text,
+    Translation.created_at,
+    exists()
+    .where(
+        Artifact.kind == ArtifactKind.SPEECH,
+        Artifact.owner_id == Translation.id,
+    )
+    .label("has_speech"),
+)
+TRANSLATION_TABLES = (Translation.__tablename__, Artifact.__tablename__)
+
+
+def _translation_rows(
+    request: Request, session: Session, connector: Connector, statement: Executable
+) -> Response:
+    etag = listing_etag(request, session, *TRANSLATION_TABLES)
+    if response := not_modified(request, etag):
+        return response
+
+    if wants_ndjson(request):
+        return ndjson_rows(
+            map(dict, stream_rows(connector, statement)), listing_headers(etag)
+        )
+
+    return json_rows(
+        "translations",
+        map(dict, session.execute(statement).mappings()),
+        listing_headers(etag),
+    )
+
+
+@translation_router.get(
+    "/translations", status_code=status.HTTP_200_OK, response_model=TranslationsModel
+)
+def translations(
+    request: Request, session: SessionDependable, connector: ConnectorDependable
+) -> Response:
+    """Accept `application/x-ndjson` to stream one translation per line."""
+    return _translation_rows(request, session, connector, TRANSLATION_ROWS)
 
 
 @translation_router.get(
@@ -83,16 +169,26 @@ def get_translation(
     except TranslationNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
 
-    return TranslationModel.from_core(translation)
+    return TranslationModel.from_core(translation, service.has_speech(translation.id))
 
 
 @translation_router.get(
-    "/videos/{video_id}/translations", status_code=status.HTTP_200_OK
+    "/videos/{video_id}/translations",
+    status_code=status.HTTP_200_OK,
+    response_model=TranslationsModel,
 )
 def get_translations_by_video(
-    video_id: str, service: TranslationServiceDependable
-) -> TranslationsModel:
-    return TranslationsModel.from_core(service.get_translations_by_video(video_id))
+    video_id: str,
+    request: Request,
+    session: SessionDependable,
+    connector: ConnectorDependable,
+) -> Response:
+    return _translation_rows(
+        request,
+        session,
+        connector,
+        TRANSLATION_ROWS.where(Translation.video_id == video_id),
+    )
 
 
 @translation_router.post(
@@ -108,4 +204,47 @@ def generate_translation_tts(
     except TTSError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    return TranslationModel.from_core(translation)
+    return TranslationModel.from_core(translation, service.has_speech(translation.id))
+
+
+@translation_router.get(
+    "/translations/{translation_id}/speech",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+def get_translation_speech(
+    translation_id: str,
+    service: TranslationServiceDependable,
+    artifacts: ArtifactServiceDependable,
+) -> FileResponse:
+    try:
+        speech = service.get_speech_path(translation_id)
+    except (TranslationNotFoundError, SpeechNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except TTSError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    artifacts.touch(speech, ArtifactKind.SPEECH)
+    return FileResponse(speech, media_type="audio/wav")
+
+
+@translation_router.post("/tts/batch", status_code=status.HTTP_200_OK)
+def generate_tts_batch(
+    request: SpeechBatchRequest, service: TranslationServiceDependable
+) -> SpeechReportModel:
+    if (request.video_id is None) == (request.translation_ids is None):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either video_id or translation_ids.",
+        )
+
+    # Bulk synthesis never competes with interactive requests as an equal.
+    with work_context(priority=Priority.BATCH):
+        if request.video_id is not None:
+            report = service.generate_speech_for_video(request.video_id)
+        else:
+            report = service.generate_speech_for_translations(
+                request.translation_ids or []
+            )
+
+    return SpeechReportModel.from_core(report)
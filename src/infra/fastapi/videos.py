@@ -1,25 +1,63 @@
 from __future__ import annotations
 
 import os
+import re
+from collections.abc import Iterator
+from dataclasses import replace
 from datetime import datetime
-
-from fastapi import APIRouter, HTTPException, Response, status
-from pydantic import BaseModel, HttpUrl, field_validator
-
-from src.core.translations import Language, TranslatorError
+from typing import Any, BinaryIO
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+from sqlalchemy import RowMapping, exists, select
+
+from src.core.artifacts import Artifact, ArtifactKind
+from src.core.chapters import Chapter as CoreChapter
+from src.core.chapters import ChapterNotFoundError
+from src.core.scheduling import Priority, SchedulerOverloadedError, work_context
+from src.core.transcripts import Utterance as CoreUtterance
+from src.core.translations import (
+    Language,
+    OCRError,
+    TranslationNotFoundError,
+    TranslatorError,
+    TTSError,
+)
 from src.core.videos import (
+    HLS_PLAYLIST,
     AudioExtractionError,
+    MediaProcessingError,
     NoVideosError,
+    ReaderStats,
     VideoDownloadError,
+    VideoMetadataRecord,
     VideoNotFoundError,
+    VideoNotPackagedError,
     VideoType,
 )
 from src.core.videos import Video as CoreVideo
 from src.core.videos import VideoMetadata as CoreVideoMetadata
 from src.infra.fastapi.dependables import (
+    ArtifactServiceDependable,
+    ChapterServiceDependable,
+    ConnectorDependable,
+    MediaProcessorDependable,
+    TranscriptServiceDependable,
     TranslationServiceDependable,
     VideoServiceDependable,
 )
+from src.infra.fastapi.responses import (
+    json_rows,
+    listing_etag,
+    listing_headers,
+    ndjson_rows,
+    not_modified,
+    sse_events,
+    stream_rows,
+    wants_ndjson,
+)
+from src.infra.media.waveform import WaveformPeaks
 
 video_router = APIRouter(tags=["Videos"])
 
@@ -62,9 +100,14 @@ class Video(BaseModel):
     video_type: str
     created_at: datetime
     metadata: VideoMetadata
+    has_thumbnail: bool
+    has_ocr: bool
+    has_hls: bool
 
     @staticmethod
-    def from_core(v: CoreVideo, mt: CoreVideoMetadata) -> Video:
+    def from_core(
+        v: CoreVideo, mt: CoreVideoMetadata, has_thumbnail: bool, has_hls: bool
+    ) -> Video:
         return Video(
             id=v.id,
             original_url=v.original_url,
@@ -72,6 +115,9 @@ class Video(BaseModel):
             video_type=v.video_type.value,
             created_at=v.created_at,
             metadata=VideoMetadata.from_core(mt),
+            has_thumbnail=has_thumbnail,
+            has_ocr=v.thumbnail_ocr is not None,
+            has_hls=has_hls,
         )
 
 
@@ -79,6 +125,24 @@ class Videos(BaseModel):
     videos: list[Video]
 
 
+class ReaderCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    open_readers: int
+    hit_rate: float
+
+    @staticmethod
+    def from_core(s: ReaderStats) -> ReaderCacheStats:
+        return ReaderCacheStats(
+            hits=s.hits,
+            misses=s.misses,
+            evictions=s.evictions,
+            open_readers=s.open_readers,
+            hit_rate=s.hit_rate,
+        )
+
+
 @video_router.post("/videos", status_code=status.HTTP_200_OK)
 def upload_video(request: UploadVideo, service: VideoServiceDependable) -> Video:
     try:
@@ -92,22 +156,80 @@ def upload_video(request: UploadVideo, service: VideoServiceDependable) -> Video
             video.id,
             video.video_type,
         ),
+        service.has_thumbnail(video.id),
+        service.has_package(video.id),
     )
 
 
-@video_router.get("/videos", status_code=status.HTTP_200_OK)
-def videos(service: VideoServiceDependable) -> Videos:
-    return Videos(
-        videos=[
-            Video.from_core(
-                v,
-                service.extract_video_metadata(
-                    v.id,
-                    v.video_type,
-                ),
-            )
-            for v in service.get_videos()
-        ]
+VIDEO_ROWS = select(
+    CoreVideo.id,
+    CoreVideo.original_url,
+    CoreVideo.thumbnail_ocr,
+    CoreVideo.video_type,
+    CoreVideo.created_at,
+    VideoMetadataRecord.duration_sec,
+    VideoMetadataRecord.width,
+    VideoMetadataRecord.height,
+    exists()
+    .where(
+        Artifact.kind == ArtifactKind.THUMBNAIL,
+        Artifact.owner_id == CoreVideo.id,
+    )
+    .label("has_thumbnail"),
+    CoreVideo.thumbnail_ocr.is_not(None).label("has_ocr"),
+    exists()
+    .where(Artifact.kind == ArtifactKind.HLS, Artifact.owner_id == CoreVideo.id)
+    .label("has_hls"),
+).join(VideoMetadataRecord)
+VIDEO_TABLES = (
+    CoreVideo.__tablename__,
+    VideoMetadataRecord.__tablename__,
+    Artifact.__tablename__,
+)
+
+
+def _video_row(row: RowMapping) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "original_url": row.original_url,
+        "thumbnail_ocr": row.thumbnail_ocr,
+        "video_type": row.video_type,
+        "created_at": row.created_at,
+        "metadata": {
+            "duration_seconds": row.duration_sec,
+            "width": row.width,
+            "height": row.height,
+        },
+        "has_thumbnail": row.has_thumbnail,
+        "has_ocr": row.has_ocr,
+        "has_hls": row.has_hls,
+    }
+
+
+@video_router.get("/videos", status_code=status.HTTP_200_OK, response_model=Videos)
+def videos(
+    request: Request,
+    service: VideoServiceDependable,
+    connector: ConnectorDependable,
+) -> Response:
+    """
+    Accept `application/x-ndjson` to stream one video per line. Send the last
+    `ETag` as `If-None-Match` to get a `304` while nothing has changed.
+    """
+    etag = listing_etag(request, service.session, *VIDEO_TABLES)
+    if response := not_modified(request, etag):
+        return response
+
+    if wants_ndjson(request):
+        return ndjson_rows(
+            map(_video_row, stream_rows(connector, VIDEO_ROWS)),
+            listing_headers(etag),
+        )
+
+    return json_rows(
+        "videos",
+        map(_video_row, service.session.execute(VIDEO_ROWS).mappings()),
+        listing_headers(etag),
     )
 
 
@@ -124,6 +246,8 @@ def get_last_video(service: VideoServiceDependable) -> Video:
             video.id,
             video.video_type,
         ),
+        service.has_thumbnail(video.id),
+        service.has_package(video.id),
     )
 
 
@@ -141,19 +265,146 @@ def get_audio_segment(
     try:
         video = service.get_video(video_id)
 
-        audio_stream = service.extract_audio_segment(
+        audio = service.extract_audio_segment(
             video_id=video.id,
             video_type=video.video_type,
             from_seconds=from_seconds,
             to_seconds=to_seconds,
         )
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except (ValueError, AudioExtractionError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    size = audio.seek(0, os.SEEK_END)
+    audio.seek(0)
+    return StreamingResponse(
+        _read_chunks(audio),
+        media_type="audio/wav",
+        headers={"Content-Length": str(size)},
+    )
+
 
-        return Response(content=audio_stream.read(), media_type="audio/wav")
+def _read_chunks(audio: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with audio:
+        while chunk := audio.read(chunk_size):
+            yield chunk
 
+
+@video_router.get(
+    "/videos/{video_id}/waveform",
+    status_code=status.HTTP_200_OK,
+    response_class=Response,
+)
+def get_waveform(
+    video_id: str,
+    request: Request,
+    service: VideoServiceDependable,
+    artifacts: ArtifactServiceDependable,
+    resolution: float = 1,
+) -> Response:
+    """
+    Interleaved int8 (min, max) peak pairs, one pair per bin. The level served
+    is the coarsest one with at least `resolution` bins per second.
+    """
+    try:
+        video = service.get_video(video_id)
+        waveform_path = service.get_waveform_path(video.id, video.video_type)
     except VideoNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
-    except (ValueError, AudioExtractionError) as e:
+    except AudioExtractionError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    artifacts.touch(waveform_path, ArtifactKind.WAVEFORM)
+    bins_per_second, peaks = WaveformPeaks.read(waveform_path).level(resolution)
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{video.id}-{bins_per_second}"',
+        "X-Waveform-Bins-Per-Second": str(bins_per_second),
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=peaks.tobytes(),
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+
+@video_router.get(
+    "/videos/{video_id}/thumbnail",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+def get_thumbnail(
+    video_id: str,
+    service: VideoServiceDependable,
+    artifacts: ArtifactServiceDependable,
+) -> FileResponse:
+    try:
+        thumbnail = service.get_thumbnail_path(service.get_video(video_id))
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    artifacts.touch(thumbnail, ArtifactKind.THUMBNAIL)
+    return FileResponse(thumbnail, media_type="image/png")
+
+
+HLS_FILE = re.compile(r"index\.m3u8|init\.mp4|seg_\d+\.m4s")
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".mp4": "video/mp4",
+    ".m4s": "video/iso.segment",
+}
+
+
+@video_router.get(
+    "/videos/{video_id}/hls/{name}",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+def get_hls_file(
+    video_id: str,
+    name: str,
+    service: VideoServiceDependable,
+    artifacts: ArtifactServiceDependable,
+) -> FileResponse:
+    """
+    The video remuxed into HLS by `ingest --package`, flagged `has_hls` in the
+    listing; players of other videos use the MP4. Segments never change once
+    written, so only the playlist is revalidated.
+    """
+    if not HLS_FILE.fullmatch(name):
+        raise HTTPException(status_code=404, detail=f"No HLS file {name}.")
+
+    try:
+        video = service.get_video(video_id)
+        package = service.get_package_path(video.id)
+    except (VideoNotFoundError, VideoNotPackagedError) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    path = package / name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"No HLS file {name}.")
+
+    cache_control = "public, max-age=31536000, immutable"
+    if name == HLS_PLAYLIST:
+        artifacts.touch(package, ArtifactKind.HLS)
+        cache_control = "public, max-age=300"
+
+    return FileResponse(
+        path,
+        media_type=HLS_MEDIA_TYPES[path.suffix],
+        headers={"Cache-Control": cache_control},
+    )
 
 
 class TranslationRequest(BaseModel):
@@ -161,6 +412,7 @@ class TranslationRequest(BaseModel):
     to_language: Language
     from_seconds: float
     to_seconds: float
+    use_transcript: bool = False
 
 
 class TranslationResponse(BaseModel):
@@ -177,6 +429,7 @@ def translate_audio_segment(
     request: TranslationRequest,
     video_service: VideoServiceDependable,
     translation_service: TranslationServiceDependable,
+    transcript_service: TranscriptServiceDependable,
 ) -> TranslationResponse:
     try:
         video = video_service.get_video(video_id)
@@ -184,23 +437,370 @@ def translate_audio_segment(
         raise HTTPException(status_code=404, detail=str(e)) from e
 
     try:
-        translation = translation_service.translate_audio_segment(
+        if request.use_transcript:
+            translation = transcript_service.translate_segment(
+                video.id,
+                request.from_seconds,
+                request.to_seconds,
+                request.from_language,
+                request.to_language,
+            )
+        else:
+            translation = translation_service.translate_audio_segment(
+                video.id,
+                video.video_type,
+                request.from_seconds,
+                request.to_seconds,
+                request.from_language,
+                request.to_language,
+            )
+    except (TranslatorError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return TranslationResponse(
+        original_text=translation.original_text,
+        translated_text=translation.translated_text,
+    )
+
+
+class FanOutRequest(BaseModel):
+    from_language: Language
+    to_languages: list[Language] = Field(min_length=1)
+    from_seconds: float
+    to_seconds: float
+
+
+class FanOutTranslation(BaseModel):
+    id: str
+    to_language: Language
+    translated_text: str
+
+
+class FanOutResponse(BaseModel):
+    original_text: str
+    translations: list[FanOutTranslation]
+
+
+@video_router.post(
+    "/videos/{video_id}/audio-segment/translate-many",
+    status_code=status.HTTP_200_OK,
+)
+def translate_audio_segment_many(
+    video_id: str,
+    request: FanOutRequest,
+    video_service: VideoServiceDependable,
+    translation_service: TranslationServiceDependable,
+) -> FanOutResponse:
+    try:
+        video = video_service.get_video(video_id)
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    try:
+        translations = translation_service.translate_audio_segment_many(
             video.id,
             video.video_type,
             request.from_seconds,
             request.to_seconds,
             request.from_language,
-            request.to_language,
+            request.to_languages,
+        )
+    except (TranslatorError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return FanOutResponse(
+        original_text=translations[0].original_text,
+        translations=[
+            FanOutTranslation(
+                id=t.id,
+                to_language=t.to_language,
+                translated_text=t.translated_text,
+            )
+            for t in translations
+        ],
+    )
+
+
+@video_router.post(
+    "/videos/{video_id}/audio-segment/translate/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+def stream_audio_segment_translation(
+    video_id: str,
+    request: TranslationRequest,
+    connector: ConnectorDependable,
+    video_service: VideoServiceDependable,
+    translation_service: TranslationServiceDependable,
+) -> StreamingResponse:
+    """
+    Server-Sent Events: `partial` with the text so far while the model
+    answers, then `done` with the saved translation, or `error`.
+    """
+    if request.use_transcript:
+        raise HTTPException(
+            status_code=400, detail="Transcript translations aren't streamed."
+        )
+
+    try:
+        video = video_service.get_video(video_id)
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    def events() -> Iterator[tuple[str, dict[str, Any]]]:
+        try:
+            # The request's session is closed before the body is streamed.
+            with connector.session() as session, session.begin():
+                updates = replace(
+                    translation_service, session=session
+                ).stream_audio_segment_translation(
+                    video.id,
+                    video.video_type,
+                    request.from_seconds,
+                    request.to_seconds,
+                    request.from_language,
+                    request.to_language,
+                )
+                for update in updates:
+                    data = {
+                        "original_text": update.original_text,
+                        "translated_text": update.translated_text,
+                    }
+                    if update.translation is None:
+                        yield "partial", data
+                    else:
+                        done = {"id": update.translation.id, **data}
+        except (
+            TranslatorError,
+            ValueError,
+            AudioExtractionError,
+            MediaProcessingError,
+            SchedulerOverloadedError,
+        ) as e:
+            yield "error", {"detail": str(e)}
+            return
+
+        # Only once the row is committed.
+        yield "done", done
+
+    return sse_events(events())
+
+
+class DubRequest(BaseModel):
+    to_language: Language
+
+
+class DubModel(BaseModel):
+    video_id: str
+    to_language: Language
+    url: str
+
+
+@video_router.post("/videos/{video_id}/dub", status_code=status.HTTP_200_OK)
+def render_dub(
+    video_id: str,
+    request: DubRequest,
+    translation_service: TranslationServiceDependable,
+) -> DubModel:
+    try:
+        # Synthesizing and mixing a whole video is background work.
+        with work_context(priority=Priority.BATCH):
+            output = translation_service.render_dub(video_id, request.to_language)
+    except (VideoNotFoundError, TranslationNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except (AudioExtractionError, TTSError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return DubModel(
+        video_id=video_id,
+        to_language=request.to_language,
+        url=f"/{output.as_posix()}",
+    )
+
+
+class TranscriptRequest(BaseModel):
+    from_language: Language
+    to_language: Language
+
+
+class UtteranceModel(BaseModel):
+    from_seconds: float
+    to_seconds: float
+    original_text: str
+    translated_text: str
+
+    @staticmethod
+    def from_core(u: CoreUtterance) -> UtteranceModel:
+        return UtteranceModel(
+            from_seconds=u.from_seconds,
+            to_seconds=u.to_seconds,
+            original_text=u.original_text,
+            translated_text=u.translated_text,
+        )
+
+
+class Transcript(BaseModel):
+    utterances: list[UtteranceModel]
+
+
+@video_router.post(
+    "/videos/{video_id}/transcript",
+    status_code=status.HTTP_200_OK,
+)
+def transcribe_video(
+    video_id: str,
+    request: TranscriptRequest,
+    service: TranscriptServiceDependable,
+) -> Transcript:
+    try:
+        utterances = service.transcribe_video(
+            video_id, request.from_language, request.to_language
         )
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     except TranslatorError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-    return TranslationResponse(
-        original_text=translation.original_text,
-        translated_text=translation.translated_text,
+    return Transcript(utterances=[UtteranceModel.from_core(u) for u in utterances])
+
+
+class ChapterModel(BaseModel):
+    number: int
+    from_seconds: float
+    to_seconds: float
+    keyframe_seconds: float
+    keyframe_url: str
+    ocr_text: str | None
+
+    @staticmethod
+    def from_core(c: CoreChapter) -> ChapterModel:
+        return ChapterModel(
+            number=c.number,
+            from_seconds=c.from_seconds,
+            to_seconds=c.to_seconds,
+            keyframe_seconds=c.keyframe_seconds,
+            keyframe_url=f"/videos/{c.video_id}/chapters/{c.number}/keyframe",
+            ocr_text=c.ocr_text,
+        )
+
+
+class Chapters(BaseModel):
+    chapters: list[ChapterModel]
+
+
+@video_router.get("/videos/{video_id}/chapters", status_code=status.HTTP_200_OK)
+def get_chapters(video_id: str, service: ChapterServiceDependable) -> Chapters:
+    """Empty until chapters have been detected."""
+    try:
+        chapters = service.get_chapters(video_id)
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    return Chapters(chapters=[ChapterModel.from_core(c) for c in chapters])
+
+
+@video_router.post("/videos/{video_id}/chapters", status_code=status.HTTP_200_OK)
+def detect_chapters(video_id: str, service: ChapterServiceDependable) -> Chapters:
+    try:
+        # Decoding the whole video is background work.
+        with work_context(priority=Priority.BATCH):
+            chapters = service.detect_chapters(video_id)
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return Chapters(chapters=[ChapterModel.from_core(c) for c in chapters])
+
+
+@video_router.get(
+    "/videos/{video_id}/chapters/{number}/keyframe",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+def get_chapter_keyframe(
+    video_id: str,
+    number: int,
+    service: ChapterServiceDependable,
+    artifacts: ArtifactServiceDependable,
+) -> FileResponse:
+    try:
+        keyframe = service.get_keyframe_path(video_id, number)
+    except (VideoNotFoundError, ChapterNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    artifacts.touch(keyframe.parent, ArtifactKind.KEYFRAME)
+    return FileResponse(keyframe, media_type="image/png")
+
+
+class ChapterTranslation(BaseModel):
+    id: str
+    from_seconds: float
+    to_seconds: float
+    original_text: str
+    translated_text: str
+
+
+class ChapterTranslations(BaseModel):
+    translations: list[ChapterTranslation]
+
+
+@video_router.post(
+    "/videos/{video_id}/chapters/translate",
+    status_code=status.HTTP_200_OK,
+)
+def translate_chapters(
+    video_id: str,
+    request: TranscriptRequest,
+    service: ChapterServiceDependable,
+) -> ChapterTranslations:
+    """Detects chapters first if needed, then translates each one."""
+    try:
+        with work_context(priority=Priority.BATCH):
+            translations = service.translate_chapters(
+                video_id, request.from_language, request.to_language
+            )
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except (TranslatorError, AudioExtractionError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return ChapterTranslations(
+        translations=[
+            ChapterTranslation(
+                id=t.id,
+                from_seconds=t.from_seconds,
+                to_seconds=t.to_seconds,
+                original_text=t.original_text,
+                translated_text=t.translated_text,
+            )
+            for t in translations
+        ]
     )
 
 
+@video_router.post("/videos/{video_id}/chapters/ocr", status_code=status.HTTP_200_OK)
+def ocr_chapters(video_id: str, service: ChapterServiceDependable) -> Chapters:
+    """Detects chapters first if needed, then reads each one's keyframe."""
+    try:
+        with work_context(priority=Priority.BATCH):
+            chapters = service.ocr_chapters(video_id)
+    except VideoNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except MediaProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return Chapters(chapters=[ChapterModel.from_core(c) for c in chapters])
+
+
 @video_router.post(
     "/videos/{video_id}/thumbnail-ocr",
     status_code=status.HTTP_200_OK,
@@ -218,4 +818,11 @@ def video_thumbnail_ocr(video_id: str, service: VideoServiceDependable) -> Video
             video.id,
             video.video_type,
         ),
+        service.has_thumbnail(video.id),
+        service.has_package(video.id),
     )
+
+
+@video_router.get("/media/readers", status_code=status.HTTP_200_OK)
+def media_reader_stats(media: MediaProcessorDependable) -> ReaderCacheStats:
+    return ReaderCacheStats.from_core(media.reader_stats())
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import wave
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import numpy.typing as npt
+from moviepy.config import FFMPEG_BINARY
+
+from src.core.videos import AudioExtractionError, DubSegment, MediaProcessingError
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+READ_SECONDS = 10
+
+# Original audio under speech is brought down to this gain (about -12 dB).
+DUCK_GAIN = 0.25
+DUCK_RAMP_SECONDS = 0.15
+SPEECH_GAIN = 1.0
+
+# Clips longer than their slot are sped up by at most this much, then cut.
+MAX_STRETCH = 1.5
+STRETCH_FRAME = 1024
+STRETCH_HOP = STRETCH_FRAME // 4
+FADE_SECONDS = 0.05
+
+Samples = npt.NDArray[np.float32]
+
+
+@dataclass
+class _Clip:
+    start: int
+    samples: Samples
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.samples)
+
+
+def render_dub(video: Path, segments: list[DubSegment], output: Path) -> None:
+    """
+    Mixes the speech clips over the video's own audio and muxes the result
+    next to the untouched video stream. The original audio is decoded, mixed
+    and encoded `READ_SECONDS` at a time, so memory stays flat however long
+    the video is; only the clips overlapping the current chunk are held.
+    """
+    segments = sorted(segments, key=lambda s: s.from_seconds)
+    slots = _slots(segments)
+    chunk_samples = SAMPLE_RATE * READ_SECONDS
+    chunk_bytes = chunk_samples * CHANNELS * 4
+
+    # The muxer writes aside, so a failed render never replaces a good one.
+    partial = output.with_name(f"{output.name}.part")
+    with (
+        tempfile.TemporaryFile() as mux_errors,
+        _decoder(video) as decoder,
+        _muxer(video, partial, mux_errors) as muxer,
+    ):
+        assert decoder.stdout is not None
+        assert muxer.stdin is not None
+
+        # Clips are needed from the moment the ducking starts to ramp down.
+        lead = round(DUCK_RAMP_SECONDS * SAMPLE_RATE)
+        position = 0
+        pending = 0
+        clips: list[_Clip] = []
+        try:
+            while chunk := _read_exactly(decoder.stdout, chunk_bytes):
+                original = np.frombuffer(chunk, dtype="<f4").reshape(-1, CHANNELS)
+                end = position + len(original)
+
+                while pending < len(segments) and slots[pending][0] - lead < end:
+                    clips.append(_prepare(segments[pending], *slots[pending]))
+                    pending += 1
+                clips = [clip for clip in clips if clip.end + lead > position]
+
+                muxer.stdin.write(_mix(original, position, clips).tobytes())
+                position = end
+
+            muxer.stdin.close()
+        except BrokenPipeError:
+            # The muxer died, its errors say why. Its input is gone, so the
+            # rest of the audio isn't decoded for nothing.
+            _abort(decoder, muxer)
+            partial.unlink(missing_ok=True)
+            raise _mux_error(mux_errors) from None
+        except BaseException:
+            # Draining the decoder here would buffer the rest of the audio
+            # while the muxer waits on its still open input.
+            _abort(decoder, muxer)
+            partial.unlink(missing_ok=True)
+            raise
+
+        _, decode_errors = decoder.communicate()
+        muxer.wait()
+
+        if decoder.returncode != 0:
+            partial.unlink(missing_ok=True)
+            raise AudioExtractionError(
+                f"Can't decode audio: {decode_errors.decode(errors='replace').strip()}"
+            )
+        if muxer.returncode != 0:
+            partial.unlink(missing_ok=True)
+            raise _mux_error(mux_errors)
+        if position == 0:
+            partial.unlink(missing_ok=True)
+            raise AudioExtractionError("Video has no audio track.")
+
+    os.replace(partial, output)
+
+
+def _slots(segments: list[DubSegment]) -> list[tuple[int, int]]:
+    """Sample ranges each clip may fill, cut short where the next one starts."""
+    slots = []
+    for i, segment in enumerate(segments):
+        start = round(segment.from_seconds * SAMPLE_RATE)
+        end = round(segment.to_seconds * SAMPLE_RATE)
+        if i + 1 < len(segments):
+            end = min(end, round(segments[i + 1].from_seconds * SAMPLE_RATE))
+        slots.append((start, max(end, start)))
+    return slots
+
+
+def _prepare(segment: DubSegment, start: int, end: int) -> _Clip:
+    samples, rate = _read_wav(segment.speech)
+    samples = _resample(samples, rate, SAMPLE_RATE)
+
+    slot = end - start
+    if slot and len(samples) > slot:
+        samples = _stretch(samples, min(len(samples) / slot, MAX_STRETCH))
+        if len(samples) > slot:
+            samples = samples[:slot]
+            fade = min(slot, round(FADE_SECONDS * SAMPLE_RATE))
+            samples[len(samples) - fade :] *= np.linspace(1, 0, fade, dtype=np.float32)
+
+    return _Clip(start, samples)
+
+
+def _read_wav(path: Path) -> tuple[Samples, int]:
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise MediaProcessingError(f"Unsupported sample width in {path}.")
+        frames = wf.readframes(wf.getnframes())
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32), rate
+
+
+def _resample(samples: Samples, rate: int, target: int) -> Samples:
+    if rate == target or not len(samples):
+        return samples
+
+    # Linear interpolation; speech is upsampled here, so nothing aliases.
+    count = round(len(samples) * target / rate)
+    positions = np.arange(count, dtype=np.float64) * (rate / target)
+    resampled: Samples = np.interp(positions, np.arange(len(samples)), samples).astype(
+        np.float32
+    )
+    return resampled
+
+
+def _stretch(samples: Samples, ratio: float) -> Samples:
+    """Overlap-add time stretch: `ratio` times faster, pitch unchanged."""
+    if ratio <= 1:
+        return samples
+
+    padded = np.pad(samples, (0, STRETCH_FRAME))
+    analysis_hop = STRETCH_HOP * ratio
+    frames = max(1, int((len(samples) - STRETCH_FRAME) / analysis_hop) + 1)
+    window = np.hanning(STRETCH_FRAME).astype(np.float32)
+
+    offsets = np.arange(STRETCH_FRAME)
+    reads = (np.arange(frames) * analysis_hop).astype(np.int64)[:, None] + offsets
+    writes = (np.arange(frames) * STRETCH_HOP)[:, None] + offsets
+
+    length = (frames - 1) * STRETCH_HOP + STRETCH_FRAME
+    mixed = np.bincount(
+        writes.ravel(), weights=(padded[reads] * window).ravel(), minlength=length
+    )
+    norm = np.bincount(
+        writes.ravel(), weights=np.tile(window, frames), minlength=length
+    )
+    stretched: Samples = (mixed / np.maximum(norm, 1e-3)).astype(np.float32)
+    return stretched[: round(len(samples) / ratio)]
+
+
+def _mix(original: Samples, position: int, clips: list[_Clip]) -> Samples:
+    length = len(original)
+    times = np.arange(position, position + length, dtype=np.float64)
+    ramp = DUCK_RAMP_SECONDS * SAMPLE_RATE
+
+    # How far into speech each sample is, 0 outside and 1 fully under it,
+    # with linear ramps either side so the ducking doesn't click.
+    coverage = np.zeros(length, dtype=np.float32)
+    speech = np.zeros(length, dtype=np.float32)
+    for clip in clips:
+        if clip.start - ramp >= position + length or clip.end + ramp <= position:
+            continue
+
+        into = np.minimum(times - (clip.start - ramp), (clip.end + ramp) - times)
+        np.maximum(coverage, np.clip(into / ramp, 0, 1), out=coverage)
+
+        begin = max(clip.start, position)
+        end = min(clip.end, position + length)
+        if begin < end:
+            speech[begin - position : end - position] += clip.samples[
+                begin - clip.start : end - clip.start
+            ]
+
+    gain = 1 - (1 - DUCK_GAIN) * coverage
+    mixed = original * gain[:, None] + (speech * SPEECH_GAIN)[:, None]
+    clipped: Samples = np.clip(mixed, -1, 1).astype("<f4")
+    return clipped
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    # Pipes return short reads; chunks must hold whole frames.
+    data = b""
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data[: len(data) - len(data) % (CHANNELS * 4)]
+
+
+def _mux_error(errors: IO[bytes]) -> MediaProcessingError:
+    errors.seek(0)
+    return MediaProcessingError(
+        f"ffmpeg failed: {errors.read().decode(errors='replace').strip()}"
+    )
+
+
+def _abort(*processes: subprocess.Popen[bytes]) -> None:
+    for process in processes:
+        if process.stdin is not None:
+            with suppress(BrokenPipeError):
+                process.stdin.close()
+        process.kill()
+    for process in processes:
+        process.wait()
+
+
+def _decoder(video: Path) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        [
+            FFMPEG_BINARY,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(video),
+            "-vn",
+            "-ac",
+            str(CHANNELS),
+            "-ar",
+            str(SAMPLE_RATE),
+            "-f",
+            "f32le",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _muxer(video: Path, output: Path, errors: IO[bytes]) -> subprocess.Popen[bytes]:
+    # Errors go to a file: a full stderr pipe would stall ffmpeg while we're
+    # blocked writing to its stdin.
+    return subprocess.Popen(
+        [
+            FFMPEG_BINARY,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(video),
+            "-f",
+            "f32le",
+            "-ac",
+            str(CHANNELS),
+            "-ar",
+            str(SAMPLE_RATE),
+            "-i",
+            "-",
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a:0",
+            "-c:v",
+            "copy",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            "-movflags",
+            "+faststart",
+            "-f",
+            "mp4",
+            str(output),
+        ],
+        stdin=subprocess.PIPE,
+        stderr=errors,
+    )
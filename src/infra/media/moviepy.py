@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from PIL import Image
+
+from src.core.videos import (
+    AudioExtractionError,
+    DubSegment,
+    ReaderStats,
+    Scene,
+    VideoMetadata,
+)
+from src.infra.media.dubbing import render_dub
+from src.infra.media.mp4index import KeyframeIndex, build_index, read_index
+from src.infra.media.packaging import package_video
+from src.infra.media.readers import VideoReaderCache
+from src.infra.media.scenes import detect_scenes
+from src.infra.media.waveform import compute_peaks
+
+
+@dataclass
+class MoviePyMediaProcessor:
+    reader_cache_size: int = 4
+
+    readers: VideoReaderCache = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.readers = VideoReaderCache(capacity=self.reader_cache_size)
+
+    def probe(self, video: Path) -> VideoMetadata:
+        with self.readers.open(video) as clip:
+            return VideoMetadata(
+                clip.duration,
+                clip.w,
+                clip.h,
+            )
+
+    def extract_audio(
+        self,
+        video: Path,
+        from_seconds: float,
+        to_seconds: float,
+        output: Path,
+    ) -> None:
+        with self.readers.open(video) as video_clip:
+            if to_seconds > video_clip.duration:
+                to_seconds = video_clip.duration
+                if from_seconds >= to_seconds:
+                    raise ValueError(
+                        f"Requested audio segment start ({from_seconds}s) "
+                        f"is beyond video duration ({video_clip.duration}s)."
+                    )
+
+            if video_clip.audio is None:
+                raise AudioExtractionError("Video has no audio track.")
+
+            # The subclip shares the cached reader, so it must not be closed.
+            audio_clip = video_clip.subclipped(from_seconds, to_seconds).audio
+            audio_clip.write_audiofile(
+                str(output), codec="pcm_s16le", fps=44100, logger=None
+            )
+
+    def grab_frame(
+        self,
+        video: Path,
+        at_seconds: float,
+        output: Path,
+        index: Path | None = None,
+    ) -> None:
+        with self.readers.open(video) as video_clip:
+            if index and index.is_file():
+                _seek(video_clip.reader, read_index(video, index), at_seconds)
+            np_frame: npt.NDArray[np.uint8] = video_clip.get_frame(at_seconds)  # pyright: ignore[reportAssignmentType]
+            Image.fromarray(np_frame, "RGB").save(output)
+
+    def index(self, video: Path, output: Path) -> None:
+        build_index(video).write(output)
+
+    def waveform(self, video: Path, output: Path) -> None:
+        compute_peaks(video).write(output)
+
+    def dub(self, video: Path, segments: list[DubSegment], output: Path) -> None:
+        render_dub(video, segments, output)
+
+    def scenes(self, video: Path) -> list[Scene]:
+        return detect_scenes(video)
+
+    def package(self, video: Path, output: Path) -> None:
+        package_video(video, output)
+
+    def reader_stats(self) -> ReaderStats:
+        return self.readers.stats()
+
+    def close(self) -> None:
+        self.readers.close()
+
+
+def _seek(reader: FFMPEG_VideoReader, index: KeyframeIndex, seconds: float) -> None:
+    """
+    Leaves the reader just before the frame at `seconds`. Decoding on from
+    where it stands costs no more than restarting at the keyframe before
+    that frame, as long as the keyframe isn't ahead of the reader; past it,
+    the restart decodes less however close the frame is.
+    """
+    target = reader.get_frame_number(seconds)
+    if reader.proc is not None and reader.pos == target + 1:
+        return
+
+    if (
+        reader.proc is not None
+        and reader.pos <= target
+        and index.keyframe_before(seconds) <= reader.pos / reader.fps
+    ):
+        reader.skip_frames(target - reader.pos)
+    else:
+        reader.initialize(seconds)
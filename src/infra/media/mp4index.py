@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from src.core.videos import MediaProcessingError
+
+MAGIC = b"TBKF"
+VERSION = 3
+
+# magic, version, keyframe count
+HEADER = struct.Struct("<4sHI")
+TIMES = np.dtype("<f8")
+
+
+@dataclass
+class KeyframeIndex:
+    """
+    Seek table for one MP4: the decode timestamp of every video keyframe,
+    read from the sample tables in the moov box so building it never touches
+    the media data. A cached reader decodes on from where it stands while
+    no keyframe lies before the requested frame, and restarts there
+    otherwise.
+    """
+
+    keyframes: npt.NDArray[np.float64]
+
+    def keyframe_before(self, seconds: float) -> float:
+        if not len(self.keyframes):
+            return 0.0
+
+        i = int(np.searchsorted(self.keyframes, seconds, side="right")) - 1
+        return float(self.keyframes[max(i, 0)])
+
+    def write(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.keyframes)))
+            f.write(self.keyframes.astype(TIMES).tobytes())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def read(path: Path) -> KeyframeIndex:
+        return _read_cached(str(path), path.stat().st_mtime_ns)
+
+
+def build_index(video: Path) -> KeyframeIndex:
+    moov = _read_moov(video)
+    for kind, start, end in _boxes(moov, 0, len(moov)):
+        if kind != b"trak":
+            continue
+
+        track = _Track.parse(moov, start, end)
+        if track.handler == b"vide":
+            return KeyframeIndex(track.keyframes())
+
+    raise MediaProcessingError(f"No video track found in {video}.")
+
+
+def read_index(video: Path, path: Path) -> KeyframeIndex:
+    """Reads the index of `video`, rebuilding it if an older version wrote it."""
+    try:
+        return KeyframeIndex.read(path)
+    except OutdatedIndexError:
+        index = build_index(video)
+        index.write(path)
+        return index
+
+
+@lru_cache(maxsize=64)
+def _read_cached(path: str, mtime_ns: int) -> KeyframeIndex:  # noqa: ARG001
+    data = Path(path).read_bytes()
+    magic, version, n_keyframes = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise MediaProcessingError(f"Unsupported keyframe index {path}.")
+    if version != VERSION:
+        raise OutdatedIndexError(f"Keyframe index {path} is version {version}.")
+
+    keyframes = np.frombuffer(data, dtype=TIMES, count=n_keyframes, offset=HEADER.size)
+    return KeyframeIndex(keyframes.astype(np.float64))
+
+
+@dataclass
+class _Track:
+    handler: bytes
+    timescale: int
+    stts: npt.NDArray[np.int64]
+    stss: npt.NDArray[np.int64] | None
+
+    @staticmethod
+    def parse(data: bytes, start: int, end: int) -> _Track:
+        mdia = _child(data, start, end, b"mdia")
+        mdhd = _child(data, *mdia, b"mdhd")
+        hdlr = _child(data, *mdia, b"hdlr")
+        minf = _child(data, *mdia, b"minf")
+        stbl = _child(data, *minf, b"stbl")
+
+        version = data[mdhd[0]]
+        timescale_at = mdhd[0] + (20 if version == 1 else 12)
+        (timescale,) = struct.unpack_from(">I", data, timescale_at)
+
+        stss = _find(data, *stbl, b"stss")
+        return _Track(
+            handler=data[hdlr[0] + 8 : hdlr[0] + 12],
+            timescale=timescale,
+            stts=_table(data, _child(data, *stbl, b"stts"), columns=2),
+            stss=_table(data, stss) if stss else None,
+        )
+
+    def sample_times(self) -> npt.NDArray[np.float64]:
+        deltas = np.repeat(self.stts[:, 1], self.stts[:, 0])
+        starts = np.cumsum(deltas) - deltas
+        return starts / self.timescale
+
+    def keyframes(self) -> npt.NDArray[np.float64]:
+        times = self.sample_times()
+        return times if self.stss is None else times[self.stss - 1]
+
+
+def _read_moov(video: Path) -> bytes:
+    with open(video, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        pos = 0
+        while pos + 8 <= size:
+            f.seek(pos)
+            header = f.read(16)
+            box_size, kind = struct.unpack_from(">I4s", header)
+            header_size = 8
+            if box_size == 1:
+                (box_size,) = struct.unpack_from(">Q", header, 8)
+                header_size = 16
+            elif box_size == 0:
+                box_size = size - pos
+
+            if kind == b"moov":
+                f.seek(pos + header_size)
+                return f.read(box_size - header_size)
+            if box_size < header_size:
+                break
+            pos += box_size
+
+    raise MediaProcessingError(f"No moov box found in {video}.")
+
+
+def _boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, pos + 8)
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+
+        yield kind, pos + header_size, pos + size
+        pos += size
+
+
+def _find(data: bytes, start: int, end: int, kind: bytes) -> tuple[int, int] | None:
+    for child, child_start, child_end in _boxes(data, start, end):
+        if child == kind:
+            return child_start, child_end
+    return None
+
+
+def _child(data: bytes, start: int, end: int, kind: bytes) -> tuple[int, int]:
+    found = _find(data, start, end, kind)
+    if not found:
+        raise MediaProcessingError(f"Missing '{kind.decode()}' box in MP4.")
+    return found
+
+
+def _table(
+    data: bytes, box: tuple[int, int], columns: int = 1
+) -> npt.NDArray[np.int64]:
+    # Full box: version and flags, entry count, then the entries.
+    start, _ = box
+    (count,) = struct.unpack_from(">I", data, start + 4)
+    table = np.frombuffer(data, dtype=">u4", count=count * columns, offset=start + 8)
+    return table.reshape((count, columns) if columns > 1 else count).astype(np.int64)
+
+
+class OutdatedIndexError(MediaProcessingError):
+    pass
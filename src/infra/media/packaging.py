@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+from moviepy.config import FFMPEG_BINARY
+
+from src.core.videos import HLS_PLAYLIST, MediaProcessingError
+
+# Segments are cut on the keyframe at or after each multiple of this.
+SEGMENT_SECONDS = 6
+INIT_SEGMENT = "init.mp4"
+SEGMENT_PATTERN = "seg_%05d.m4s"
+
+
+def package_video(video: Path, output: Path) -> None:
+    """
+    Moves the video's moov atom to the front, in place, and writes an fMP4
+    HLS rendition of it into the `output` directory. Both are remuxes, no
+    stream is re-encoded.
+    """
+    if not is_faststart(video):
+        partial = video.with_name(f"{video.name}.part")
+        _ffmpeg(
+            [
+                "-i",
+                str(video),
+                "-map",
+                "0",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                "-f",
+                "mp4",
+                str(partial),
+            ],
+            partial,
+        )
+        os.replace(partial, video)
+
+    # Built aside and swapped in whole, so a player never sees a playlist
+    # pointing at segments of another run.
+    partial = output.with_name(f"{output.name}.part")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.mkdir(parents=True)
+    _ffmpeg(
+        [
+            "-i",
+            str(video),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
+            "-c",
+            "copy",
+            "-f",
+            "hls",
+            "-hls_time",
+            str(SEGMENT_SECONDS),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_type",
+            "fmp4",
+            "-hls_fmp4_init_filename",
+            INIT_SEGMENT,
+            "-hls_segment_filename",
+            str(partial / SEGMENT_PATTERN),
+            str(partial / HLS_PLAYLIST),
+        ],
+        partial,
+    )
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(partial, output)
+
+
+def is_faststart(video: Path) -> bool:
+    """Whether the moov atom comes before the media data."""
+    with open(video, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset + 8 <= size:
+            f.seek(offset)
+            box_size, kind = struct.unpack(">I4s", f.read(8))
+            if kind == b"moov":
+                return True
+            if kind == b"mdat":
+                return False
+
+            if box_size == 1:
+                (box_size,) = struct.unpack(">Q", f.read(8))
+            elif box_size == 0:
+                break
+            if box_size < 8:
+                raise MediaProcessingError(f"Malformed MP4 box in {video}.")
+            offset += box_size
+
+    raise MediaProcessingError(f"No moov atom in {video}.")
+
+
+def _ffmpeg(arguments: list[str], partial: Path) -> None:
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *arguments],
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        if partial.is_dir():
+            shutil.rmtree(partial, ignore_errors=True)
+        else:
+            partial.unlink(missing_ok=True)
+        raise MediaProcessingError(
+            f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}"
+        )
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.core.videos import (
+    DubSegment,
+    MediaProcessingError,
+    MediaProcessor,
+    ReaderStats,
+    Scene,
+    VideoMetadata,
+)
+from src.infra.media.moviepy import MoviePyMediaProcessor
+
+_processor: MediaProcessor
+
+
+def _init_worker(factory: Callable[[], MediaProcessor]) -> None:
+    global _processor
+    _processor = factory()
+    atexit.register(_processor.close)
+
+
+def _run(method: str, *args: Any) -> tuple[Any, int, ReaderStats]:
+    result = getattr(_processor, method)(*args)
+    return result, os.getpid(), _processor.reader_stats()
+
+
+@dataclass
+class MediaWorkerPool:
+    """
+    Runs media work in separate processes so decoding neither holds the API
+    process' GIL nor leaks readers into it. Results that are large (audio,
+    frames) are written by the worker to the output path the caller passes,
+    only small values travel back through the pipe.
+
+    A task exceeding the timeout gets its pool torn down and replaced, workers
+    are also recycled after a fixed number of tasks. Long tasks (dubs,
+    packaging, scene detection) run in a process of their own instead, so
+    one of them timing out doesn't take down the others.
+    """
+
+    factory: Callable[[], MediaProcessor] = field(default=MoviePyMediaProcessor)
+    workers: int = 2
+    timeout: float = 120.0
+    max_tasks_per_worker: int = 200
+    # Rendering a dub encodes the whole soundtrack, so it gets longer.
+    dub_timeout: float = 3600.0
+    # Packaging copies the whole file, twice if it isn't faststart yet.
+    package_timeout: float = 1800.0
+    # Scene detection decodes every frame of the video.
+    scenes_timeout: float = 1800.0
+
+    _executor: ProcessPoolExecutor | None = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _worker_stats: dict[int, ReaderStats] = field(init=False, default_factory=dict)
+
+    def probe(self, video: Path) -> VideoMetadata:
+        metadata: VideoMetadata = self._call("probe", video)
+        return metadata
+
+    def extract_audio(
+        self,
+        video: Path,
+        from_seconds: float,
+        to_seconds: float,
+        output: Path,
+    ) -> None:
+        self._call("extract_audio", video, from_seconds, to_seconds, output)
+
+    def grab_frame(
+        self,
+        video: Path,
+        at_seconds: float,
+        output: Path,
+        index: Path | None = None,
+    ) -> None:
+        self._call("grab_frame", video, at_seconds, output, index)
+
+    def index(self, video: Path, output: Path) -> None:
+        self._call("index", video, output)
+
+    def waveform(self, video: Path, output: Path) -> None:
+        self._call("waveform", video, output)
+
+    def dub(self, video: Path, segments: list[DubSegment], output: Path) -> None:
+        self._call_alone("dub", video, segments, output, timeout=self.dub_timeout)
+
+    def scenes(self, video: Path) -> list[Scene]:
+        scenes: list[Scene] = self._call_alone(
+            "scenes", video, timeout=self.scenes_timeout
+        )
+        return scenes
+
+    def package(self, video: Path, output: Path) -> None:
+        self._call_alone("package", video, output, timeout=self.package_timeout)
+
+    def reader_stats(self) -> ReaderStats:
+        """Totals as of each worker's last finished task."""
+        with self._lock:
+            alive = set((self._executor._processes or {}) if self._executor else ())
+            stats = ReaderStats()
+            for pid, worker in self._worker_stats.items():
+                stats.hits += worker.hits
+                stats.misses += worker.misses
+                stats.evictions += worker.evictions
+                if pid in alive:
+                    stats.open_readers += worker.open_readers
+            return stats
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _call(self, method: str, *args: Any, timeout: float | None = None) -> Any:
+        if timeout is None:
+            timeout = self.timeout
+
+        executor = self._get_executor()
+        return self._wait(
+            executor, method, executor.submit(_run, method, *args), timeout
+        )
+
+    def _call_alone(self, method: str, *args: Any, timeout: float) -> Any:
+        executor = self._new_executor(workers=1, max_tasks=None)
+        try:
+            return self._wait(
+                executor, method, executor.submit(_run, method, *args), timeout
+            )
+        finally:
+            executor.shutdown(wait=True)
+
+    def _wait(
+        self,
+        executor: ProcessPoolExecutor,
+        method: str,
+        future: Future[tuple[Any, int, ReaderStats]],
+        timeout: float,
+    ) -> Any:
+        try:
+            result, pid, stats = future.result(timeout=timeout)
+        except FutureTimeoutError as e:
+            self._recycle(executor)
+            raise MediaProcessingError(
+                f"Media task '{method}' timed out after {timeout}s."
+            ) from e
+        except BrokenProcessPool as e:
+            self._recycle(executor)
+            raise MediaProcessingError(
+                f"Media worker died while running '{method}'."
+            ) from e
+        except CancelledError as e:
+            # Still queued when another task's timeout recycled the pool.
+            raise MediaProcessingError(
+                f"Media task '{method}' was cancelled by a pool restart."
+            ) from e
+
+        with self._lock:
+            self._worker_stats[pid] = stats
+        return result
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor(
+                    self.workers, self.max_tasks_per_worker
+                )
+            return self._executor
+
+    def _new_executor(self, workers: int, max_tasks: int | None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.factory,),
+            max_tasks_per_child=max_tasks,
+        )
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+        # There is no public way to kill a hung worker before Python 3.14.
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
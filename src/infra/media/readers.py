@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from moviepy import VideoFileClip
+
+from src.core.videos import ReaderStats
+
+
+@dataclass
+class _Reader:
+    mtime_ns: int
+    clip: VideoFileClip | None = None
+    closed: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class VideoReaderCache:
+    """
+    Keeps the most recently used clips open, keyed by file path and mtime so a
+    replaced file is never read through a stale reader. A reader is used by
+    one caller at a time; evicting a busy reader waits for that caller to
+    finish before closing it.
+    """
+
+    capacity: int = 4
+    opener: Callable[[str], VideoFileClip] = field(default=VideoFileClip)
+
+    _readers: OrderedDict[str, _Reader] = field(init=False, default_factory=OrderedDict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _stats: ReaderStats = field(init=False, default_factory=ReaderStats)
+
+    @contextmanager
+    def open(self, video: Path) -> Iterator[VideoFileClip]:
+        key = str(video)
+        mtime_ns = video.stat().st_mtime_ns
+        evicted = []
+
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader and reader.mtime_ns != mtime_ns:
+                evicted.append(self._readers.pop(key))
+                reader = None
+
+            if reader:
+                self._stats.hits += 1
+                self._readers.move_to_end(key)
+            else:
+                self._stats.misses += 1
+                reader = self._readers[key] = _Reader(mtime_ns)
+
+            while len(self._readers) > self.capacity:
+                _, oldest = self._readers.popitem(last=False)
+                evicted.append(oldest)
+                self._stats.evictions += 1
+
+        self._close(evicted)
+
+        with reader.lock:
+            if reader.closed:
+                # Evicted between lookup and use, don't resurrect it.
+                with self.opener(key) as clip:
+                    yield clip
+                return
+
+            if reader.clip is None:
+                reader.clip = self.opener(key)
+            yield reader.clip
+
+    def stats(self) -> ReaderStats:
+        with self._lock:
+            return ReaderStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                open_readers=sum(
+                    1 for r in self._readers.values() if r.clip is not None
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            evicted = list(self._readers.values())
+            self._readers.clear()
+
+        self._close(evicted)
+
+    def _close(self, readers: list[_Reader]) -> None:
+        for reader in readers:
+            with reader.lock:
+                reader.closed = True
+                if reader.clip is not None:
+                    reader.clip.close()
+                    reader.clip = None
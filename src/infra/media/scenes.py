@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import numpy.typing as npt
+from moviepy.config import FFMPEG_BINARY
+
+from src.core.videos import MediaProcessingError, Scene
+
+# Frames are sampled and shrunk by ffmpeg, cuts only need coarse colour.
+SAMPLE_FPS = 4
+FRAME_WIDTH = 64
+FRAME_HEIGHT = 36
+READ_FRAMES = 256
+BINS = 16
+
+# Share of the colour histogram that has to change between two samples.
+CUT_THRESHOLD = 0.35
+MIN_SCENE_SECONDS = 2.0
+
+Histograms = npt.NDArray[np.float32]
+
+
+def detect_scenes(video: Path) -> list[Scene]:
+    """
+    Splits the video where its colour histogram jumps between consecutive
+    samples. The video is decoded once, front to back, and only the
+    per-frame histograms are kept, so memory grows by a few hundred bytes
+    per sampled frame whatever the resolution.
+    """
+    frame_bytes = FRAME_WIDTH * FRAME_HEIGHT * 3
+    batches = []
+
+    with tempfile.TemporaryFile() as errors, _decoder(video, errors) as decoder:
+        assert decoder.stdout is not None
+        while chunk := _read_exactly(decoder.stdout, frame_bytes * READ_FRAMES):
+            frames = np.frombuffer(chunk, dtype=np.uint8)
+            batches.append(_histograms(frames.reshape(-1, frame_bytes)))
+        decoder.wait()
+
+        if decoder.returncode != 0:
+            errors.seek(0)
+            raise MediaProcessingError(
+                f"ffmpeg failed: {errors.read().decode(errors='replace').strip()}"
+            )
+
+    if not batches:
+        raise MediaProcessingError("Video has no video track.")
+
+    histograms = np.concatenate(batches)
+    bounds = [0, *_cuts(histograms), len(histograms)]
+    return [
+        Scene(
+            from_seconds=start / SAMPLE_FPS,
+            to_seconds=end / SAMPLE_FPS,
+            keyframe_seconds=_representative(histograms, start, end) / SAMPLE_FPS,
+        )
+        for start, end in zip(bounds, bounds[1:], strict=False)
+    ]
+
+
+def _histograms(frames: npt.NDArray[np.uint8]) -> Histograms:
+    """Per-channel histograms of each frame, each channel summing to 1."""
+    count = len(frames)
+    pixels = frames.reshape(count, -1, 3)
+
+    # One bincount for the whole batch: every (frame, channel) pair gets
+    # its own run of bins.
+    bins = (pixels // (256 // BINS)).astype(np.intp)
+    bins += np.arange(3) * BINS
+    bins += (np.arange(count) * 3 * BINS)[:, None, None]
+    counts = np.bincount(bins.ravel(), minlength=count * 3 * BINS)
+
+    histograms: Histograms = (
+        counts.reshape(count, 3 * BINS) / (FRAME_WIDTH * FRAME_HEIGHT)
+    ).astype(np.float32)
+    return histograms
+
+
+def _cuts(histograms: Histograms) -> list[int]:
+    # Half the L1 distance, averaged over channels: 0 same, 1 disjoint.
+    scores = np.abs(np.diff(histograms, axis=0)).sum(axis=1) / 6
+    candidates = np.flatnonzero(scores > CUT_THRESHOLD) + 1
+
+    min_frames = round(MIN_SCENE_SECONDS * SAMPLE_FPS)
+    cuts: list[int] = []
+    for frame in candidates.tolist():
+        if frame - (cuts[-1] if cuts else 0) < min_frames:
+            continue
+        if len(histograms) - frame < min_frames:
+            break
+        cuts.append(frame)
+    return cuts
+
+
+def _representative(histograms: Histograms, start: int, end: int) -> int:
+    scene = histograms[start:end]
+    distances = np.abs(scene - scene.mean(axis=0)).sum(axis=1)
+    return start + int(np.argmin(distances))
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    # Pipes return short reads; batches must hold whole frames.
+    data = b""
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    frame_bytes = FRAME_WIDTH * FRAME_HEIGHT * 3
+    return data[: len(data) - len(data) % frame_bytes]
+
+
+def _decoder(video: Path, errors: IO[bytes]) -> subprocess.Popen[bytes]:
+    return subprocess.Popen(
+        [
+            FFMPEG_BINARY,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(video),
+            "-an",
+            "-sn",
+            "-vf",
+            f"fps={SAMPLE_FPS},scale={FRAME_WIDTH}:{FRAME_HEIGHT}",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=errors,
+    )
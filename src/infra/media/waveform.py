@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import struct
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+from moviepy.config import FFMPEG_BINARY
+
+from src.core.videos import AudioExtractionError, MediaProcessingError
+
+MAGIC = b"TBWF"
+VERSION = 1
+SAMPLE_RATE = 8000
+
+# Each level is derived from the previous one, finest first.
+LEVELS = (100, 20, 4, 1)
+
+# magic, version, sample rate, level count
+HEADER = struct.Struct("<4sHII")
+# bins per second, bin count
+LEVEL = struct.Struct("<II")
+
+READ_SECONDS = 10
+
+
+@dataclass
+class WaveformPeaks:
+    """
+    Min/max peaks of the mono mixdown, quantized to int8, at a few fixed
+    resolutions. A level is stored as interleaved (min, max) pairs.
+    """
+
+    levels: dict[int, npt.NDArray[np.int8]]
+
+    def level(self, bins_per_second: float) -> tuple[int, npt.NDArray[np.int8]]:
+        # Coarsest level that still has at least the requested resolution.
+        for candidate in sorted(self.levels):
+            if candidate >= bins_per_second:
+                return candidate, self.levels[candidate]
+
+        finest = max(self.levels)
+        return finest, self.levels[finest]
+
+    def write(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, SAMPLE_RATE, len(self.levels)))
+            for bins_per_second, peaks in self.levels.items():
+                f.write(LEVEL.pack(bins_per_second, len(peaks) // 2))
+            for peaks in self.levels.values():
+                f.write(peaks.tobytes())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def read(path: Path) -> WaveformPeaks:
+        data = path.read_bytes()
+        magic, version, _, n_levels = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise MediaProcessingError(f"Unsupported waveform file {path}.")
+
+        offset = HEADER.size + LEVEL.size * n_levels
+        levels = {}
+        for i in range(n_levels):
+            bins_per_second, bins = LEVEL.unpack_from(
+                data, HEADER.size + LEVEL.size * i
+            )
+            levels[bins_per_second] = np.frombuffer(
+                data, dtype=np.int8, count=bins * 2, offset=offset
+            )
+            offset += bins * 2
+
+        return WaveformPeaks(levels)
+
+
+def compute_peaks(video: Path) -> WaveformPeaks:
+    samples_per_bin = SAMPLE_RATE // LEVELS[0]
+    chunk_bytes = SAMPLE_RATE * READ_SECONDS * 2
+
+    mins: list[npt.NDArray[np.int16]] = []
+    maxs: list[npt.NDArray[np.int16]] = []
+    leftover = np.empty(0, dtype=np.int16)
+
+    with subprocess.Popen(
+        [
+            FFMPEG_BINARY,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(video),
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "-f",
+            "s16le",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as process:
+        assert process.stdout is not None
+        while chunk := process.stdout.read(chunk_bytes):
+            samples = np.concatenate((leftover, np.frombuffer(chunk, dtype="<i2")))
+            whole = len(samples) - len(samples) % samples_per_bin
+            bins = samples[:whole].reshape(-1, samples_per_bin)
+            mins.append(bins.min(axis=1))
+            maxs.append(bins.max(axis=1))
+            leftover = samples[whole:]
+
+        _, stderr = process.communicate()
+
+    if process.returncode != 0:
+        raise MediaProcessingError(
+            f"ffmpeg failed: {stderr.decode(errors='replace').strip()}"
+        )
+
+    if len(leftover):
+        mins.append(leftover.min(keepdims=True))
+        maxs.append(leftover.max(keepdims=True))
+    if not mins:
+        raise AudioExtractionError("Video has no audio track.")
+
+    low = np.concatenate(mins)
+    high = np.concatenate(maxs)
+    levels = {LEVELS[0]: _interleave(low, high)}
+    for finer, coarser in zip(LEVELS, LEVELS[1:], strict=False):
+        low = _reduce(low, finer // coarser, np.minimum)
+        high = _reduce(high, finer // coarser, np.maximum)
+        levels[coarser] = _interleave(low, high)
+
+    return WaveformPeaks(levels)
+
+
+def _reduce(
+    peaks: npt.NDArray[np.int16], factor: int, op: np.ufunc
+) -> npt.NDArray[np.int16]:
+    padded = np.pad(peaks, (0, -len(peaks) % factor), mode="edge")
+    reduced: npt.NDArray[np.int16] = op.reduce(padded.reshape(-1, factor), axis=1)
+    return reduced
+
+
+def _interleave(
+    low: npt.NDArray[np.int16], high: npt.NDArray[np.int16]
+) -> npt.NDArray[np.int8]:
+    return np.column_stack((low >> 8, high >> 8)).astype(np.int8).ravel()
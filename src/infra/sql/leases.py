@@ -0,0 +1,59 @@
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, create_engine, delete, insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from src.core.singleflight import Lease
+
+
+@dataclass
+class SqliteLeases:
+    """
+    Leases live in their own short-timeout connection: the request asking
+    for one may already hold SQLite's write lock, and waiting on it would
+    only stall until the busy timeout.
+    """
+
+    db_url: str
+    timeout: float = 0.1
+    owner: str = field(default_factory=lambda: f"{socket.gethostname()}:{os.getpid()}")
+
+    eng: Engine = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.eng = create_engine(
+            f"sqlite:///{self.db_url}", connect_args={"timeout": self.timeout}
+        )
+
+    def acquire(self, key: str, seconds: float) -> bool:
+        now = time.time()
+        try:
+            with self.eng.begin() as conn:
+                conn.execute(
+                    delete(Lease).where(Lease.key == key, Lease.expires_at < now)
+                )
+                conn.execute(
+                    insert(Lease).values(
+                        key=key, owner=self.owner, expires_at=now + seconds
+                    )
+                )
+        except IntegrityError:
+            return False
+        except OperationalError:
+            # The database is busy, carry on with in-process coalescing only.
+            return True
+
+        return True
+
+    def release(self, key: str) -> None:
+        try:
+            with self.eng.begin() as conn:
+                conn.execute(
+                    delete(Lease).where(Lease.key == key, Lease.owner == self.owner)
+                )
+        except OperationalError:
+            # Left to expire.
+            pass
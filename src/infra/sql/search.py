@@ -0,0 +1,183 @@
+import html
+from dataclasses import dataclass
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.orm import Session
+
+from src.core.search import SearchHit, SearchHitKind
+
+# Matches are delimited with control characters, so the text can be escaped
+# as HTML before they become <mark> tags.
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+# (fts table, content table, indexed columns)
+FTS_TABLES = (
+    ("translations_fts", "translations", ("original_text", "translated_text")),
+    ("utterances_fts", "utterances", ("original_text", "translated_text")),
+    ("videos_fts", "videos", ("thumbnail_ocr",)),
+)
+
+SEARCH_QUERY = """
+SELECT 'translation' AS kind, t.id, t.video_id, t.from_seconds, t.to_seconds,
+       snippet(translations_fts, -1, char(2), char(3), '…', 16) AS snippet,
+       bm25(translations_fts) AS rank
+FROM translations_fts
+JOIN translations_fts_keys k ON k.key = translations_fts.rowid
+JOIN translations t ON t.id = k.id
+WHERE translations_fts MATCH :query
+UNION ALL
+SELECT 'utterance', u.id, u.video_id, u.from_seconds, u.to_seconds,
+       snippet(utterances_fts, -1, char(2), char(3), '…', 16),
+       bm25(utterances_fts)
+FROM utterances_fts
+JOIN utterances_fts_keys k ON k.key = utterances_fts.rowid
+JOIN utterances u ON u.id = k.id
+WHERE utterances_fts MATCH :query
+UNION ALL
+SELECT 'video', v.id, v.id, NULL, NULL,
+       snippet(videos_fts, -1, char(2), char(3), '…', 16),
+       bm25(videos_fts)
+FROM videos_fts
+JOIN videos_fts_keys k ON k.key = videos_fts.rowid
+JOIN videos v ON v.id = k.id
+WHERE videos_fts MATCH :query
+ORDER BY rank
+LIMIT :limit OFFSET :offset
+"""
+
+
+def install_search(engine: Engine) -> None:
+    """
+    Creates the FTS5 indexes as external content tables over the real
+    columns and keeps them in sync with triggers. An index created for an
+    existing database is rebuilt from the rows already there.
+
+    The indexed tables have text primary keys, and their implicit rowids may
+    change on VACUUM. Each index is therefore keyed by a table of its own
+    that gives every id an INTEGER PRIMARY KEY, which VACUUM keeps. Indexes
+    from before the key tables are dropped and rebuilt.
+    """
+    with engine.begin() as conn:
+        tables = set(
+            conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+        )
+        for fts, table, columns in FTS_TABLES:
+            if table not in tables or f"{fts}_keys" in tables:
+                continue
+
+            if fts in tables:
+                _drop_fts(conn, fts)
+            _create_fts(conn, fts, table, columns)
+            conn.execute(text(f"INSERT INTO {fts}_keys(id) SELECT id FROM {table}"))
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def _drop_fts(conn: Connection, fts: str) -> None:
+    for trigger in ("ai", "ad", "au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{trigger}"))
+    conn.execute(text(f"DROP TABLE {fts}"))
+
+
+def _create_fts(
+    conn: Connection, fts: str, table: str, columns: tuple[str, ...]
+) -> None:
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    source = ", ".join(f"t.{c}" for c in columns)
+    new_key = f"(SELECT key FROM {fts}_keys WHERE id = new.id)"
+    old_key = f"(SELECT key FROM {fts}_keys WHERE id = old.id)"
+
+    conn.execute(
+        text(
+            f"CREATE TABLE {fts}_keys "
+            "(key INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE)"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE VIEW {fts}_source AS SELECT k.key, {source} "
+            f"FROM {fts}_keys k JOIN {table} t ON t.id = k.id"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, "
+            f"content='{fts}_source', content_rowid='key', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}_keys(id) VALUES (new.id); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES ({new_key}, {new}); END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+            f"VALUES ('delete', {old_key}, {old}); "
+            f"DELETE FROM {fts}_keys WHERE id = old.id; END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+            f"VALUES ('delete', {old_key}, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES ({new_key}, {new}); END"
+        )
+    )
+
+
+@dataclass
+class SqliteSearch:
+    session: Session
+
+    def search(self, query: str, limit: int, offset: int) -> list[SearchHit]:
+        match = to_match_expression(query)
+        if not match:
+            return []
+
+        rows = self.session.execute(
+            text(SEARCH_QUERY),
+            {"query": match, "limit": limit, "offset": offset},
+        ).all()
+
+        return [
+            SearchHit(
+                kind=SearchHitKind(row.kind),
+                id=row.id,
+                video_id=row.video_id,
+                from_seconds=row.from_seconds,
+                to_seconds=row.to_seconds,
+                snippet=_highlight(row.snippet),
+                rank=row.rank,
+            )
+            for row in rows
+        ]
+
+
+def _highlight(snippet: str) -> str:
+    return (
+        html.escape(snippet)
+        .replace(MATCH_START, "<mark>")
+        .replace(MATCH_END, "</mark>")
+    )
+
+
+def to_match_expression(query: str) -> str:
+    """
+    Turns free text into an FTS5 query: every word must match, the last one
+    as a prefix so results show up while the user is still typing. Quoting
+    each word keeps FTS5 operators in user input from being interpreted.
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in query.split()]
+    if not words:
+        return ""
+
+    words[-1] += "*"
+    return " ".join(words)
@@ -5,6 +5,8 @@ from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.core.base import Base
+from src.infra.sql.search import install_search
+from src.infra.sql.versions import install_versions
 
 
 @dataclass
@@ -23,6 +25,8 @@ class SqliteConnector:
         self.session_maker = sessionmaker(bind=self.eng)
 
         Base.metadata.create_all(self.eng)
+        install_search(self.eng)
+        install_versions(self.eng)
 
     def session(self) -> AbstractContextManager[Session]:
         return self.session_maker()
@@ -0,0 +1,70 @@
+from sqlalchemy import Engine, bindparam, text
+from sqlalchemy.orm import Session
+
+# Tables listings are built from, with the columns whose updates count as a
+# change (None for all of them).
+VERSIONED_TABLES: dict[str, tuple[str, ...] | None] = {
+    "videos": None,
+    "video_metadata": None,
+    "translations": None,
+    # Listings only show whether an artifact exists, reads and size changes
+    # don't matter.
+    "artifacts": ("path", "kind", "owner_id"),
+}
+
+NOW_MILLISECONDS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+VERSION_QUERY = text(
+    "SELECT name, version FROM table_versions WHERE name IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+
+def install_versions(engine: Engine) -> None:
+    """
+    Keeps a counter per table that triggers bump on every write, so callers
+    can tell whether a table changed without reading it. Counters start at
+    the creation time in milliseconds, a fresh database never reuses the
+    versions of an old one.
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS table_versions "
+                "(name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+        )
+        tables = set(
+            conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+        )
+
+        for table, columns in VERSIONED_TABLES.items():
+            if table not in tables:
+                continue
+
+            conn.execute(
+                text(
+                    "INSERT OR IGNORE INTO table_versions (name, version) "
+                    f"VALUES (:name, {NOW_MILLISECONDS})"
+                ),
+                {"name": table},
+            )
+
+            bump = (
+                "BEGIN UPDATE table_versions SET version = version + 1 "
+                f"WHERE name = '{table}'; END"
+            )
+            update = f"UPDATE OF {', '.join(columns)}" if columns else "UPDATE"
+            for suffix, event in (("ai", "INSERT"), ("ad", "DELETE"), ("au", update)):
+                conn.execute(
+                    text(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} "
+                        f"AFTER {event} ON {table} {bump}"
+                    )
+                )
+
+
+def version_tag(session: Session, *tables: str) -> str:
+    """A string that changes whenever any of `tables` does."""
+    versions: dict[str, int] = dict(
+        session.execute(VERSION_QUERY, {"names": list(tables)}).tuples().all()
+    )
+    return ".".join(str(versions.get(table, 0)) for table in tables)
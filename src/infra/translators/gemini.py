@@ -1,10 +1,18 @@
+import io
 import json
+import os
+import re
+import string
+import wave
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, cast
 
 from google.genai import Client, types
 
+from src.core.transcripts import TimedTranslation
 from src.core.translations import (
     Language,
     OCRError,
@@ -21,6 +29,8 @@ class GeminiClient:
 
     model: str = field(default="gemini-2.5-flash")
     tts_model: str = field(default="gemini-2.5-flash-preview-tts")
+    # Requests are capped at 20MB, bigger audio goes through the Files API.
+    inline_max_bytes: int = field(default=16 * 1024 * 1024)
     client: Client = field(init=False)
 
     def __post_init__(self) -> None:
@@ -38,33 +48,134 @@ class GeminiClient:
                 to_language=to_language.value,
             )
         )
-        audio_part = types.Part.from_bytes(
-            data=audio.read(),
-            mime_type="audio/wav",
+        with self._audio_part(audio) as audio_part:
+            contents = types.Content(parts=[prompt, audio_part])
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=TRANSLATE_CONFIG,
+            )
+
+        if not response.text:
+            raise TranslatorError("Can't translate audio clip currently")
+
+        return _parse_translation(response.text)
+
+    def translate_stream(
+        self,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> Iterator[TranslatorResponse]:
+        prompt = types.Part.from_text(
+            text=TRANSLATE_PROMPT.format(
+                from_language=from_language.value,
+                to_language=to_language.value,
+            )
         )
-        contents = types.Content(parts=[prompt, audio_part])
+        text = ""
+        fields: dict[str, str] = {}
+        with self._audio_part(audio) as audio_part:
+            contents = types.Content(parts=[prompt, audio_part])
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=TRANSLATE_CONFIG,
+            ):
+                if not chunk.text:
+                    continue
+
+                text += chunk.text
+                previous, fields = fields, _partial_fields(text)
+                if fields == previous:
+                    continue
+                yield TranslatorResponse(
+                    original_text=fields.get("original", ""),
+                    translated_text=fields.get("translated", ""),
+                )
+
+        if not text:
+            raise TranslatorError("Can't translate audio clip currently")
+
+        yield _parse_translation(text)
+
+    def translate_text(
+        self,
+        text: str,
+        from_language: Language,
+        to_languages: list[Language],
+    ) -> dict[Language, str]:
+        names = [language.value for language in to_languages]
         response = self.client.models.generate_content(
             model=self.model,
-            contents=contents,
+            contents=TRANSLATE_TEXT_PROMPT.format(
+                from_language=from_language.value,
+                to_languages=", ".join(names),
+                text=text,
+            ),
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=types.Schema(
+                    type=types.Type.OBJECT,
+                    properties={
+                        name: types.Schema(type=types.Type.STRING) for name in names
+                    },
+                    required=names,
+                ),
+            ),
         )
 
         if not response.text:
-            raise TranslatorError("Can't translate audio clip currently")
+            raise TranslatorError("Can't translate text currently")
 
-        cleaned = response.text.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.removeprefix("```")
-        if cleaned.endswith("```"):
-            cleaned = cleaned.removesuffix("```")
-        if cleaned.startswith("json"):
-            cleaned = cleaned.removeprefix("json")
-        cleaned = cleaned.strip()
+        try:
+            formatted = json.loads(response.text)
+            return {
+                language: str(formatted[language.value])
+                for language in to_languages
+                if language.value in formatted
+            }
+        except (json.JSONDecodeError, TypeError) as e:
+            raise TranslatorError(f"Malformed translation from model: {e}") from e
 
-        formatted = json.loads(cleaned)
-        return TranslatorResponse(
-            original_text=formatted["original"],
-            translated_text=formatted["translated"],
+    def transcribe(
+        self,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> list[TimedTranslation]:
+        prompt = types.Part.from_text(
+            text=TRANSCRIBE_PROMPT.format(
+                from_language=from_language.value,
+                to_language=to_language.value,
+            )
         )
+        with self._audio_part(audio) as audio_part:
+            contents = types.Content(parts=[prompt, audio_part])
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                ),
+            )
+
+        if not response.text:
+            raise TranslatorError("Can't transcribe audio clip currently")
+
+        try:
+            formatted = json.loads(response.text)
+            return [
+                TimedTranslation(
+                    from_seconds=float(u["start"]),
+                    to_seconds=float(u["end"]),
+                    original_text=u["original"],
+                    translated_text=u["translated"],
+                )
+                for u in formatted
+            ]
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise TranslatorError(f"Malformed transcript from model: {e}") from e
 
     def generate_ocr(self, image: Path) -> str:
         with open(image, "rb") as f:
@@ -116,19 +227,158 @@ class GeminiClient:
 
         return response.candidates[0].content.parts[0].inline_data.data
 
+    @contextmanager
+    def _audio_part(self, audio: BinaryIO) -> Iterator[types.Part]:
+        size = audio.seek(0, os.SEEK_END)
+        audio.seek(0)
+        if size <= self.inline_max_bytes:
+            yield types.Part.from_bytes(data=audio.read(), mime_type="audio/wav")
+            return
+
+        # The SDK uploads the file object in chunks instead of reading it whole.
+        uploaded = self.client.files.upload(
+            file=cast(io.IOBase, audio),
+            config=types.UploadFileConfig(mime_type="audio/wav"),
+        )
+        if not uploaded.uri or not uploaded.name:
+            raise TranslatorError("Can't upload audio clip currently")
+
+        try:
+            yield types.Part.from_uri(file_uri=uploaded.uri, mime_type="audio/wav")
+        finally:
+            self.client.files.delete(name=uploaded.name)
+
+
+def _parse_translation(text: str) -> TranslatorResponse:
+    try:
+        formatted = json.loads(text)
+        return TranslatorResponse(
+            original_text=formatted["original"],
+            translated_text=formatted["translated"],
+        )
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise TranslatorError(f"Malformed translation from model: {e}") from e
+
+
+_FIELD = re.compile(r'"(\w+)"\s*:\s*"')
+_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _partial_fields(text: str) -> dict[str, str]:
+    """Reads the string fields of a JSON object that may still be cut off."""
+    fields = {}
+    position = 0
+    while match := _FIELD.search(text, position):
+        value = []
+        i = match.end()
+        while i < len(text) and text[i] != '"':
+            if text[i] != "\\":
+                value.append(text[i])
+                i += 1
+            elif text[i + 1 : i + 2] == "u" and len(text) >= i + 6:
+                character, length = _unicode_escape(text, i)
+                if not length:
+                    break
+                value.append(character)
+                i += length
+            elif text[i + 1 : i + 2] not in ("", "u"):
+                value.append(_ESCAPES.get(text[i + 1], text[i + 1]))
+                i += 2
+            else:
+                # An escape cut in half, the rest is in the next chunk.
+                break
+
+        fields[match.group(1)] = "".join(value)
+        position = i + 1
+
+    return fields
+
+
+def _unicode_escape(text: str, i: int) -> tuple[str, int]:
+    """
+    Decodes the \\uXXXX escape at `i`, joined with the low half that follows
+    a high surrogate. A length of 0 means the pair is cut off. Escapes that
+    aren't valid decode as U+FFFD, a stream must never hold lone surrogates.
+    """
+    code = _hex(text[i + 2 : i + 6])
+    if code is None or 0xDC00 <= code <= 0xDFFF:
+        return "\ufffd", 6
+    if not 0xD800 <= code <= 0xDBFF:
+        return chr(code), 6
+
+    rest = text[i + 6 : i + 12]
+    low = _hex(rest[2:]) if rest[:2] == "\\u" else None
+    if low is not None and 0xDC00 <= low <= 0xDFFF:
+        return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), 12
+    if len(rest) < 6 and "\\u".startswith(rest[:2]) and _is_hex(rest[2:]):
+        return "", 0
+    return "\ufffd", 6
+
+
+def _hex(digits: str) -> int | None:
+    return int(digits, 16) if len(digits) == 4 and _is_hex(digits) else None
+
+
+def _is_hex(digits: str) -> bool:
+    return all(c in string.hexdigits for c in digits)
+
 
 class FakeGeminiClient:
     def translate(
         self,
-        audio: BinaryIO,  # noqa: ARG002
+        audio: BinaryIO,
         from_language: Language,  # noqa: ARG002
         to_language: Language,  # noqa: ARG002
     ) -> TranslatorResponse:
+        # Consumes the audio like an upload would, without holding it whole.
+        while audio.read(64 * 1024):
+            pass
+
         return TranslatorResponse(
             original_text="original",
             translated_text="translated",
         )
 
+    def translate_stream(
+        self,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> Iterator[TranslatorResponse]:
+        response = self.translate(audio, from_language, to_language)
+        for words in range(1, 3):
+            yield TranslatorResponse(
+                original_text=" ".join(response.original_text.split()[:words]),
+                translated_text=" ".join(response.translated_text.split()[:words]),
+            )
+        yield response
+
+    def translate_text(
+        self,
+        text: str,  # noqa: ARG002
+        from_language: Language,  # noqa: ARG002
+        to_languages: list[Language],
+    ) -> dict[Language, str]:
+        return dict.fromkeys(to_languages, "translated")
+
+    def transcribe(
+        self,
+        audio: BinaryIO,
+        from_language: Language,  # noqa: ARG002
+        to_language: Language,  # noqa: ARG002
+    ) -> list[TimedTranslation]:
+        with wave.open(audio, "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+
+        return [
+            TimedTranslation(
+                from_seconds=0,
+                to_seconds=duration,
+                original_text="original",
+                translated_text="translated",
+            )
+        ]
+
     def generate_ocr(self, image: Path) -> str:  # noqa: ARG002
         return "ocr text"
 
@@ -155,6 +405,53 @@ DO NOT use any formatting, just pure plain json format.
 
 """
 
+# Constrained to one flat object, with the original first so it streams first.
+TRANSLATE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "original": types.Schema(type=types.Type.STRING),
+            "translated": types.Schema(type=types.Type.STRING),
+        },
+        required=["original", "translated"],
+        property_ordering=["original", "translated"],
+    ),
+)
+
+TRANSLATE_TEXT_PROMPT = """
+You are an expert translator from {from_language}.
+Translate the text below into each of these languages: {to_languages}.
+Capture the nuances of the original in every translation.
+
+Your output should only be a json object with one key per language,
+named exactly as listed, holding the translated text.
+
+Text:
+{text}
+"""
+
+TRANSCRIBE_PROMPT = """
+You are an expert translator from {from_language} to {to_language}.
+Transcribe the speech in the audio and translate it, split into utterances
+(sentences or short phrases) with their start and end time in seconds from
+the beginning of the audio.
+
+Your output should only be a json list like this:
+
+[
+    {{
+        "start": 0.0,
+        "end": 2.5,
+        "original": "Original text here.",
+        "translated": "Translated text here."
+    }}
+]
+
+If there is no speech, output an empty list.
+
+"""
+
 IMAGE_OCR_PROMPT = """
 OCR this image and list all the detected words/phrases.
 Do not write anything else.
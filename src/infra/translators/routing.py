@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import io
+import math
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+from src.core.scheduling import SchedulerOverloadedError
+from src.core.translations import (
+    Language,
+    Translator,
+    TranslatorError,
+    TranslatorResponse,
+)
+
+
+@dataclass
+class BackendStats:
+    name: str
+    requests: int
+    error_rate: float
+    p50_seconds: float | None
+    p95_seconds: float | None
+
+
+@dataclass
+class _Samples:
+    window: int
+    window_seconds: float
+
+    # (finished at, seconds taken, succeeded)
+    samples: deque[tuple[float, float, bool]] = field(default_factory=deque)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.samples.append((time.monotonic(), seconds, ok))
+        self._prune()
+
+    def error_rate(self) -> float:
+        self._prune()
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency(self, percentile: float, min_samples: int) -> float | None:
+        self._prune()
+        latencies = sorted(seconds for _, seconds, ok in self.samples if ok)
+        if len(latencies) < max(min_samples, 1):
+            return None
+        index = min(len(latencies) - 1, math.ceil(percentile * len(latencies)) - 1)
+        return latencies[max(index, 0)]
+
+    def _prune(self) -> None:
+        # Old samples age out, so a backend that failed a while ago gets
+        # traffic again and a fresh chance to prove itself.
+        cutoff = time.monotonic() - self.window_seconds
+        while self.samples and (
+            len(self.samples) > self.window or self.samples[0][0] < cutoff
+        ):
+            self.samples.popleft()
+
+
+@dataclass
+class RoutingTranslator:
+    """
+    Sends each translation to the fastest healthy backend, judged on its
+    recent median latency and error rate, and fails over to the next one on
+    error. When the chosen backend takes longer than its own
+    `hedge_percentile` latency, the request is also sent to the runner-up and
+    the first answer wins. Hedges are paid for out of a budget that grows by
+    `max_hedge_ratio` per request, so they never exceed that share of
+    traffic. Audio spooled to disk is never hedged, it would be uploaded
+    twice. Every attempt is a call of its own to a backend, so limits put on
+    the backends, e.g. a scheduler, hold for hedges too.
+    """
+
+    backends: dict[str, Translator]
+    hedge_percentile: float = 0.95
+    max_hedge_ratio: float = 0.1
+    max_hedge_burst: float = 5
+    max_error_rate: float = 0.5
+    min_samples: int = 10
+    window: int = 200
+    window_seconds: float = 300
+    max_workers: int = 16
+
+    _samples: dict[str, _Samples] = field(init=False)
+    _hedge_budget: float = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _pool: ThreadPoolExecutor = field(init=False)
+
+    def __post_init__(self) -> None:
+        if not self.backends:
+            raise ValueError("At least one translator backend is required.")
+
+        self._samples = {
+            name: _Samples(self.window, self.window_seconds) for name in self.backends
+        }
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="translate"
+        )
+
+    def translate(
+        self,
+        file: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> TranslatorResponse:
+        with self._lock:
+            self._hedge_budget = min(
+                self._hedge_budget + self.max_hedge_ratio, self.max_hedge_burst
+            )
+
+        ranked = iter(self._rank())
+        audio = _replayable(file)
+        pending: dict[Future[TranslatorResponse], str] = {}
+        errors: list[Exception] = []
+
+        def start() -> None:
+            name = next(ranked, None)
+            if name is not None:
+                # Attempts carry the caller's context, e.g. its priority.
+                future = self._pool.submit(
+                    copy_context().run,
+                    self._call,
+                    name,
+                    audio(),
+                    from_language,
+                    to_language,
+                )
+                pending[future] = name
+
+        start()
+        primary = next(iter(pending.values()))
+        hedge_at = self._hedge_at(primary) if isinstance(file, io.BytesIO) else None
+
+        while pending:
+            timeout = None
+            if hedge_at is not None:
+                timeout = max(0.0, hedge_at - time.monotonic())
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge_at = None
+                if self._take_hedge():
+                    start()
+                continue
+
+            for future in done:
+                del pending[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+
+                # A hedge still waiting for a worker isn't sent at all.
+                for other in pending:
+                    other.cancel()
+                return response
+
+            if not pending:
+                hedge_at = None
+                start()
+
+        last = errors[-1]
+        if isinstance(last, TranslatorError | SchedulerOverloadedError):
+            raise last
+        raise TranslatorError(f"All translators failed: {last}") from last
+
+    def stats(self) -> list[BackendStats]:
+        with self._lock:
+            return [
+                BackendStats(
+                    name=name,
+                    requests=len(samples.samples),
+                    error_rate=samples.error_rate(),
+                    p50_seconds=samples.latency(0.5, 1),
+                    p95_seconds=samples.latency(0.95, 1),
+                )
+                for name, samples in self._samples.items()
+            ]
+
+    def _call(
+        self,
+        name: str,
+        audio: BinaryIO,
+        from_language: Language,
+        to_language: Language,
+    ) -> TranslatorResponse:
+        start = time.monotonic()
+        try:
+            response = self.backends[name].translate(audio, from_language, to_language)
+        except SchedulerOverloadedError:
+            # Turned away before reaching the backend, says nothing about it.
+            raise
+        except Exception:
+            self._record(name, time.monotonic() - start, ok=False)
+            raise
+
+        self._record(name, time.monotonic() - start, ok=True)
+        return response
+
+    def _rank(self) -> list[str]:
+        with self._lock:
+            healthy = []
+            unhealthy = []
+            for name, samples in self._samples.items():
+                error_rate = samples.error_rate()
+                if error_rate > self.max_error_rate:
+                    unhealthy.append((error_rate, name))
+                else:
+                    # Backends without enough samples go first to get some.
+                    median = samples.latency(0.5, self.min_samples)
+                    healthy.append((median or 0.0, name))
+
+        return [name for _, name in sorted(healthy) + sorted(unhealthy)]
+
+    def _hedge_at(self, name: str) -> float | None:
+        if len(self.backends) < 2:
+            return None
+        with self._lock:
+            delay = self._samples[name].latency(self.hedge_percentile, self.min_samples)
+        return None if delay is None else time.monotonic() + delay
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self._hedge_budget < 1:
+                return False
+            self._hedge_budget -= 1
+            return True
+
+    def _record(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples[name].record(seconds, ok)
+
+
+def _replayable(file: BinaryIO) -> Callable[[], BinaryIO]:
+    """Returns a function giving each attempt the audio from the start."""
+    if isinstance(file, io.BytesIO):
+        # Every attempt gets its own position over the same bytes.
+        data = file.getvalue()
+        return lambda: io.BytesIO(data)
+
+    def rewind() -> BinaryIO:
+        file.seek(0)
+        return file
+
+    return rewind
+
+
+@dataclass
+class FakeTranslator:
+    """
+    Answers after a log-normally distributed delay, so tests and local runs
+    can give backends a realistic tail. `error_rate` of calls fail.
+    """
+
+    median_seconds: float = 0.05
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    seed: int | None = None
+
+    _random: random.Random = field(init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def translate(
+        self,
+        file: BinaryIO,
+        from_language: Language,  # noqa: ARG002
+        to_language: Language,  # noqa: ARG002
+    ) -> TranslatorResponse:
+        while file.read(64 * 1024):
+            pass
+
+        with self._lock:
+            delay = self._random.lognormvariate(
+                math.log(self.median_seconds), self.sigma
+            )
+            failed = self._random.random() < self.error_rate
+
+        time.sleep(delay)
+        if failed:
+            raise TranslatorError("Fake translator failure.")
+
+        return TranslatorResponse(
+            original_text="original",
+            translated_text="translated",
+        )
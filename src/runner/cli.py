@@ -1,19 +1,59 @@
 import os
+import sys
+from pathlib import Path
+from typing import Annotated
 
+import typer
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from typer import Typer
 
-from src.infra.downloaders.http import HttpVideoDownloader
+from src.core.artifacts import ArtifactService
+from src.core.chapters import ChapterService
+from src.core.ingest import IngestCheckpoint, IngestPipeline, IngestReport
+from src.core.scheduling import (
+    ScheduledMediaProcessor,
+    ScheduledOCRGenerator,
+    ScheduledStreamingTranslator,
+    ScheduledTextTranslator,
+    ScheduledTranscriber,
+    ScheduledTranslator,
+    ScheduledTTSGenerator,
+    Scheduler,
+    SchedulerOverloadedError,
+)
+from src.core.translations import (
+    Language,
+    SpeechStatus,
+    TranslationService,
+    Translator,
+    TTSGenerator,
+)
+from src.core.videos import OCRGenerator, VideoService
 from src.infra.fastapi.index import index_router
+from src.infra.fastapi.scheduling import WorkContextMiddleware, scheduler_overloaded
+from src.infra.fastapi.search import search_router
 from src.infra.fastapi.translations import translation_router
 from src.infra.fastapi.videos import video_router
 from src.infra.translators.gemini import FakeGeminiClient, GeminiClient
-from src.runner.config import connector
+from src.runner.config import (
+    artifact_budget_bytes,
+    audio_spool_max_bytes,
+    connector,
+    media_processor,
+    media_scheduler,
+    model_scheduler,
+    routing_translator,
+    single_flight,
+    translator_models,
+    video_downloader,
+)
 
 cli = Typer()
+artifacts_cli = Typer(help="Inspect and trim derived files under data/.")
+cli.add_typer(artifacts_cli, name="artifacts")
 
 
 @cli.command(name="run")
@@ -31,18 +71,276 @@ def run(
     )
 
 
+@cli.command(name="ingest")
+def ingest(
+    file: str = typer.Argument(help="File with one MP4 URL per line, - for stdin."),
+    checkpoint: Path = Path("data/ingest.checkpoint"),
+    download_workers: int = 8,
+    process_workers: int = 2,
+    batch_size: int = 50,
+    package: bool = False,
+) -> None:  # pragma: no cover
+    load_dotenv()
+
+    if file == "-":
+        urls = sys.stdin.read().splitlines()
+    else:
+        urls = Path(file).read_text().splitlines()
+
+    media = media_processor(workers=process_workers)
+    pipeline = IngestPipeline(
+        connector=connector(),
+        video_downloader=video_downloader(),
+        ocr=get_ocr_generator(),
+        media=media,
+        checkpoint=IngestCheckpoint(checkpoint),
+        download_workers=download_workers,
+        process_workers=process_workers,
+        batch_size=batch_size,
+        package=package,
+    )
+
+    def progress(report: IngestReport) -> None:
+        typer.echo(f"Committed {report.succeeded} videos, {len(report.failed)} failed.")
+
+    try:
+        report = pipeline.run(urls, on_batch=progress)
+    finally:
+        media.close()
+
+    for failure in report.failed:
+        typer.echo(f"Failed {failure.url}: {failure.error}", err=True)
+    typer.echo(
+        f"Done: {report.succeeded} ingested, {len(report.failed)} failed, "
+        f"{report.skipped} already ingested."
+    )
+
+    if report.failed:
+        raise typer.Exit(code=1)
+
+
+@cli.command(name="tts")
+def tts(
+    translation_ids: Annotated[list[str] | None, typer.Argument()] = None,
+    video_id: str | None = None,
+    workers: int = 4,
+) -> None:  # pragma: no cover
+    load_dotenv()
+
+    if bool(video_id) == bool(translation_ids):
+        typer.echo("Provide either --video-id or translation ids.", err=True)
+        raise typer.Exit(code=2)
+
+    media = media_processor(workers=0)
+    try:
+        with connector().session() as session, session.begin():
+            service = TranslationService(
+                session=session,
+                video_service=VideoService(
+                    session=session,
+                    video_downloader=video_downloader(),
+                    ocr=get_ocr_generator(),
+                    media=media,
+                ),
+                translator=FakeGeminiClient(),
+                tts=get_tts_generator(),
+            )
+            if video_id:
+                report = service.generate_speech_for_video(video_id, workers)
+            else:
+                report = service.generate_speech_for_translations(
+                    translation_ids or [], workers
+                )
+    finally:
+        media.close()
+
+    for result in report.results:
+        if result.status == SpeechStatus.FAILED:
+            typer.echo(f"Failed {result.translation_id}: {result.error}", err=True)
+    typer.echo(
+        f"Done: {report.count(SpeechStatus.GENERATED)} generated, "
+        f"{report.count(SpeechStatus.SHARED)} shared, "
+        f"{report.count(SpeechStatus.EXISTS)} already had audio, "
+        f"{report.count(SpeechStatus.NOT_FOUND)} not found, "
+        f"{report.count(SpeechStatus.FAILED)} failed."
+    )
+
+    if report.count(SpeechStatus.FAILED):
+        raise typer.Exit(code=1)
+
+
+@cli.command(name="dub")
+def dub(
+    video_id: str,
+    language: Language = Language.SPANISH,
+    workers: int = 4,
+) -> None:  # pragma: no cover
+    load_dotenv()
+
+    media = media_processor(workers=0)
+    try:
+        with connector().session() as session, session.begin():
+            service = TranslationService(
+                session=session,
+                video_service=VideoService(
+                    session=session,
+                    video_downloader=video_downloader(),
+                    ocr=get_ocr_generator(),
+                    media=media,
+                ),
+                translator=FakeGeminiClient(),
+                tts=get_tts_generator(),
+            )
+            output = service.render_dub(video_id, language, workers)
+    finally:
+        media.close()
+
+    typer.echo(f"Done: {output}")
+
+
+@cli.command(name="chapters")
+def chapters(video_id: str, ocr: bool = False) -> None:  # pragma: no cover
+    load_dotenv()
+
+    media = media_processor(workers=0)
+    try:
+        with connector().session() as session, session.begin():
+            video_service = VideoService(
+                session=session,
+                video_downloader=video_downloader(),
+                ocr=get_ocr_generator(),
+                media=media,
+            )
+            service = ChapterService(
+                session=session,
+                video_service=video_service,
+                translation_service=TranslationService(
+                    session=session,
+                    video_service=video_service,
+                    translator=FakeGeminiClient(),
+                    tts=get_tts_generator(),
+                ),
+            )
+            found = service.detect_chapters(video_id)
+            if ocr:
+                found = service.ocr_chapters(video_id)
+
+            for chapter in found:
+                line = (
+                    f"{chapter.number}: "
+                    f"{chapter.from_seconds:.2f}-{chapter.to_seconds:.2f}s"
+                )
+                if chapter.ocr_text:
+                    line += f" {chapter.ocr_text!r}"
+                typer.echo(line)
+    finally:
+        media.close()
+
+    typer.echo(f"Done: {len(found)} chapters.")
+
+
+@artifacts_cli.command(name="report")
+def artifacts_report() -> None:  # pragma: no cover
+    load_dotenv()
+
+    with connector().session() as session, session.begin():
+        report = ArtifactService(
+            session=session, budget_bytes=artifact_budget_bytes()
+        ).report()
+
+    for usage in report.usage:
+        typer.echo(f"{usage.kind.value}: {usage.count} files, {usage.size_bytes} bytes")
+    budget = "none" if report.budget_bytes is None else f"{report.budget_bytes} bytes"
+    typer.echo(
+        f"Total: {report.size_bytes} bytes, {report.regenerable_bytes} regenerable, "
+        f"budget {budget}."
+    )
+
+
+@artifacts_cli.command(name="purge")
+def artifacts_purge(budget: int | None = None) -> None:  # pragma: no cover
+    load_dotenv()
+
+    with connector().session() as session, session.begin():
+        report = ArtifactService(
+            session=session, budget_bytes=artifact_budget_bytes()
+        ).purge(budget)
+
+    typer.echo(
+        f"Done: {len(report.evicted)} evicted ({report.evicted_bytes} bytes), "
+        f"{len(report.orphans)} orphans removed ({report.orphan_bytes} bytes)."
+    )
+
+
+def get_ocr_generator() -> OCRGenerator:
+    if "GEMINI_API_KEY" in os.environ:
+        return GeminiClient(os.environ["GEMINI_API_KEY"])
+    return FakeGeminiClient()
+
+
+def get_tts_generator() -> TTSGenerator:
+    if "GEMINI_API_KEY" in os.environ:
+        return GeminiClient(os.environ["GEMINI_API_KEY"])
+    return FakeGeminiClient()
+
+
+def get_translator(
+    model: GeminiClient | FakeGeminiClient, scheduler: Scheduler
+) -> Translator:
+    models = translator_models()
+    if not isinstance(model, GeminiClient) or len(models) < 2:
+        return ScheduledTranslator(model, scheduler)
+
+    # Each backend call takes its own slot, hedges included.
+    return routing_translator(
+        {
+            name: ScheduledTranslator(
+                GeminiClient(model.api_key, model=name), scheduler
+            )
+            for name in models
+        }
+    )
+
+
 def get_app() -> FastAPI:
     app = FastAPI()
     app.state.db = connector()
-    app.state.video_downloader = HttpVideoDownloader()
+    app.state.video_downloader = video_downloader()
+    app.state.media_processor = ScheduledMediaProcessor(
+        media_processor(), media_scheduler()
+    )
+    app.state.audio_spool_max_bytes = audio_spool_max_bytes()
+    app.state.single_flight = single_flight()
+
+    # Listings flag artifacts by their rows, files from before need one too.
+    with app.state.db.session() as session, session.begin():
+        ArtifactService(session=session).sync()
 
-    app.state.translator = FakeGeminiClient()
-    app.state.ocr_generator = FakeGeminiClient()
-    app.state.tts_generator = FakeGeminiClient()
+    model: GeminiClient | FakeGeminiClient = FakeGeminiClient()
     if "GEMINI_API_KEY" in os.environ:
-        app.state.translator = GeminiClient(os.environ["GEMINI_API_KEY"])
-        app.state.ocr_generator = GeminiClient(os.environ["GEMINI_API_KEY"])
-        app.state.tts_generator = GeminiClient(os.environ["GEMINI_API_KEY"])
+        model = GeminiClient(os.environ["GEMINI_API_KEY"])
+
+    # All model calls share one quota, so they share one scheduler.
+    scheduler = model_scheduler()
+    app.state.translator = get_translator(model, scheduler)
+    app.state.streaming_translator = ScheduledStreamingTranslator(model, scheduler)
+    app.state.text_translator = ScheduledTextTranslator(model, scheduler)
+    app.state.ocr_generator = ScheduledOCRGenerator(model, scheduler)
+    app.state.tts_generator = ScheduledTTSGenerator(model, scheduler)
+    app.state.transcriber = ScheduledTranscriber(model, scheduler)
+
+    # Uploads and ingest store metadata with the video, so listings never
+    # probe. Videos from before that are probed once, here.
+    with app.state.db.session() as session, session.begin():
+        VideoService(
+            session=session,
+            video_downloader=app.state.video_downloader,
+            ocr=app.state.ocr_generator,
+            media=app.state.media_processor,
+        ).extract_missing_video_metadata()
+
+    app.add_middleware(WorkContextMiddleware)
+    app.add_exception_handler(SchedulerOverloadedError, scheduler_overloaded)
 
     app.mount(
         "/static",
@@ -58,5 +356,6 @@ def get_app() -> FastAPI:
     app.include_router(index_router)
     app.include_router(video_router)
     app.include_router(translation_router)
+    app.include_router(search_router)
 
     return app
@@ -1,8 +1,79 @@
 import os
+from functools import partial
 
 from src.core.base import Connector
+from src.core.scheduling import Scheduler
+from src.core.singleflight import SingleFlight
+from src.core.translations import Translator
+from src.core.videos import MediaProcessor, VideoDownloader
+from src.infra.downloaders.http import HttpVideoDownloader
+from src.infra.media.moviepy import MoviePyMediaProcessor
+from src.infra.media.pool import MediaWorkerPool
+from src.infra.sql.leases import SqliteLeases
 from src.infra.sql.sqlite import SqliteConnector
+from src.infra.translators.routing import RoutingTranslator
 
 
 def connector() -> Connector:
     return SqliteConnector(db_url=os.getenv("DB"))
+
+
+def video_downloader() -> VideoDownloader:
+    return HttpVideoDownloader(
+        max_bytes=int(os.getenv("DOWNLOAD_MAX_BYTES", str(2 * 1024**3))),
+        max_concurrent=int(os.getenv("DOWNLOAD_CONCURRENCY", "4")),
+    )
+
+
+def media_processor(workers: int | None = None) -> MediaProcessor:
+    if workers is None:
+        workers = int(os.getenv("MEDIA_WORKERS", "2"))
+
+    reader_cache_size = int(os.getenv("MEDIA_READER_CACHE_SIZE", "4"))
+    if workers <= 0:
+        return MoviePyMediaProcessor(reader_cache_size=reader_cache_size)
+
+    return MediaWorkerPool(
+        factory=partial(MoviePyMediaProcessor, reader_cache_size=reader_cache_size),
+        workers=workers,
+        timeout=float(os.getenv("MEDIA_TASK_TIMEOUT", "120")),
+        max_tasks_per_worker=int(os.getenv("MEDIA_MAX_TASKS_PER_WORKER", "200")),
+    )
+
+
+def audio_spool_max_bytes() -> int:
+    return int(os.getenv("AUDIO_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+def artifact_budget_bytes() -> int | None:
+    budget = os.getenv("ARTIFACT_BUDGET_BYTES")
+    return int(budget) if budget else None
+
+
+def single_flight() -> SingleFlight:
+    # An in-memory database is private to this process, nothing to share.
+    db_url = os.getenv("DB")
+    return SingleFlight(leases=SqliteLeases(db_url) if db_url else None)
+
+
+def model_scheduler() -> Scheduler:
+    return Scheduler("model", slots=int(os.getenv("MODEL_CONCURRENCY", "4")))
+
+
+def media_scheduler() -> Scheduler:
+    # One slot per worker process, so queued work is ordered here, not FIFO
+    # inside the pool.
+    slots = int(os.getenv("MEDIA_CONCURRENCY", os.getenv("MEDIA_WORKERS", "2")))
+    return Scheduler("media", slots=max(1, slots))
+
+
+def translator_models() -> list[str]:
+    models = os.getenv("TRANSLATOR_MODELS", "")
+    return [model.strip() for model in models.split(",") if model.strip()]
+
+
+def routing_translator(backends: dict[str, Translator]) -> RoutingTranslator:
+    return RoutingTranslator(
+        backends,
+        max_hedge_ratio=float(os.getenv("TRANSLATOR_HEDGE_RATIO", "0.1")),
+    )
@@ -0,0 +1,122 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.artifacts import Artifact, ArtifactKind, ArtifactService
+from src.core.translations import Language, Translation, TranslationService
+from src.core.videos import Video, VideoService
+from src.infra.sql.sqlite import SqliteConnector
+
+SIZE = 100
+
+
+class FakeMediaProcessor:
+    def __init__(self) -> None:
+        self.waveforms = 0
+
+    def waveform(self, video: Path, output: Path) -> None:  # noqa: ARG002
+        self.waveforms += 1
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"peaks")
+
+
+class FakeTTS:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def text_to_speech(self, translation: Translation) -> bytes:  # noqa: ARG002
+        self.calls += 1
+        return b"\x00\x00"
+
+
+@pytest.fixture
+def connector(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SqliteConnector:
+    monkeypatch.chdir(tmp_path)
+    return SqliteConnector("db.sqlite")
+
+
+def _write(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * SIZE)
+    return path
+
+
+def _record(
+    artifacts: ArtifactService, path: Path, kind: ArtifactKind, ago: float
+) -> None:
+    artifacts.record(path, kind)
+    artifact = artifacts.session.get(Artifact, str(path))
+    assert artifact is not None
+    artifact.last_access = time.time() - ago
+
+
+def test_cheap_stale_artifacts_are_evicted_first(connector: SqliteConnector) -> None:
+    video = _write(Path("data/videos/a.mp4"))
+    package = _write(Path("data/hls/a/index.m3u8")).parent
+    thumbnail = _write(Path("data/thumbnails/a.png"))
+    waveform = _write(Path("data/waveforms/a.peaks"))
+    speech = _write(Path("data/speeches/t.wav"))
+
+    with connector.session() as session, session.begin():
+        artifacts = ArtifactService(session=session)
+        _record(artifacts, video, ArtifactKind.VIDEO, 10_000)
+        _record(artifacts, package, ArtifactKind.HLS, 10_000)
+        # Rebuilding speech costs more than being read recently makes up for.
+        _record(artifacts, thumbnail, ArtifactKind.THUMBNAIL, 10_000)
+        _record(artifacts, speech, ArtifactKind.SPEECH, 10_000)
+        _record(artifacts, waveform, ArtifactKind.WAVEFORM, 0)
+
+        report = artifacts.purge(budget_bytes=SIZE)
+        assert report.evicted == [str(thumbnail), str(waveform)]
+
+        report = artifacts.purge(budget_bytes=0)
+        assert report.evicted == [str(speech)]
+        assert artifacts.was_evicted(speech)
+
+    assert video.is_file()
+    assert package.is_dir()
+
+
+def test_evicted_speech_and_waveform_are_rebuilt(connector: SqliteConnector) -> None:
+    _write(Path("data/videos/a.mp4"))
+    Path("data/speeches").mkdir(parents=True)
+    media = FakeMediaProcessor()
+    tts = FakeTTS()
+
+    with connector.session() as session, session.begin():
+        session.add(Video("https://example.com", id="a"))
+        session.flush()
+        session.add(
+            Translation(
+                "a", 0, 1, Language.ENGLISH, Language.SPANISH, "hi", "hola", id="t"
+            )
+        )
+        videos = VideoService(
+            session=session,
+            video_downloader=None,  # type: ignore[arg-type]
+            ocr=None,  # type: ignore[arg-type]
+            media=media,  # type: ignore[arg-type]
+        )
+        translations = TranslationService(
+            session=session,
+            video_service=videos,
+            translator=None,  # type: ignore[arg-type]
+            tts=tts,
+        )
+        artifacts = ArtifactService(session=session)
+
+        waveform = videos.get_waveform_path("a", videos.get_video("a").video_type)
+        artifacts.touch(waveform, ArtifactKind.WAVEFORM)
+        speech = translations.get_speech_path(
+            translations.generate_speech_for_translation("t").id
+        )
+        artifacts.purge(budget_bytes=0)
+        assert not waveform.exists()
+        assert not speech.exists()
+
+        assert videos.get_waveform_path("a", videos.get_video("a").video_type).is_file()
+        assert translations.get_speech_path("t").is_file()
+        assert not artifacts.was_evicted(speech)
+
+    assert (media.waveforms, tts.calls) == (2, 2)
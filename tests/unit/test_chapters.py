@@ -0,0 +1,34 @@
+from src.core.chapters import Chapter, _segments
+
+
+def _chapters(*bounds: float) -> list[Chapter]:
+    return [
+        Chapter(
+            video_id="video",
+            number=number,
+            from_seconds=start,
+            to_seconds=end,
+            keyframe_seconds=start,
+        )
+        for number, (start, end) in enumerate(zip(bounds, bounds[1:], strict=False))
+    ]
+
+
+def test_short_chapters_are_merged_up_to_the_limit() -> None:
+    chapters = _chapters(*range(0, 1201, 2))
+
+    segments = _segments(chapters, 120)
+
+    assert segments == [(start, start + 120) for start in range(0, 1200, 120)]
+
+
+def test_segments_are_cut_between_chapters() -> None:
+    chapters = _chapters(0, 50, 100, 130, 140)
+
+    assert _segments(chapters, 120) == [(0, 100), (100, 140)]
+
+
+def test_long_chapter_is_split_evenly() -> None:
+    chapters = _chapters(0, 10, 310)
+
+    assert _segments(chapters, 120) == [(0, 10), (10, 110), (110, 210), (210, 310)]
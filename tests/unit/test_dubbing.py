@@ -0,0 +1,69 @@
+import subprocess
+import wave
+from pathlib import Path
+
+import pytest
+from moviepy.config import FFMPEG_BINARY
+
+from src.core.videos import DubSegment, MediaProcessingError
+from src.infra.media.dubbing import render_dub
+
+
+@pytest.fixture
+def video(tmp_path: Path) -> Path:
+    path = tmp_path / "video.mp4"
+    subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=size=64x36:rate=5:duration=30",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=frequency=440:duration=30",
+            "-shortest",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def test_render_dub_fails_fast_on_bad_clip(video: Path, tmp_path: Path) -> None:
+    speech = tmp_path / "speech.wav"
+    with wave.open(str(speech), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(1)
+        wf.setframerate(8000)
+        wf.writeframes(bytes(8000))
+
+    output = tmp_path / "dubbed.mp4"
+    segments = [DubSegment(speech=speech, from_seconds=25, to_seconds=26)]
+
+    with pytest.raises(MediaProcessingError, match="sample width"):
+        render_dub(video, segments, output)
+
+    assert not output.exists()
+    assert not output.with_name(f"{output.name}.part").exists()
+
+
+def test_render_dub_reports_a_dead_muxer(video: Path, tmp_path: Path) -> None:
+    speech = tmp_path / "speech.wav"
+    with wave.open(str(speech), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(24000)
+        wf.writeframes(bytes(48000))
+
+    # The muxer can't open its output and exits while audio is still coming.
+    output = tmp_path / "missing" / "dubbed.mp4"
+    segments = [DubSegment(speech=speech, from_seconds=1, to_seconds=2)]
+
+    with pytest.raises(MediaProcessingError, match="ffmpeg failed: .+"):
+        render_dub(video, segments, output)
+
+    assert not output.with_name(f"{output.name}.part").exists()
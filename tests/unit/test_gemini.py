@@ -0,0 +1,162 @@
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+import pytest
+from google.genai import types
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.core import Base
+from src.core.translations import Language, TranslationService
+from src.core.videos import MediaProcessingError, VideoService, VideoType
+from src.infra.translators.gemini import (
+    FakeGeminiClient,
+    GeminiClient,
+    _partial_fields,
+)
+
+MIB = 1024 * 1024
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"text": "a\\u00e9b"}', "aéb"),
+        ('{"text": "a\\ud83d\\ude00b"}', "a\U0001f600b"),
+        # Cut inside the pair: the character waits for the next chunk.
+        ('{"text": "a\\ud83d', "a"),
+        ('{"text": "a\\ud83d\\ude0', "a"),
+        ('{"text": "a\\ud83d\\', "a"),
+        ('{"text": "a\\ude00b"}', "a�b"),
+        ('{"text": "a\\ud83db"}', "a�b"),
+        ('{"text": "a\\uZZZZb"}', "a�b"),
+    ],
+)
+def test_partial_fields_decodes_unicode_escapes(text: str, expected: str) -> None:
+    value = _partial_fields(text)["text"]
+
+    assert value == expected
+    value.encode()
+
+
+class LargeAudioMediaProcessor:
+    """Writes `size` bytes of audio a chunk at a time."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def extract_audio(
+        self,
+        video: Path,  # noqa: ARG002
+        from_seconds: float,  # noqa: ARG002
+        to_seconds: float,  # noqa: ARG002
+        output: Path,
+    ) -> None:
+        with open(output, "wb") as f:
+            for _ in range(self.size // MIB):
+                f.write(bytes(MIB))
+
+    def index(self, video: Path, output: Path) -> None:  # noqa: ARG002
+        raise MediaProcessingError("Not indexable.")
+
+
+@pytest.fixture
+def session(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Session]:
+    monkeypatch.chdir(tmp_path)
+    Path("data/videos").mkdir(parents=True)
+    Path("data/videos/video.mp4").touch()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_large_segment_is_streamed_from_disk(session: Session) -> None:
+    video_service = VideoService(
+        session=session,
+        video_downloader=None,  # type: ignore[arg-type]
+        ocr=None,  # type: ignore[arg-type]
+        media=LargeAudioMediaProcessor(64 * MIB),  # type: ignore[arg-type]
+    )
+    service = TranslationService(
+        session=session,
+        video_service=video_service,
+        translator=FakeGeminiClient(),
+        tts=FakeGeminiClient(),
+    )
+
+    tracemalloc.start()
+    try:
+        translation = service.translate_audio_segment(
+            "video", VideoType.MP4, 0, 600, Language.ENGLISH, Language.SPANISH
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert translation.translated_text == "translated"
+    # Far below the spool threshold, let alone the 64 MiB segment.
+    assert peak < 4 * MIB
+
+
+@dataclass
+class FakeFiles:
+    uploaded: list[BinaryIO] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    def upload(
+        self,
+        file: BinaryIO,
+        config: types.UploadFileConfig,  # noqa: ARG002
+    ) -> types.File:
+        self.uploaded.append(file)
+        return types.File(name="files/audio", uri="https://example.com/files/audio")
+
+    def delete(self, name: str) -> None:
+        self.deleted.append(name)
+
+
+@pytest.fixture
+def files() -> FakeFiles:
+    return FakeFiles()
+
+
+@pytest.fixture
+def gemini(files: FakeFiles) -> GeminiClient:
+    gemini = GeminiClient(api_key="key")
+    gemini.client = type("FakeClient", (), {"files": files})()
+    return gemini
+
+
+def _audio(tmp_path: Path, size: int) -> BinaryIO:
+    path = tmp_path / "audio.wav"
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return open(path, "rb")  # noqa: SIM115
+
+
+def test_audio_up_to_the_limit_is_sent_inline(
+    gemini: GeminiClient, files: FakeFiles, tmp_path: Path
+) -> None:
+    with _audio(tmp_path, 16 * MIB) as audio, gemini._audio_part(audio) as part:
+        assert part.inline_data is not None
+        assert len(part.inline_data.data or b"") == 16 * MIB
+
+    assert not files.uploaded
+
+
+def test_larger_audio_is_uploaded_and_deleted(
+    gemini: GeminiClient, files: FakeFiles, tmp_path: Path
+) -> None:
+    with _audio(tmp_path, 16 * MIB + 1) as audio:
+        with gemini._audio_part(audio) as part:
+            assert part.file_data is not None
+            assert part.file_data.file_uri == "https://example.com/files/audio"
+            assert files.uploaded == [audio]
+            assert not files.deleted
+
+        assert files.deleted == ["files/audio"]
@@ -0,0 +1,136 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.ingest import IngestCheckpoint, IngestPipeline
+from src.core.videos import MediaProcessingError, VideoMetadata, VideoType
+from src.infra.sql.sqlite import SqliteConnector
+
+DOWNLOAD_WORKERS = 2
+PROCESS_WORKERS = 1
+
+
+class FakeDownloader:
+    """Writes the URL into the video file, processing reads it back."""
+
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def download_video(
+        self,
+        url: str,
+        local_path: Path,
+        video_id: str,
+        video_type: VideoType = VideoType.MP4,
+    ) -> None:
+        self.urls.append(url)
+        local_path.mkdir(parents=True, exist_ok=True)
+        (local_path / f"{video_id}.{video_type.value}").write_text(url)
+
+
+class FakeMediaProcessor:
+    """Fails to probe videos whose URL says so, after writing the rest."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.downloaded_ahead = 0
+
+    def index(self, video: Path, output: Path) -> None:  # noqa: ARG002
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"index")
+
+    def grab_frame(
+        self,
+        video: Path,  # noqa: ARG002
+        at_seconds: float,  # noqa: ARG002
+        output: Path,
+        index: Path | None = None,  # noqa: ARG002
+    ) -> None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"png")
+
+    def probe(self, video: Path) -> VideoMetadata:
+        with self.lock:
+            unprocessed = sum(
+                1
+                for path in video.parent.glob("*.mp4")
+                if not Path(f"data/thumbnails/{path.stem}.png").is_file()
+            )
+            self.downloaded_ahead = max(self.downloaded_ahead, unprocessed)
+
+        time.sleep(0.01)
+        if "corrupt" in video.read_text():
+            raise MediaProcessingError("moov atom not found")
+        return VideoMetadata(duration_sec=1, width=1, height=1)
+
+
+class FakeOCR:
+    def generate_ocr(self, image: Path) -> str:  # noqa: ARG002
+        return ""
+
+
+@pytest.fixture
+def media(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> FakeMediaProcessor:
+    monkeypatch.chdir(tmp_path)
+    return FakeMediaProcessor()
+
+
+def _pipeline(
+    media: FakeMediaProcessor, downloader: FakeDownloader, connector: SqliteConnector
+) -> IngestPipeline:
+    return IngestPipeline(
+        connector=connector,
+        video_downloader=downloader,
+        ocr=FakeOCR(),
+        media=media,  # type: ignore[arg-type]
+        checkpoint=IngestCheckpoint(Path("ingest.checkpoint")),
+        download_workers=DOWNLOAD_WORKERS,
+        process_workers=PROCESS_WORKERS,
+        batch_size=2,
+    )
+
+
+def test_resumed_run_only_fetches_new_urls(media: FakeMediaProcessor) -> None:
+    connector = SqliteConnector("db.sqlite")
+    first = _pipeline(media, FakeDownloader(), connector).run(["a", "b", "c"])
+
+    downloader = FakeDownloader()
+    second = _pipeline(media, downloader, connector).run(["a", "b", "c", "d", "e"])
+
+    assert first.succeeded == 3
+    assert (second.succeeded, second.skipped) == (2, 3)
+    assert sorted(downloader.urls) == ["d", "e"]
+    assert len(Path("ingest.checkpoint").read_text().splitlines()) == 5
+
+
+def test_checkpoint_alone_skips_urls(media: FakeMediaProcessor) -> None:
+    # A run whose rows are gone, e.g. another database, still resumes.
+    Path("ingest.checkpoint").write_text('{"url": "a", "video_id": "1"}\n{"url"')
+    downloader = FakeDownloader()
+
+    report = _pipeline(media, downloader, SqliteConnector("db.sqlite")).run(["a", "b"])
+
+    assert (report.succeeded, report.skipped) == (1, 1)
+    assert downloader.urls == ["b"]
+
+
+def test_failed_processing_leaves_no_files(media: FakeMediaProcessor) -> None:
+    pipeline = _pipeline(media, FakeDownloader(), SqliteConnector("db.sqlite"))
+
+    report = pipeline.run(["good", "corrupt"])
+
+    assert report.succeeded == 1
+    assert [failure.url for failure in report.failed] == ["corrupt"]
+    for directory in ("videos", "thumbnails", "indexes"):
+        assert len(list(Path(f"data/{directory}").iterdir())) == 1
+
+
+def test_downloads_only_run_a_few_videos_ahead(media: FakeMediaProcessor) -> None:
+    pipeline = _pipeline(media, FakeDownloader(), SqliteConnector("db.sqlite"))
+
+    report = pipeline.run([f"url-{i}" for i in range(30)])
+
+    assert report.succeeded == 30
+    assert media.downloaded_ahead <= DOWNLOAD_WORKERS + PROCESS_WORKERS
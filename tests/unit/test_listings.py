@@ -0,0 +1,151 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from src.core.artifacts import ArtifactKind, ArtifactService
+from src.core.singleflight import SingleFlight
+from src.core.videos import (
+    MediaProcessingError,
+    Video,
+    VideoMetadata,
+    VideoMetadataRecord,
+    VideoService,
+)
+from src.infra.fastapi.videos import video_router
+from src.infra.sql.sqlite import SqliteConnector
+
+
+class FakeMediaProcessor:
+    """Probes any video except the ones named `corrupt`."""
+
+    def probe(self, video: Path) -> VideoMetadata:
+        if video.stem == "corrupt":
+            raise MediaProcessingError("moov atom not found")
+        return VideoMetadata(duration_sec=1, width=2, height=3)
+
+
+@pytest.fixture
+def connector(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SqliteConnector:
+    monkeypatch.chdir(tmp_path)
+    return SqliteConnector("db.sqlite")
+
+
+@pytest.fixture
+def client(connector: SqliteConnector) -> Iterator[TestClient]:
+    app = FastAPI()
+    app.state.db = connector
+    app.state.video_downloader = None
+    app.state.ocr_generator = None
+    app.state.media_processor = FakeMediaProcessor()
+    app.state.audio_spool_max_bytes = 0
+    app.state.single_flight = SingleFlight()
+    app.include_router(video_router)
+
+    with TestClient(app) as client:
+        yield client
+
+
+def _add_video(connector: SqliteConnector, video_id: str, probed: bool = True) -> None:
+    with connector.session() as session, session.begin():
+        session.add(Video(f"https://example.com/{video_id}.mp4", id=video_id))
+        session.flush()
+        if probed:
+            session.add(VideoMetadataRecord(video_id, 1, 2, 3))
+
+    Path("data/videos").mkdir(parents=True, exist_ok=True)
+    Path(f"data/videos/{video_id}.mp4").touch()
+
+
+def _ids(response: Any) -> list[str]:
+    return [video["id"] for video in response.json()["videos"]]
+
+
+def test_unchanged_listing_is_not_modified(
+    connector: SqliteConnector, client: TestClient
+) -> None:
+    _add_video(connector, "a")
+    etag = client.get("/videos").headers["etag"]
+
+    statements: list[str] = []
+
+    def executed(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(connector.engine(), "before_cursor_execute", executed)
+    response = client.get("/videos", headers={"If-None-Match": etag})
+    event.remove(connector.engine(), "before_cursor_execute", executed)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    # Only the version counters are read, not the listing.
+    assert statements
+    assert all("table_versions" in statement for statement in statements)
+
+
+def test_write_changes_the_etag(connector: SqliteConnector, client: TestClient) -> None:
+    _add_video(connector, "a")
+    etag = client.get("/videos").headers["etag"]
+
+    _add_video(connector, "b")
+    response = client.get("/videos", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert sorted(_ids(response)) == ["a", "b"]
+
+
+def test_packaged_videos_are_flagged(
+    connector: SqliteConnector, client: TestClient
+) -> None:
+    _add_video(connector, "a")
+    _add_video(connector, "b")
+    package = Path("data/hls/b")
+    package.mkdir(parents=True)
+    (package / "index.m3u8").write_text("#EXTM3U")
+    with connector.session() as session, session.begin():
+        ArtifactService(session=session).record(package, ArtifactKind.HLS)
+
+    videos = client.get("/videos").json()["videos"]
+
+    assert {video["id"]: video["has_hls"] for video in videos} == {
+        "a": False,
+        "b": True,
+    }
+
+
+def test_formats_have_their_own_etag(
+    connector: SqliteConnector, client: TestClient
+) -> None:
+    _add_video(connector, "a")
+    etag = client.get("/videos").headers["etag"]
+
+    response = client.get(
+        "/videos",
+        headers={"If-None-Match": etag, "Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_unprobeable_video_is_skipped(connector: SqliteConnector) -> None:
+    _add_video(connector, "corrupt", probed=False)
+    _add_video(connector, "b", probed=False)
+
+    with connector.session() as session, session.begin():
+        VideoService(
+            session=session,
+            video_downloader=None,  # type: ignore[arg-type]
+            ocr=None,  # type: ignore[arg-type]
+            media=FakeMediaProcessor(),  # type: ignore[arg-type]
+        ).extract_missing_video_metadata()
+
+    with Session(connector.engine()) as session:
+        probed = session.scalars(select(VideoMetadataRecord.video_id)).all()
+    assert probed == ["b"]
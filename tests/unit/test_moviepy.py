@@ -0,0 +1,56 @@
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+from moviepy import VideoFileClip
+from moviepy.config import FFMPEG_BINARY
+from PIL import Image
+
+from src.infra.media.moviepy import MoviePyMediaProcessor
+
+FPS = 10
+
+
+@pytest.fixture
+def video(tmp_path: Path) -> Path:
+    path = tmp_path / "video.mp4"
+    subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc=size=64x36:rate={FPS}:duration=20",
+            # A keyframe every two seconds.
+            "-g",
+            str(2 * FPS),
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def test_indexed_frames_come_from_the_cached_reader(
+    video: Path, tmp_path: Path
+) -> None:
+    media = MoviePyMediaProcessor()
+    index = tmp_path / "video.idx"
+    media.index(video, index)
+
+    # Same keyframe, past the next one, backwards, and far ahead.
+    times = [4.5, 5.5, 7.1, 2.0, 19.0]
+    for i, at_seconds in enumerate(times):
+        media.grab_frame(video, at_seconds, tmp_path / f"{i}.png", index=index)
+
+    stats = media.reader_stats()
+    assert (stats.misses, stats.hits) == (1, len(times) - 1)
+
+    with VideoFileClip(str(video)) as clip:
+        for i, at_seconds in enumerate(times):
+            grabbed = np.asarray(Image.open(tmp_path / f"{i}.png"))
+            assert np.array_equal(grabbed, clip.get_frame(at_seconds))
+    media.close()
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.core.videos import MediaProcessingError, ReaderStats, Scene, VideoMetadata
+from src.infra.media.pool import MediaWorkerPool
+
+
+class SleepingMediaProcessor:
+    """Sleeps for as many seconds as the video's name says."""
+
+    def probe(self, video: Path) -> VideoMetadata:
+        time.sleep(float(video.name))
+        return VideoMetadata(duration_sec=float(video.name), width=1, height=1)
+
+    def scenes(self, video: Path) -> list[Scene]:
+        time.sleep(float(video.name))
+        return [Scene(0, float(video.name), 0)]
+
+    def package(self, video: Path, output: Path) -> None:  # noqa: ARG002
+        time.sleep(float(video.name))
+
+    def reader_stats(self) -> ReaderStats:
+        return ReaderStats()
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def pool() -> Iterator[MediaWorkerPool]:
+    pool = MediaWorkerPool(
+        factory=SleepingMediaProcessor,  # type: ignore[arg-type]
+        workers=1,
+        timeout=1,
+        package_timeout=1,
+    )
+    yield pool
+    pool.close()
+
+
+def test_long_task_timeout_spares_other_tasks(pool: MediaWorkerPool) -> None:
+    scenes: list[Scene] = []
+    scan = threading.Thread(target=lambda: scenes.extend(pool.scenes(Path("3"))))
+    scan.start()
+
+    with pytest.raises(MediaProcessingError, match="timed out"):
+        pool.package(Path("60"), Path("out"))
+
+    scan.join()
+    assert scenes == [Scene(0, 3, 0)]
+    assert pool.probe(Path("0")).duration_sec == 0
+
+
+def test_queued_tasks_fail_cleanly_on_restart(pool: MediaWorkerPool) -> None:
+    errors: list[Exception] = []
+
+    def probe(seconds: str) -> None:
+        try:
+            pool.probe(Path(seconds))
+        except MediaProcessingError as e:
+            errors.append(e)
+
+    hung = threading.Thread(target=probe, args=("60",))
+    hung.start()
+    time.sleep(0.2)
+    # Beyond the few already handed to the pool, queued tasks get cancelled.
+    queued = [threading.Thread(target=probe, args=("0",)) for _ in range(3)]
+    for thread in queued:
+        thread.start()
+
+    for thread in [hung, *queued]:
+        thread.join()
+    assert len(errors) == 4
+    assert any("cancelled" in str(e) for e in errors)
@@ -0,0 +1,132 @@
+import io
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+from src.core.scheduling import ScheduledTranslator, Scheduler
+from src.core.translations import Language, Translator, TranslatorResponse
+from src.infra.translators.routing import FakeTranslator, RoutingTranslator
+
+REQUESTS = 200
+
+
+@dataclass
+class CountingTranslator:
+    translator: Translator
+    calls: int = 0
+    running: int = 0
+    max_running: int = 0
+
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def translate(
+        self, file: BinaryIO, from_language: Language, to_language: Language
+    ) -> TranslatorResponse:
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            return self.translator.translate(file, from_language, to_language)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _translate(router: RoutingTranslator, requests: int, spooled: bool = False) -> None:
+    for _ in range(requests):
+        # Audio too large to keep in memory comes as a file on disk.
+        with tempfile.TemporaryFile() if spooled else io.BytesIO() as audio:
+            audio.write(b"audio")
+            audio.seek(0)
+            router.translate(audio, Language.ENGLISH, Language.SPANISH)
+
+
+def _tailed(seed: int) -> CountingTranslator:
+    return CountingTranslator(
+        FakeTranslator(median_seconds=0.002, sigma=1.5, seed=seed)
+    )
+
+
+def test_fastest_backend_gets_the_traffic() -> None:
+    fast = CountingTranslator(FakeTranslator(median_seconds=0.001, sigma=0.1, seed=1))
+    slow = CountingTranslator(FakeTranslator(median_seconds=0.02, sigma=0.1, seed=2))
+    router = RoutingTranslator(
+        {"fast": fast, "slow": slow}, max_hedge_ratio=0, min_samples=5
+    )
+
+    _translate(router, 60)
+
+    # Each backend is sampled until its median is known, then only the
+    # faster one is used.
+    assert slow.calls == 5
+    assert fast.calls == 55
+
+
+def test_failing_backend_is_failed_over_and_avoided() -> None:
+    failing = CountingTranslator(
+        FakeTranslator(median_seconds=0.001, error_rate=1.0, seed=1)
+    )
+    working = CountingTranslator(FakeTranslator(median_seconds=0.001, seed=2))
+    router = RoutingTranslator({"a": failing, "b": working}, max_hedge_ratio=0)
+
+    _translate(router, 20)
+
+    assert failing.calls == 1
+    assert working.calls == 20
+
+
+def test_slow_requests_are_hedged() -> None:
+    first, second = _tailed(1), _tailed(2)
+    router = RoutingTranslator(
+        {"first": first, "second": second}, max_hedge_ratio=1, min_samples=5
+    )
+
+    _translate(router, REQUESTS)
+
+    assert first.calls + second.calls > REQUESTS
+
+
+def test_hedges_stay_within_the_budget() -> None:
+    first, second = _tailed(1), _tailed(2)
+    router = RoutingTranslator(
+        {"first": first, "second": second},
+        max_hedge_ratio=0.01,
+        max_hedge_burst=1,
+        min_samples=5,
+    )
+
+    _translate(router, REQUESTS)
+
+    assert first.calls + second.calls - REQUESTS <= REQUESTS * 0.01 + 1
+
+
+def test_spooled_audio_is_never_hedged() -> None:
+    first, second = _tailed(1), _tailed(2)
+    router = RoutingTranslator(
+        {"first": first, "second": second}, max_hedge_ratio=1, min_samples=5
+    )
+
+    _translate(router, REQUESTS, spooled=True)
+
+    assert first.calls + second.calls == REQUESTS
+
+
+def test_hedges_take_scheduler_slots() -> None:
+    # One counter behind both backends sees every call the scheduler lets by.
+    backend = _tailed(1)
+    scheduler = Scheduler("model", slots=1)
+    router = RoutingTranslator(
+        {
+            "first": ScheduledTranslator(backend, scheduler),
+            "second": ScheduledTranslator(backend, scheduler),
+        },
+        max_hedge_ratio=1,
+        min_samples=5,
+    )
+
+    _translate(router, REQUESTS)
+
+    assert backend.calls > REQUESTS
+    assert backend.max_running == 1
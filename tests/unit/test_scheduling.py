@@ -0,0 +1,104 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+
+from src.core.scheduling import (
+    Priority,
+    Scheduler,
+    SchedulerOverloadedError,
+    work_context,
+)
+
+
+@contextmanager
+def _held(scheduler: Scheduler) -> Iterator[None]:
+    """Keeps the scheduler's only slot busy for the block."""
+    release = threading.Event()
+    thread = threading.Thread(target=scheduler.run, args=(release.wait,))
+    thread.start()
+    while not scheduler._running:
+        time.sleep(0.001)
+    try:
+        yield
+    finally:
+        release.set()
+        thread.join()
+
+
+def _queue(
+    scheduler: Scheduler, order: list[str], label: str, priority: Priority, client: str
+) -> threading.Thread:
+    queued = sum(scheduler._queued.values())
+
+    def call() -> None:
+        with work_context(client, priority):
+            scheduler.run(order.append, label)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    # Queue in a known order.
+    while sum(scheduler._queued.values()) == queued:
+        time.sleep(0.001)
+    return thread
+
+
+def test_interactive_calls_get_most_slots() -> None:
+    scheduler = Scheduler("test", slots=1)
+    order: list[str] = []
+    with _held(scheduler):
+        threads = [
+            _queue(scheduler, order, label, priority, "client")
+            for label, priority in [("batch", Priority.BATCH)] * 4
+            + [("interactive", Priority.INTERACTIVE)] * 12
+        ]
+
+    for thread in threads:
+        thread.join()
+
+    # Batch work moves on, but only one in every nine slots is its.
+    assert order[:11] == ["interactive", "batch", *["interactive"] * 8, "batch"]
+    assert order.count("batch") == 4
+
+
+def test_clients_take_turns() -> None:
+    scheduler = Scheduler("test", slots=1)
+    order: list[str] = []
+    with _held(scheduler):
+        threads = [
+            _queue(scheduler, order, label, Priority.INTERACTIVE, label[0])
+            for label in ["a1", "a2", "a3", "b1"]
+        ]
+
+    for thread in threads:
+        thread.join()
+
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_full_queue_is_rejected() -> None:
+    scheduler = Scheduler(
+        "test", slots=1, max_queued={Priority.INTERACTIVE: 1, Priority.BATCH: 1}
+    )
+    order: list[str] = []
+    with _held(scheduler):
+        waiter = _queue(scheduler, order, "queued", Priority.INTERACTIVE, "client")
+
+        with pytest.raises(SchedulerOverloadedError) as error:
+            scheduler.run(order.append, "rejected")
+        assert error.value.retry_after >= 1
+
+    waiter.join()
+    assert order == ["queued"]
+
+
+def test_long_wait_gives_up() -> None:
+    scheduler = Scheduler("test", slots=1, max_wait_seconds=0.05)
+    with _held(scheduler), pytest.raises(SchedulerOverloadedError, match="Timed out"):
+        scheduler.run(lambda: None)
+
+    # The abandoned ticket doesn't take the slot when it frees up.
+    assert scheduler.run(lambda: "ran") == "ran"
+    assert not any(scheduler._queued.values())
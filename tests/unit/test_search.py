@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, text, update
+
+from src.core.transcripts import Utterance  # noqa: F401
+from src.core.translations import Translation  # noqa: F401
+from src.core.videos import Video
+from src.infra.sql.search import MATCH_END, MATCH_START, SqliteSearch, _highlight
+from src.infra.sql.sqlite import SqliteConnector
+
+
+def test_highlight_escapes_text_and_keeps_marks() -> None:
+    snippet = f"<img src=x onerror=alert(1)> & {MATCH_START}hello{MATCH_END}"
+
+    assert _highlight(snippet) == (
+        "&lt;img src=x onerror=alert(1)&gt; &amp; <mark>hello</mark>"
+    )
+
+
+def _search(connector: SqliteConnector, query: str) -> list[str]:
+    with connector.session() as session:
+        return [hit.id for hit in SqliteSearch(session).search(query, 10, 0)]
+
+
+def test_index_follows_writes_and_vacuum(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    connector = SqliteConnector("db.sqlite")
+    with connector.session() as session, session.begin():
+        for video_id, ocr in (("a", "alpha"), ("b", "beta"), ("c", "gamma")):
+            session.add(Video("https://example.com", ocr, id=video_id))
+    with connector.session() as session, session.begin():
+        session.execute(delete(Video).where(Video.id == "a"))
+        session.execute(
+            update(Video).where(Video.id == "b").values(thumbnail_ocr="delta")
+        )
+    with connector.engine().connect() as conn:
+        conn.execute(text("VACUUM"))
+
+    assert _search(connector, "alpha") == []
+    assert _search(connector, "beta") == []
+    assert _search(connector, "delta") == ["b"]
+    assert _search(connector, "gamma") == ["c"]
+
+
+def test_existing_rows_are_indexed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    connector = SqliteConnector("db.sqlite")
+    with connector.session() as session, session.begin():
+        session.add(Video("https://example.com", "alpha", id="a"))
+    # An index from before the key tables.
+    with connector.engine().begin() as conn:
+        conn.execute(text("DROP TABLE videos_fts_keys"))
+        conn.execute(text("DROP VIEW videos_fts_source"))
+
+    assert _search(SqliteConnector("db.sqlite"), "alpha") == ["a"]
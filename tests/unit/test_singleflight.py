@@ -0,0 +1,197 @@
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.core import Base
+from src.core.singleflight import Lease, SingleFlight
+from src.core.videos import VideoService, VideoType
+
+FOLLOWERS = 4
+
+
+def _start(target: Callable[..., Any], *args: Any) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def _let_followers_join() -> None:
+    # Followers join the flight as long as it is still running.
+    time.sleep(0.1)
+
+
+def test_followers_share_the_leaders_result() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    stored: list[str] = []
+    computed: list[str] = []
+    results: list[str] = []
+
+    def compute() -> str:
+        computed.append("result")
+        started.set()
+        release.wait()
+        stored.append("result")
+        return "result"
+
+    def call() -> None:
+        results.append(flights.do("key", compute, lambda: next(iter(stored), None)))
+
+    threads = [_start(call)]
+    started.wait()
+    threads += [_start(call) for _ in range(FOLLOWERS)]
+    _let_followers_join()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert computed == ["result"]
+    assert results == ["result"] * (FOLLOWERS + 1)
+
+
+def test_followers_get_the_leaders_error() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    error = ValueError("failed")
+    calls: list[int] = []
+    errors: list[BaseException] = []
+
+    def compute() -> str:
+        calls.append(1)
+        started.set()
+        release.wait()
+        raise error
+
+    def call() -> None:
+        try:
+            flights.do("key", compute, lambda: None)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [_start(call)]
+    started.wait()
+    threads += [_start(call) for _ in range(FOLLOWERS)]
+    _let_followers_join()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert len(errors) == FOLLOWERS + 1
+    assert all(e is error for e in errors)
+
+
+@pytest.fixture
+def sessions(tmp_path: Path) -> Callable[[], Session]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    Base.metadata.create_all(engine)
+    return lambda: Session(engine)
+
+
+def test_followers_retry_after_the_leader_rolls_back(
+    sessions: Callable[[], Session],
+) -> None:
+    flights = SingleFlight()
+    computed = threading.Event()
+    rollback = threading.Event()
+    owners: list[str] = []
+    results: list[str] = []
+
+    def call(name: str) -> None:
+        with sessions() as session:
+
+            def compute() -> Lease:
+                owners.append(name)
+                lease = Lease(key="key", owner=name, expires_at=0)
+                session.add(lease)
+                session.flush()
+                computed.set()
+                return lease
+
+            def lookup() -> Lease | None:
+                return session.get(Lease, "key")
+
+            lease = flights.do("key", compute, lookup, session)
+            results.append(lease.owner)
+            if name == "leader":
+                rollback.wait()
+                session.rollback()
+            else:
+                session.commit()
+
+    threads = [_start(call, "leader")]
+    computed.wait()
+    threads += [_start(call, f"follower-{i}") for i in range(FOLLOWERS)]
+    _let_followers_join()
+    rollback.set()
+    for thread in threads:
+        thread.join()
+
+    # One follower computes again, the rest share its committed row.
+    assert len(owners) == 2
+    assert owners[0] == "leader"
+    assert sorted(results) == sorted(["leader", *[owners[1]] * FOLLOWERS])
+
+
+def test_long_lived_session_keeps_one_listener(
+    sessions: Callable[[], Session],
+) -> None:
+    flights = SingleFlight()
+
+    with sessions() as session:
+        for i in range(3):
+            with session.begin():
+                for key in ("a", "b"):
+                    flights.do(f"{key}{i}", lambda: "result", lambda: None, session)
+                assert len(flights._flights) == 2
+
+            assert not flights._flights
+        assert len(session.dispatch.after_transaction_end) == 1
+
+
+class SlowWaveforms:
+    def __init__(self) -> None:
+        self.decoded = 0
+        self.release = threading.Event()
+
+    def waveform(self, video: Path, output: Path) -> None:  # noqa: ARG002
+        self.decoded += 1
+        self.release.wait()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"peaks")
+
+
+def test_concurrent_waveform_requests_decode_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("data/videos").mkdir(parents=True)
+    Path("data/videos/a.mp4").touch()
+    media = SlowWaveforms()
+    service = VideoService(
+        session=None,  # type: ignore[arg-type]
+        video_downloader=None,  # type: ignore[arg-type]
+        ocr=None,  # type: ignore[arg-type]
+        media=media,  # type: ignore[arg-type]
+    )
+    paths: list[Path] = []
+
+    def request() -> None:
+        paths.append(service.get_waveform_path("a", VideoType.MP4))
+
+    threads = [_start(request) for _ in range(FOLLOWERS + 1)]
+    _let_followers_join()
+    media.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert media.decoded == 1
+    assert paths == [Path("data/waveforms/a.peaks")] * (FOLLOWERS + 1)